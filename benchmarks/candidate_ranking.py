@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+# database.py needs a connection string at import time; the ranking benchmark
+# never talks to Mongo (the skill index is filled in memory below)
+os.environ.setdefault("MONGODB_CLIENT", "mongodb://localhost:27017")
+
+from benchmarks.synthetic import employee_rows, skill_vocabulary  # noqa: E402
+from utils.candidate_ranking import (BAND_POSITION, BAND_PROXIMITY_SPAN, RANK_WEIGHT_BAND,  # noqa: E402
+                                     RANK_WEIGHT_LOCATION, RANK_WEIGHT_MANDATORY, RANK_WEIGHT_OPTIONAL,
+                                     candidate_matrix)
+from utils.jobs_crud import BANDS  # noqa: E402
+from utils.skill_index import normalize_skill, skill_index  # noqa: E402
+
+# -------------------------------------------------------------------
+# Candidate ranking benchmark
+# -------------------------------------------------------------------
+# GET /api/manager/rank/{job_rr_id} on a synthetic workforce: the skill index
+# is filled in memory, then the candidate matrix is built and rank() is timed
+# for a set of random RRs. Every top-K is checked against a brute-force
+# scoring of all employees in plain Python.
+#
+#   python -m benchmarks.candidate_ranking                  # 100k employees
+#   python -m benchmarks.candidate_ranking --employees 20000 --top-k 100
+
+
+def employee_docs(count: int, vocabulary: list, skills_per_employee: int) -> list:
+    """Employee documents as stored after an upload (only the indexed fields)."""
+    docs = []
+    for i, row in enumerate(employee_rows(count, bad_rate=0, skills_per_employee=skills_per_employee,
+                                          skills=vocabulary)):
+        docs.append({
+            "employee_id": int(row["Employee ID"]),
+            "detailed_skills": row["Detailed Skill Set (List of top skills on profile)"].split(", "),
+            # employee_rows only uses a few bands; spread over all of them
+            "band": BANDS[i % len(BANDS)],
+            "city": row["City"],
+            "status": i % 50 != 0,
+        })
+    return docs
+
+
+def fill_skill_index(docs: list):
+    postings, skills_by_employee, profiles = {}, {}, {}
+    for doc in docs:
+        skill_index._add(postings, skills_by_employee, profiles, doc)
+    skill_index.postings, skill_index.skills_by_employee, skill_index.profiles = postings, skills_by_employee, profiles
+    skill_index.ready = True
+
+
+def random_rrs(count: int, vocabulary: list, mandatory: int, optional: int, cities: list, seed: int = 3) -> list:
+    rnd = random.Random(seed)
+    rrs = []
+    for _ in range(count):
+        skills = rnd.sample(vocabulary, mandatory + optional)
+        rrs.append({"mandatory_skills": skills[:mandatory], "optional_skills": skills[mandatory:],
+                    "job_grade": rnd.choice(BANDS), "city": rnd.choice(cities)})
+    return rrs
+
+
+def brute_force(rr: dict, top_k: int) -> list:
+    """Score every employee one by one with the formula in utils.candidate_ranking."""
+    mandatory = {normalize_skill(s) for s in rr["mandatory_skills"]} - {""}
+    optional = {normalize_skill(s) for s in rr["optional_skills"]} - {""} - mandatory
+    rr_band = BAND_POSITION.get(rr["job_grade"])
+    rr_city = normalize_skill(rr["city"])
+    scored = []
+    for emp_id, skills in skill_index.skills_by_employee.items():
+        band, city, active = skill_index.profiles[emp_id]
+        matched_mandatory, matched_optional = len(skills & mandatory), len(skills & optional)
+        if not active or not (matched_mandatory or matched_optional):
+            continue
+        score = RANK_WEIGHT_MANDATORY * matched_mandatory / len(mandatory) if mandatory else 0.0
+        score += RANK_WEIGHT_OPTIONAL * matched_optional / len(optional) if optional else 0.0
+        if rr_band is not None and band in BAND_POSITION:
+            score += RANK_WEIGHT_BAND * max(0.0, 1 - abs(BAND_POSITION[band] - rr_band) / BAND_PROXIMITY_SPAN)
+        score += RANK_WEIGHT_LOCATION * (city == rr_city)
+        scored.append((score, emp_id))
+    scored.sort(key=lambda s: -s[0])
+    return scored[:top_k]
+
+
+def check(ranked: list, expected: list):
+    # Same scores in the same order; ids may differ only between equal scores
+    got = [score for _, score, *_ in ranked]
+    want = [score for score, _ in expected]
+    assert len(got) == len(want), (len(got), len(want))
+    for a, b in zip(got, want):
+        assert abs(a - b) < 1e-4, (got, want)
+    expected_ids = {emp_id for _, emp_id in expected}
+    cutoff = want[-1] if want else 0
+    for emp_id, score, *_ in ranked:
+        assert emp_id in expected_ids or abs(score - cutoff) < 1e-4, emp_id
+
+
+async def run(args):
+    vocabulary = skill_vocabulary(args.vocabulary)
+    started = time.perf_counter()
+    docs = employee_docs(args.employees, vocabulary, args.skills_per_employee)
+    fill_skill_index(docs)
+    print(f"{args.employees} employees, {args.skills_per_employee} of {args.vocabulary} skills each "
+          f"(skill index filled in {time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+    await candidate_matrix.rebuild()
+    print(f"matrix build: {time.perf_counter() - started:.3f}s")
+
+    cities = sorted({doc["city"] for doc in docs})
+    rrs = random_rrs(args.rrs, vocabulary, args.mandatory, args.optional, cities)
+    timings, brute_seconds = [], 0.0
+    for rr in rrs:
+        started = time.perf_counter()
+        ranked = candidate_matrix.rank(rr, args.top_k)
+        timings.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        expected = brute_force(rr, args.top_k)
+        brute_seconds += time.perf_counter() - started
+        check(ranked, expected)
+
+    timings.sort()
+    print(f"rank() top {args.top_k}, {args.mandatory} mandatory + {args.optional} optional skills, {args.rrs} RRs:")
+    print(f"  median {timings[len(timings) // 2] * 1000:.1f}ms  max {timings[-1] * 1000:.1f}ms  "
+          f"(brute force {brute_seconds / len(rrs) * 1000:.0f}ms per RR)")
+    print("top-K matches brute-force scoring for every RR")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate matrix build and rank() time vs brute-force scoring")
+    parser.add_argument("--employees", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=2000, help="distinct skills in the employee data")
+    parser.add_argument("--skills-per-employee", type=int, default=15)
+    parser.add_argument("--mandatory", type=int, default=8)
+    parser.add_argument("--optional", type=int, default=12)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--rrs", type=int, default=20, help="random RRs to rank")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from pymongo import InsertOne, MongoClient
+from pymongo.errors import PyMongoError
+
+# -------------------------------------------------------------------
+# Employee search benchmark
+# -------------------------------------------------------------------
+# GET /employees/search on a throwaway database of synthetic employees:
+#   regex $or - the old query: nine case-insensitive unanchored $regex
+#               clauses, a full collection scan
+#   tokens    - utils.employee_search.search_employees: anchored prefix
+#               regexes on the indexed search_terms
+# Both are timed for the first page and for the total count, and the docs
+# examined per query are read from explain(). Totals differ where the
+# semantics do: the old query matched the whole string as a substring of one
+# field, the new one matches every word as a prefix of any field.
+# Needs a mongod: MONGODB_BENCH_URI (default mongodb://localhost:27017);
+# the MONGODB_BENCH_DB database is dropped before and after the run.
+#
+#   python -m benchmarks.employee_search                 # 100k employees
+#   python -m benchmarks.employee_search --employees 20000 --query java --query "senior dev"
+
+MONGODB_BENCH_URI = os.getenv("MONGODB_BENCH_URI", "mongodb://localhost:27017")
+MONGODB_BENCH_DB = os.getenv("MONGODB_BENCH_DB", "talent_management_bench")
+
+# database.py reads these at import time
+os.environ["MONGODB_CLIENT"] = MONGODB_BENCH_URI
+os.environ["ATLAS_DB_NAME"] = MONGODB_BENCH_DB
+
+from benchmarks.synthetic import employee_rows  # noqa: E402
+from database import db  # noqa: E402
+from utils.employee_search import MAX_QUERY_TERMS, search_employees, search_query, search_fields, tokenize  # noqa: E402
+from utils.indexes import ensure_indexes  # noqa: E402
+from utils.pagination import PageParams, paginate  # noqa: E402
+from utils.projections import EMPLOYEE_LIST_FIELDS, projection  # noqa: E402
+
+QUERIES = ["java", "chennai", "senior dev", "employee 4242", "b2", "architect pune"]
+OLD_SEARCH_FIELDS = [
+    "employee_name", "designation", "primary_technology", "secondary_technology",
+    "employee_id", "type", "employment_type", "city", "band",
+]
+
+
+def regex_or_query(search: str) -> dict:
+    # The query /employees/search ran before utils.employee_search
+    query = {"$or": [{field: {"$regex": search, "$options": "i"}} for field in OLD_SEARCH_FIELDS]}
+    if search.strip().isdigit():
+        query["$or"].append({"employee_id": int(search)})
+    return query
+
+
+def employee_docs(count: int):
+    for row in employee_rows(count, bad_rate=0, seed=5):
+        doc = {
+            "employee_id": int(row["Employee ID"]),
+            "employee_name": row["Employee Name"],
+            "employment_type": row["Employment Type"],
+            "designation": row["Designation"],
+            "band": row["Band"],
+            "city": row["City"],
+            "primary_technology": row["Primary Technology"],
+            "secondary_technology": row["Secondary Technology"],
+            "type": row["Type"],
+            "status": True,
+        }
+        doc.update(search_fields(doc))
+        yield doc
+
+
+def seed(employees: int):
+    sync = MongoClient(MONGODB_BENCH_URI)
+    try:
+        sync.drop_database(MONGODB_BENCH_DB)
+        ops = []
+        for doc in employee_docs(employees):
+            ops.append(InsertOne(doc))
+            if len(ops) == 5000:
+                sync[MONGODB_BENCH_DB].employees.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            sync[MONGODB_BENCH_DB].employees.bulk_write(ops, ordered=False)
+    finally:
+        sync.close()
+
+
+def _page(limit: int, include_total: bool) -> PageParams:
+    return PageParams(limit=limit, cursor=None, include_total=include_total)
+
+
+async def _timed(func, *args, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+async def _docs_examined(query: dict) -> int:
+    explain = await db.employees.find(query).explain()
+    return explain.get("executionStats", {}).get("totalDocsExamined")
+
+
+async def run(args):
+    started = time.perf_counter()
+    await asyncio.to_thread(seed, args.employees)
+    await ensure_indexes(db)
+    print(f"seeded {args.employees} employees in {time.perf_counter() - started:.1f}s")
+
+    fields = projection(EMPLOYEE_LIST_FIELDS, None)
+    print(f"{'query':<16} {'path':<10} {'total':>7} {'examined':>9} {'page':>9} {'page+total':>11}")
+    for search in args.query or QUERIES:
+        old_query = regex_or_query(search)
+        new_query = search_query(list(dict.fromkeys(tokenize(search)))[:MAX_QUERY_TERMS])
+
+        _, old_page = await _timed(paginate, db.employees, old_query, _page(args.limit, False), None, fields,
+                                   repeat=args.repeat)
+        old, old_total = await _timed(paginate, db.employees, old_query, _page(args.limit, True), None, fields,
+                                      repeat=args.repeat)
+        _, new_page = await _timed(search_employees, search, _page(args.limit, False), fields, repeat=args.repeat)
+        new, new_total = await _timed(search_employees, search, _page(args.limit, True), fields, repeat=args.repeat)
+
+        rows = [("regex $or", old["total"], await _docs_examined(old_query), old_page, old_total),
+                ("tokens", new["total"], await _docs_examined(new_query), new_page, new_total)]
+        for path, total, examined, page_seconds, total_seconds in rows:
+            print(f"{search:<16} {path:<10} {total:>7} {examined:>9} {page_seconds * 1000:>7.1f}ms "
+                  f"{total_seconds * 1000:>9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regex $or scan vs indexed token-prefix employee search")
+    parser.add_argument("--employees", type=int, default=100000)
+    parser.add_argument("--query", action="append", help=f"search string (repeatable; default {QUERIES})")
+    parser.add_argument("--limit", type=int, default=50, help="page size")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    try:
+        MongoClient(MONGODB_BENCH_URI, serverSelectionTimeoutMS=2000).admin.command("ping")
+    except PyMongoError as e:
+        sys.exit(f"No mongod at {MONGODB_BENCH_URI} (set MONGODB_BENCH_URI): {e}")
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(args))
+    finally:
+        MongoClient(MONGODB_BENCH_URI).drop_database(MONGODB_BENCH_DB)
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
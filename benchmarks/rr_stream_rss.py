@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import rr_template, write_rr_csv
+from utils.upload_parsing import StreamingCsvReader, parse_rr_upload, validate_rr_rows
+
+# -------------------------------------------------------------------
+# RR upload peak memory benchmark
+# -------------------------------------------------------------------
+# Peak RSS of reading + validating an RR CSV report:
+#   whole   - the /api/upload/rr-report path: the payload in memory,
+#             read_csv_file, one validate_rr_frame over every row
+#   stream  - the /api/upload/rr-report/stream path: UPLOAD_READ_CHUNK_SIZE
+#             reads through StreamingCsvReader, validate_rr_rows per
+#             RR_STREAM_BATCH_SIZE batch (each batch dropped once handled)
+# Every run is a fresh process so ru_maxrss is that run's own peak. The DB
+# sync is left out: it costs the same per batch in both paths.
+#
+#   python -m benchmarks.rr_stream_rss                  # 10MB and 100MB
+#   python -m benchmarks.rr_stream_rss --sizes-mb 10 50 --keep
+
+# Same settings (and defaults) as routers/file_upload.py, which cannot be
+# imported without the database
+UPLOAD_READ_CHUNK_SIZE = int(os.getenv("UPLOAD_READ_CHUNK_SIZE", str(1024 * 1024)))
+RR_STREAM_BATCH_SIZE = int(os.getenv("RR_STREAM_BATCH_SIZE", "2000"))
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def run_whole(path: str) -> dict:
+    with open(path, "rb") as f:
+        content = f.read()
+    result = parse_rr_upload(os.path.basename(path), content)
+    return {"rows": result["total_rows"], "valid": len(result["valid"]), "errors": len(result["errors"])}
+
+
+def run_stream(path: str) -> dict:
+    reader, pending = StreamingCsvReader(), []
+    counts = {"rows": 0, "valid": 0, "errors": 0}
+
+    def flush(rows):
+        batch = validate_rr_rows(reader.header, rows, counts["rows"])
+        counts["rows"] += batch["total_rows"]
+        counts["valid"] += len(batch["valid"])
+        counts["errors"] += len(batch["errors"])
+
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_READ_CHUNK_SIZE):
+            pending.extend(reader.feed(chunk))
+            while len(pending) >= RR_STREAM_BATCH_SIZE:
+                flush(pending[:RR_STREAM_BATCH_SIZE])
+                pending = pending[RR_STREAM_BATCH_SIZE:]
+    pending.extend(reader.close())
+    if pending:
+        flush(pending)
+    return counts
+
+
+def child(mode: str, path: str):
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    counts = (run_whole if mode == "whole" else run_stream)(path)
+    print(json.dumps(dict(counts, seconds=time.perf_counter() - started,
+                          peak_rss_mb=_peak_rss_mb(), import_rss_mb=baseline)))
+
+
+def measure(mode: str, path: str) -> dict:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.rr_stream_rss", "--child", mode, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of whole-file vs streamed RR CSV ingestion")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--rr-template", help="RR report CSV to copy rows from")
+    parser.add_argument("--keep", action="store_true", help="keep the generated CSV files")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    header, template = rr_template(args.rr_template)
+    workdir = tempfile.mkdtemp(prefix="rr_stream_rss_")
+    print(f"{'file':>6} {'rows':>8} {'mode':<7} {'seconds':>8} {'peak RSS':>10} {'after imports':>14}")
+    for size_mb in args.sizes_mb:
+        path = os.path.join(workdir, f"rr_{size_mb}mb.csv")
+        rows = write_rr_csv(path, size_mb * 1024 * 1024, header, template)
+        for mode in ("whole", "stream"):
+            r = measure(mode, path)
+            assert r["rows"] == rows, (mode, r["rows"], rows)
+            print(f"{size_mb:>4}MB {rows:>8} {mode:<7} {r['seconds']:>7.1f}s {r['peak_rss_mb']:>8.0f}MB "
+                  f"{r['import_rss_mb']:>12.0f}MB")
+        if not args.keep:
+            os.remove(path)
+    if not args.keep:
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
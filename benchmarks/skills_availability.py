@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from pymongo import InsertOne, MongoClient
+from pymongo.errors import PyMongoError
+
+# -------------------------------------------------------------------
+# Skills availability benchmark
+# -------------------------------------------------------------------
+# Employee lookups for an HM's RR skills (GET /skills/availability) on a
+# throwaway database of synthetic employees:
+#   per-skill   - the old loop: one employees.find per skill
+#   aggregation - employees_by_skill, one pipeline over norm.skills
+#   index       - employees_by_skill_indexed, the in-memory skill index plus
+#                 one $in read for the returned page
+# The aggregation and index paths must return the same counts and pages.
+# Needs a mongod: MONGODB_BENCH_URI (default mongodb://localhost:27017);
+# the MONGODB_BENCH_DB database is dropped before and after the run.
+#
+#   python -m benchmarks.skills_availability            # 200 skills x 50k employees
+#   python -m benchmarks.skills_availability --employees 10000 --limit 50
+
+MONGODB_BENCH_URI = os.getenv("MONGODB_BENCH_URI", "mongodb://localhost:27017")
+MONGODB_BENCH_DB = os.getenv("MONGODB_BENCH_DB", "talent_management_bench")
+
+# database.py reads these at import time
+os.environ["MONGODB_CLIENT"] = MONGODB_BENCH_URI
+os.environ["ATLAS_DB_NAME"] = MONGODB_BENCH_DB
+
+from benchmarks.synthetic import BANDS, CITIES, TECHNOLOGIES, skill_vocabulary  # noqa: E402
+from database import db  # noqa: E402
+from utils.employee_filters import normalized_fields  # noqa: E402
+from utils.indexes import ensure_indexes  # noqa: E402
+from utils.jobs_crud import employees_by_skill, employees_by_skill_indexed  # noqa: E402
+from utils.skill_index import skill_index  # noqa: E402
+
+
+def employee_docs(count: int, vocabulary: list, skills_per_employee: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for i in range(count):
+        doc = {
+            "employee_id": 100000 + i,
+            "employee_name": f"Employee {i}",
+            "designation": rnd.choice(["Developer", "Senior Developer", "Architect", "Lead"]),
+            "band": rnd.choice(BANDS),
+            "city": rnd.choice(CITIES),
+            "primary_technology": rnd.choice(TECHNOLOGIES),
+            "detailed_skills": rnd.sample(vocabulary, skills_per_employee),
+            "status": True,
+        }
+        doc.update(normalized_fields(doc))
+        yield doc
+
+
+def seed(employees: int, vocabulary: list, skills_per_employee: int):
+    sync = MongoClient(MONGODB_BENCH_URI)
+    try:
+        sync.drop_database(MONGODB_BENCH_DB)
+        ops = []
+        for doc in employee_docs(employees, vocabulary, skills_per_employee):
+            ops.append(InsertOne(doc))
+            if len(ops) == 5000:
+                sync[MONGODB_BENCH_DB].employees.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            sync[MONGODB_BENCH_DB].employees.bulk_write(ops, ordered=False)
+    finally:
+        sync.close()
+
+
+async def per_skill(skills: list, offset: int, limit):
+    # The loop get_skills_availability ran before the aggregation
+    result = {}
+    for skill_name in skills:
+        employees = await db.employees.find({"detailed_skills": {"$in": [skill_name]}}).to_list(None)
+        page = employees[offset:None if limit is None else offset + limit]
+        result[skill_name] = {"skill": skill_name, "employee_count": len(employees), "employees": [
+            {
+                "employee_id": emp.get("employee_id"),
+                "employee_name": emp.get("employee_name"),
+                "designation": emp.get("designation"),
+                "primary_technology": emp.get("primary_technology"),
+                "city": emp.get("city"),
+            }
+            for emp in page
+        ]}
+    return result
+
+
+async def _timed(func, *args, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+async def run(args):
+    vocabulary = skill_vocabulary(args.vocabulary)
+    wanted = random.Random(2).sample(vocabulary, args.skills)
+
+    started = time.perf_counter()
+    await asyncio.to_thread(seed, args.employees, vocabulary, args.skills_per_employee)
+    await ensure_indexes(db)
+    print(f"seeded {args.employees} employees ({args.skills_per_employee} of {args.vocabulary} skills each) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    await skill_index.build()
+    print(f"skill index built in {time.perf_counter() - started:.1f}s")
+
+    page = (args.offset, args.limit)
+    old, old_seconds = await _timed(per_skill, wanted, *page, repeat=1)
+    agg, agg_seconds = await _timed(employees_by_skill, wanted, *page, repeat=args.repeat)
+    indexed, indexed_seconds = await _timed(employees_by_skill_indexed, wanted, *page, repeat=args.repeat)
+
+    # The aggregation leaves out skills nobody has; the other two list them with 0
+    assert agg == {s: r for s, r in indexed.items() if r["employee_count"]}, \
+        "aggregation and skill index results differ"
+    # The synthetic skills are already normalized-unique, so the old exact match agrees on counts
+    assert {s: r["employee_count"] for s, r in old.items()} == \
+        {s: agg[s]["employee_count"] if s in agg else 0 for s in wanted}, "per-skill counts differ"
+
+    matches = sum(r["employee_count"] for r in agg.values())
+    print(f"{args.skills} skills, {matches} employee/skill matches, page {args.offset}:{args.limit}")
+    print(f"{'path':<12} {'seconds':>8} {'speedup':>8}")
+    for name, seconds in (("per-skill", old_seconds), ("aggregation", agg_seconds), ("index", indexed_seconds)):
+        print(f"{name:<12} {seconds:>7.3f}s {old_seconds / seconds:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-skill finds vs aggregation vs skill index for skills availability")
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--skills", type=int, default=200, help="skills requested across the HM's RRs")
+    parser.add_argument("--vocabulary", type=int, default=500, help="distinct skills in the employee data")
+    parser.add_argument("--skills-per-employee", type=int, default=8)
+    parser.add_argument("--offset", type=int, default=0, help="employees_offset")
+    parser.add_argument("--limit", type=int, default=None, help="employees_limit")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the new paths; the best is reported")
+    args = parser.parse_args()
+
+    try:
+        MongoClient(MONGODB_BENCH_URI, serverSelectionTimeoutMS=2000).admin.command("ping")
+    except PyMongoError as e:
+        sys.exit(f"No mongod at {MONGODB_BENCH_URI} (set MONGODB_BENCH_URI): {e}")
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(args))
+    finally:
+        MongoClient(MONGODB_BENCH_URI).drop_database(MONGODB_BENCH_DB)
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import csv
+import glob
+import os
+import random
+
+# -------------------------------------------------------------------
+# Synthetic upload data for the benchmarks
+# -------------------------------------------------------------------
+# Employee rows are generated from scratch; RR rows are copies of a real
+# report (the CSV in upload_files/unprocessed unless another template is
+# given) with fresh Resource Request IDs. bad_rate of the cells that the
+# validators check are replaced with malformed values so the per-row
+# fallback paths are exercised too.
+
+BANDS = ["A3", "B1", "B2", "B3", "C1", "C2", "C3", "D1"]
+CITIES = ["Chennai", "Bangalore", "Kochi", "Pune", "Trivandrum", "Hyderabad"]
+TECHNOLOGIES = ["Java", "Python", "JavaScript", ".NET", "SQL", "AWS", "React", "Go"]
+
+EMPLOYEE_BAD_VALUES = {
+    "Employee ID": ["abc", " 12 ", None, "12.0"],
+    "Employee Name": [None, ""],
+    "Band": ["Z9", "T1x", "b 2"],
+    "Primary Technology": ["NA", "not available", None],
+    "Detailed Skill Set (List of top skills on profile)": ["NA", None, " , "],
+    "Type": [None, "x", "tp"],
+}
+# The sample report leaves these blank, which the CSV path rejects as
+# non-integers; the template fills them so template rows are valid
+RR_TEMPLATE_DEFAULTS = {"Duration in Edit(Days)": "0", "# of Edits": "0"}
+RR_BAD_VALUES = {
+    "RR FTE": ["x", "1.5", ""],
+    "Priority": ["urgent", " P2 ", ""],
+    "Exclusive to UST": ["maybe", ""],
+    "RR Start Date": ["bad", "2024-02-30", ""],
+    "Last Activity Date": ["junk", ""],
+    "Mandatory Skills": ["NA", "", " , x"],
+    "flag": ["maybe", "False"],
+}
+
+
+def skill_vocabulary(size: int) -> list:
+    return [f"Skill {i}" for i in range(size)]
+
+
+def employee_rows(count: int, bad_rate: float = 0.01, skills_per_employee: int = 8,
+                  skills: list = None, seed: int = 1) -> list:
+    """Career Velocity rows as dicts keyed by the upload column names."""
+    rnd = random.Random(seed)
+    skills = skills or skill_vocabulary(500)
+    rows = []
+    for i in range(count):
+        row = {
+            "Employee ID": str(100000 + i),
+            "Employee Name": f"Employee {i}",
+            "Employment Type": rnd.choice(["Full Time", "Contract"]),
+            "Designation": rnd.choice(["Developer", "Senior Developer", "Architect", "Lead"]),
+            "Band": rnd.choice(BANDS),
+            "City": rnd.choice(CITIES),
+            "Location Description": "Campus",
+            "Primary Technology": rnd.choice(TECHNOLOGIES),
+            "Secondary Technology": rnd.choice(TECHNOLOGIES),
+            "Detailed Skill Set (List of top skills on profile)": ", ".join(rnd.sample(skills, skills_per_employee)),
+            "Type": rnd.choice(["TP", "Non TP"]),
+        }
+        for column, values in EMPLOYEE_BAD_VALUES.items():
+            if rnd.random() < bad_rate:
+                row[column] = rnd.choice(values)
+        rows.append(row)
+    return rows
+
+
+def rr_template(path: str = None) -> tuple:
+    """(header, rows) of the RR report used as the template."""
+    if path is None:
+        found = sorted(glob.glob(os.path.join("upload_files", "unprocessed", "*.csv")))
+        if not found:
+            raise SystemExit("No RR template: pass --rr-template <report.csv>")
+        path = found[0]
+    with open(path, newline="", encoding="utf-8", errors="ignore") as f:
+        rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    header = rows[0]
+    template = [row + [""] * (len(header) - len(row)) for row in rows[1:]]
+    for column, default in RR_TEMPLATE_DEFAULTS.items():
+        if column in header:
+            i = header.index(column)
+            for row in template:
+                row[i] = row[i].strip() or default
+    return header, template
+
+
+def rr_rows(count: int, header: list, template: list, bad_rate: float = 0.01, seed: int = 1):
+    """Yield `count` RR rows (lists in header order) with unique Resource Request IDs."""
+    rnd = random.Random(seed)
+    position = {column: i for i, column in enumerate(header)}
+    rr_id = position["Resource Request ID"]
+    for i in range(count):
+        row = list(rnd.choice(template))
+        row[rr_id] = f"BENCH{i:08d}"
+        for column, values in RR_BAD_VALUES.items():
+            if column in position and rnd.random() < bad_rate:
+                row[position[column]] = rnd.choice(values)
+        yield row
+
+
+def write_rr_csv(path: str, target_bytes: int, header: list, template: list, bad_rate: float = 0.01) -> int:
+    """Write an RR report of about target_bytes; returns the number of data rows."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row in rr_rows(10 ** 9, header, template, bad_rate):
+            writer.writerow(row)
+            count += 1
+            if count % 1000 == 0 and f.tell() >= target_bytes:
+                break
+    return count
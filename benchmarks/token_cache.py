@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+
+# -------------------------------------------------------------------
+# Token verification benchmark
+# -------------------------------------------------------------------
+# Cost of authenticating a request's access token (get_current_user):
+#   jwt.decode   - signature + claims check on every request (no cache)
+#   cold         - decode_token on tokens it has not seen (decode + cache fill)
+#   warm         - decode_token on tokens already verified (cache hit)
+# Uses the JWT settings from .env; database.py only needs a connection
+# string to import, Mongo is never contacted.
+#
+#   python -m benchmarks.token_cache                    # 10k tokens x 10 rounds
+#   python -m benchmarks.token_cache --tokens 1000 --rounds 50
+
+load_dotenv()
+os.environ.setdefault("MONGODB_CLIENT", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "5")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+from jose import jwt  # noqa: E402
+
+from utils.security import ALGORITHM, SECRET_KEY, create_access_token, decode_token, token_cache  # noqa: E402
+
+
+def _timed(func, tokens: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            func(token)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw jwt.decode vs cached decode_token")
+    parser.add_argument("--tokens", type=int, default=10000, help="distinct access tokens (users)")
+    parser.add_argument("--rounds", type=int, default=10, help="verifications per token")
+    args = parser.parse_args()
+    if args.tokens > token_cache.max_size:
+        print(f"note: {args.tokens} tokens > TOKEN_CACHE_MAX_SIZE={token_cache.max_size}, the warm run will miss")
+
+    tokens = [create_access_token({"sub": str(100000 + i), "role": "TP"}) for i in range(args.tokens)]
+    calls = args.tokens * args.rounds
+
+    def raw_decode(token):
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    raw = _timed(raw_decode, tokens, args.rounds)
+    token_cache.clear()
+    cold = _timed(decode_token, tokens, 1)
+    warm = _timed(decode_token, tokens, args.rounds)
+    assert all(decode_token(t) == raw_decode(t) for t in tokens[:100]), "cached claims differ"
+
+    print(f"{args.tokens} tokens x {args.rounds} rounds ({ALGORITHM})")
+    print(f"{'path':<11} {'calls':>8} {'total':>9} {'per call':>10}")
+    for name, seconds, count in (("jwt.decode", raw, calls), ("cold", cold, args.tokens), ("warm", warm, calls)):
+        print(f"{name:<11} {count:>8} {seconds:>8.3f}s {seconds / count * 1e6:>8.1f}us")
+    print(f"warm speedup over jwt.decode: {raw / warm:.1f}x")
+    print(f"cache: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
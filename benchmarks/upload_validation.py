@@ -0,0 +1,102 @@
+import argparse
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from benchmarks.synthetic import employee_rows, rr_rows, rr_template
+from utils.upload_validation import (_validate_employee_row, _validate_rr_row,
+                                     validate_employee_frame, validate_rr_frame)
+
+# -------------------------------------------------------------------
+# Upload validation benchmark
+# -------------------------------------------------------------------
+# Column-wise validation (utils.upload_validation) against the per-row
+# iterrows + Pydantic loop it replaced, on synthetic employee and RR files.
+# Both must produce the same records and the same error rows.
+#
+#   python -m benchmarks.upload_validation                 # 50k rows each
+#   python -m benchmarks.upload_validation --rows 10000 --bad-rate 0.05
+
+
+def per_row_employees(df: pd.DataFrame):
+    valid_emps, valid_users, errors = [], [], []
+    for idx, row in df.iterrows():
+        emp, user, error = _validate_employee_row(idx, row)
+        if error:
+            errors.append(error)
+        else:
+            valid_emps.append(emp)
+            valid_users.append(user)
+    return valid_emps, valid_users, errors
+
+
+def per_row_rrs(df: pd.DataFrame):
+    valid_rrs, errors = [], []
+    for idx, row in df.iterrows():
+        rr_id = row.get("Resource Request ID")
+        if not rr_id or pd.isna(rr_id):
+            continue
+        rr, error = _validate_rr_row(idx, row)
+        if error:
+            errors.append(error)
+        else:
+            valid_rrs.append(rr)
+    return valid_rrs, errors
+
+
+def _dump(models: list) -> list:
+    return [m.model_dump() for m in models]
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def bench_employees(rows: int, bad_rate: float):
+    content = pd.DataFrame(employee_rows(rows, bad_rate)).to_csv(index=False).encode()
+    # Same read as parse_employee_upload
+    df = pd.read_csv(BytesIO(content), encoding="utf-8", dtype=str, engine="python", on_bad_lines="skip").dropna(how="all")
+
+    old, old_seconds = _timed(per_row_employees, df)
+    new, new_seconds = _timed(validate_employee_frame, df)
+    assert _dump(old[0]) == _dump(new[0]), "employee records differ"
+    assert _dump(old[1]) == _dump(new[1]), "user records differ"
+    assert old[2] == new[2], "employee error rows differ"
+    return len(df), len(new[0]), len(new[2]), old_seconds, new_seconds
+
+
+def bench_rrs(rows: int, bad_rate: float, template_path: str):
+    header, template = rr_template(template_path)
+    df = pd.DataFrame(list(rr_rows(rows, header, template, bad_rate)), columns=header)
+
+    old, old_seconds = _timed(per_row_rrs, df)
+    new, new_seconds = _timed(validate_rr_frame, df)
+    assert _dump(old[0]) == _dump(new[0]), "RR records differ"
+    assert old[1] == new[1], "RR error rows differ"
+    return len(df), len(new[0]), len(new[1]), old_seconds, new_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs column-wise upload validation")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--bad-rate", type=float, default=0.01, help="share of checked cells made invalid")
+    parser.add_argument("--only", choices=["employees", "rr"])
+    parser.add_argument("--rr-template", help="RR report CSV to copy rows from")
+    args = parser.parse_args()
+
+    print(f"{'file':<10} {'rows':>7} {'valid':>7} {'errors':>7} {'per-row':>9} {'columnar':>9} {'speedup':>8}")
+    results = []
+    if args.only in (None, "employees"):
+        results.append(("employees", *bench_employees(args.rows, args.bad_rate)))
+    if args.only in (None, "rr"):
+        results.append(("rr", *bench_rrs(args.rows, args.bad_rate, args.rr_template)))
+    for name, total, valid, errors, old_seconds, new_seconds in results:
+        print(f"{name:<10} {total:>7} {valid:>7} {errors:>7} {old_seconds:>8.2f}s {new_seconds:>8.2f}s "
+              f"{old_seconds / new_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 from fastapi import FastAPI,Depends
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 from routers.jobs import jobs_router
 from routers.file_upload import file_upload_router
 from routers.application import application_router
 from routers.employee import router as employee_router,resume_router,hm_router,wfm_router,tp_router
+from routers.admin import admin_router
+from utils.upload_parsing import shutdown_parse_pool
+from database import connect_db, close_db
+from utils.indexes import INDEX_BOOTSTRAP, ensure_indexes
+from utils.employee_search import backfill_search_fields
+from utils.employee_filters import backfill_normalized_fields
+from utils.skill_index import SKILL_INDEX_ENABLED, skill_index
+from utils.candidate_ranking import candidate_matrix
+from utils.suggest_index import SUGGEST_INDEX_ENABLED, suggest_index
+from utils.job_recommendations import RECOMMENDATIONS_REBUILD_ON_STARTUP, rebuild_all as rebuild_job_recommendations
+from utils.upload_jobs import fail_orphaned_upload_jobs, delete_old_job_files
 import os
 load_dotenv()
 
@@ -14,7 +25,29 @@ from utils.security import get_current_user
 from routers import manager_workflow
 # , file_upload, job, employee, application, manager_workflow, admin
 
-app = FastAPI(title="Talent Management System")
+# Startup/shutdown of shared resources: Mongo client pool, indexes, orphaned upload jobs, skill/suggest indexes, job recommendations and upload parse pool
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    if INDEX_BOOTSTRAP:
+        await ensure_indexes()
+        await backfill_search_fields()
+        await backfill_normalized_fields()
+    # Upload jobs left queued/running by a previous process
+    await fail_orphaned_upload_jobs()
+    await delete_old_job_files()
+    if SKILL_INDEX_ENABLED:
+        await skill_index.build()
+        await candidate_matrix.rebuild()
+    if SUGGEST_INDEX_ENABLED:
+        await suggest_index.build()
+    if RECOMMENDATIONS_REBUILD_ON_STARTUP:
+        await rebuild_job_recommendations()
+    yield
+    shutdown_parse_pool()
+    close_db()
+
+app = FastAPI(title="Talent Management System", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,11 +55,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated list endpoints return their cursor/total in these headers
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
-# MongoDB Connection
-client = AsyncIOMotorClient(os.getenv("MONGODB_CLIENT"))
-db = client.talent_management
 
 # app.include_router(auth.router, tags=["Auth"])
 # # ager_workflow.router, prefix="/api/manager", tags=["Manager Workflow"])
@@ -39,6 +71,7 @@ app.include_router(jobs_router, tags=["Jobs"])
 app.include_router(application_router, tags=["Applications"])
 app.include_router(manager_workflow.manager_router,tags=["Manager Workflow"])
 app.include_router(file_upload_router, tags=["File Upload"])
+app.include_router(admin_router, tags=["Admin"])
 
 # Protected root endpoint
 @app.get("/")
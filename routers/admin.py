@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any
+from utils.security import get_current_user, user_cache_stats, token_cache_stats
+from database import get_pool_stats
+from utils.skill_index import skill_index
+from utils.candidate_ranking import candidate_matrix
+from utils.suggest_index import suggest_index
+from utils.job_recommendations import rebuild_all as rebuild_job_recommendations
+
+
+admin_router = APIRouter(prefix="/api/admin")
+
+
+# Only Admin can look at runtime internals
+def require_admin(current_user: Dict[str, Any] = Depends(get_current_user)):
+    if current_user["role"] != "Admin":
+        raise HTTPException(status_code=403, detail="Not Authorized")
+    return current_user
+
+
+# Hit/miss counters of the in-process caches
+@admin_router.get("/cache/stats")
+async def cache_stats(current_user=Depends(require_admin)):
+    return {
+        "user_cache": user_cache_stats(),
+        "token_cache": token_cache_stats(),
+    }
+
+
+# Mongo connection pool settings and per-server connection counters
+@admin_router.get("/db/pool")
+async def db_pool_stats(current_user=Depends(require_admin)):
+    return get_pool_stats()
+
+
+# Size, memory and freshness of the in-memory skill index
+@admin_router.get("/skill-index/stats")
+async def skill_index_stats(current_user=Depends(require_admin)):
+    return skill_index.stats()
+
+
+# Full rebuild from the employees collection (and the ranking matrix built on it)
+@admin_router.post("/skill-index/rebuild")
+async def rebuild_skill_index(current_user=Depends(require_admin)):
+    await skill_index.build()
+    await candidate_matrix.rebuild()
+    return skill_index.stats()
+
+
+# Size, memory and build time of the type-ahead suggest index
+@admin_router.get("/suggest-index/stats")
+async def suggest_index_stats(current_user=Depends(require_admin)):
+    return suggest_index.stats()
+
+
+@admin_router.post("/suggest-index/rebuild")
+async def rebuild_suggest_index(current_user=Depends(require_admin)):
+    await suggest_index.build()
+    return suggest_index.stats()
+
+
+# Recompute stored job recommendations for every TP employee
+@admin_router.post("/recommendations/rebuild")
+async def rebuild_recommendations(current_user=Depends(require_admin)):
+    return {"employees_refreshed": await rebuild_job_recommendations()}
@@ -1,22 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException,status,Query,UploadFile,Form,File,Request
+from fastapi import APIRouter, Depends, HTTPException,status,Query,UploadFile,Form,File,Request,Response
 from typing import List, Optional
 from datetime import datetime
 import uuid
-from gridfs import GridFS,GridFSBucket
 from pymongo.database import Database
 from database import collections
 from models import Application, ApplicationStatus, UserRole
 from utils.security import get_current_user
+from utils.pagination import PageParams, paginate, set_page_headers
 from bson import ObjectId
 from bson.errors import InvalidId
 # import aiofiles
 from pathlib import Path
-from motor.motor_asyncio import AsyncIOMotorClient,AsyncIOMotorGridFSBucket
-from database import client,db,collections
+from database import client,db,collections,fs_bucket
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from bson import ObjectId
 
-fs_bucket = AsyncIOMotorGridFSBucket(db, bucket_name="files")
 application_router = APIRouter()
 application_router = APIRouter(prefix="/files", tags=["files"])
 
@@ -287,8 +285,10 @@ def normalize_status(value: str | None) -> str | None:
     return ALLOWED_STATUS.get(value.strip().lower())
 @application_router.get("/", response_model=List[Application])
 async def get_applications(
+    response: Response,
     job_rr_id: Optional[str] = Query(None, description="Filter by job requisition ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
+    page: PageParams = Depends(),
     current_user: dict = Depends(get_current_user),
 ):
     # Normalize status to match Enum
@@ -309,8 +309,8 @@ async def get_applications(
     else:
         query = {}  # return all
  
-    cursor = collections["applications"].find(query)
-    applications = await cursor.to_list(length=100)
+    result = await paginate(collections["applications"], query, page)
+    applications = set_page_headers(response, result)
  
     # Normalize DB statuses before returning
     normalized_apps = []
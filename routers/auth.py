@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
-from jose import JWTError, jwt, ExpiredSignatureError
+from jose import JWTError, ExpiredSignatureError
 from datetime import timedelta, datetime,timezone
 from fastapi.security import HTTPBearer
 from database import collections
@@ -8,8 +8,8 @@ from utils.security import (
     create_access_token,
     create_refresh_token,
     get_current_user,
-    SECRET_KEY,
-    ALGORITHM
+    invalidate_user_cache,
+    decode_token,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
@@ -41,7 +41,7 @@ async def login(username: str, password: str):
 @router.post("/refresh")
 async def refresh_token(refresh_token: str):
     try:
-        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(refresh_token)
         emp_id = payload.get("sub")
         token_type = payload.get("type")
 
@@ -93,6 +93,7 @@ async def logout(current_user=Depends(get_current_user)):
             "blacklisted_at":datetime.now(timezone.utc)
         })
     await collections["refresh_tokens"].delete_many({"employee_id": current_user["employee_id"]})
+    invalidate_user_cache(current_user["employee_id"])
     return {"message": "Logged out successfully"}
 
 
@@ -2,27 +2,39 @@ from fastapi import APIRouter, HTTPException,Depends,Response
 from typing import List, Dict, Any
 from database import resource_request, applications, employees
 from utils.security import get_current_user
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from fastapi import APIRouter, HTTPException, status, Query
 from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from utils.llm_service import parse_resume_with_llm
 # from utils.employee_service import extract_text_from_pdf, save_to_gridfs, extract_text_from_binary, fetch_employee_by_id, update_parsed_resume
-from database import employees,fs
+from database import employees
 from bson import ObjectId
 import base64
 from bson import ObjectId
-from fastapi import Response, HTTPException
+from bson.errors import InvalidId
+from fastapi import Response, HTTPException, Request
 import mimetypes
  
-from utils.employee_service import extract_text_from_bytes, save_to_gridfs
+from utils.employee_service import extract_text_from_bytes, save_to_gridfs, grid_etag, parse_range, stream_grid_out
 from utils.employee_service import (
     fetch_all_employees,
     fetch_employee_by_id,
+    stream_employees,
     _serialize,              
 )
+from fastapi.responses import StreamingResponse
 from database import employees
-from database import get_gridfs
+from database import fs_bucket
+from gridfs.errors import NoFile
+import asyncio
+from utils.pagination import PageParams, paginate, set_page_headers
+from utils.projections import EMPLOYEE_LIST_FIELDS, projection
+from utils.employee_search import search_employees as run_employee_search
+from utils.suggest_index import suggest_index
+from utils.employee_filters import build_filter
+from utils.employee_facets import get_facets
+from utils.indexes import CASE_INSENSITIVE
  
 resume_router = APIRouter(prefix="/resume")
 router = APIRouter(prefix="/employees")
@@ -62,19 +74,22 @@ def role_guard(required_role: str):
 @hm_router.get("/{hm_id}")
 async def get_hm_employees(
     hm_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: Dict[str, Any] = Depends(role_guard("HM"))
    
 ):
     try:
         # Get the job record using `hm_id`
-        job_rr = await resouce_request_col.find_one({"hm_id": hm_id})
+        job_rr = await resouce_request_col.find_one({"hm_id": hm_id}, {"resource_request_id": 1})
         if not job_rr:
             return {"message": f"No job records found for HM ID: {hm_id}."}
  
         job_rr_id = str(job_rr.get("resource_request_id"))
  
         # Get all applications for this job RR ID with status 'Allocated'
-        allocated_apps = await app_col.find({"job_rr_id": job_rr_id, "status": "Allocated"}).to_list(length=100)
+        allocated_apps = await app_col.find({"job_rr_id": job_rr_id, "status": "Allocated"}, {"employee_id": 1}).to_list(length=None)
  
         if not allocated_apps:
             return {"message": "No applications found for this job in 'Allocated' status."}
@@ -82,19 +97,17 @@ async def get_hm_employees(
         # Remove duplicates by converting the list of employee IDs to a set (for unique employee IDs)
         unique_employee_ids = set(int(app["employee_id"]) for app in allocated_apps)
  
-        # Fetch employee data using the unique employee IDs
-        employees_data = await emp_col.find({"employee_id": {"$in": list(unique_employee_ids)}}).to_list(length=100)
+        # Fetch one page of employee data using the unique employee IDs
+        result = await paginate(emp_col, {"employee_id": {"$in": list(unique_employee_ids)}}, page,
+                                projection=projection(EMPLOYEE_LIST_FIELDS, fields), serialize=_serialize)
  
-        if not employees_data:
+        if not result["data"]:
             return {"message": "No employee data found for the allocated employees."}
  
-        # Remove MongoDB internal `_id` field
-        for emp in employees_data:
-            emp["id"] = str(emp.get("_id"))
-            emp.pop("_id", None)
- 
-        return employees_data
+        return set_page_headers(response, result)
  
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
  
@@ -102,11 +115,14 @@ async def get_hm_employees(
 @wfm_router.get("/{wfm_id}")
 async def wfm_view(
     wfm_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: Dict[str, Any] = Depends(role_guard("WFM"))
 ):
     try:
         # Get the jobs for the given `wfm_id`
-        wfm_jobs = await resouce_request_col.find({"wfm_id": wfm_id}).to_list(length=100)
+        wfm_jobs = await resouce_request_col.find({"wfm_id": wfm_id}, {"resource_request_id": 1}).to_list(length=None)
         if not wfm_jobs:
             return {"message": f"No jobs found for WFM ID: {wfm_id}."}
  
@@ -116,7 +132,7 @@ async def wfm_view(
             return {"message": "No valid resource request IDs found for this WFM ID."}
  
         # Get applications for the job RR IDs
-        apps = await app_col.find({"job_rr_id": {"$in": job_rr_ids}}, {"employee_id": 1}).to_list(length=100)
+        apps = await app_col.find({"job_rr_id": {"$in": job_rr_ids}}, {"employee_id": 1}).to_list(length=None)
         if not apps:
             return {"message": "No applications found for these jobs."}
  
@@ -126,52 +142,53 @@ async def wfm_view(
         if not emp_ids:
             return {"message": "No valid employee IDs found in the applications."}
  
-        # Fetch employee data for the found employee IDs
-        result = await emp_col.find({"employee_id": {"$in": list(emp_ids)}}).to_list(length=100)
+        # Fetch one page of employee data for the found employee IDs
+        result = await paginate(emp_col, {"employee_id": {"$in": list(emp_ids)}}, page,
+                                projection=projection(EMPLOYEE_LIST_FIELDS, fields), serialize=_serialize)
  
-        if not result:
+        if not result["data"]:
             return {"message": "No employee data found for the applications."}
  
-        # Remove MongoDB internal `_id` field
-        for r in result:
-            r["id"] = str(r.get("_id"))
-            r.pop("_id", None)
- 
-        return result
+        return set_page_headers(response, result)
  
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
  
 # ---------------- TP Endpoint (only TP Manager role allowed) ----------------
 @tp_router.get("/application_employees")
-async def get_employees_from_applications(current_user: Dict[str, Any] = Depends(role_guard("TP Manager"))):
+async def get_employees_from_applications(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    current_user: Dict[str, Any] = Depends(role_guard("TP Manager"))
+):
     try:
-        # Get all applications and their employee IDs
-        apps = await app_col.find({}, {"employee_id": 1}).to_list(length=100)
-        if not apps:
+        # Get the distinct employee IDs of all applications
+        app_employee_ids = await app_col.distinct("employee_id")
+        if not app_employee_ids:
             return {"message": "No applications found."}
  
-        # Extract unique employee IDs (convert to int and dedupe)
-        employee_ids = {int(app["employee_id"]) for app in apps if app.get("employee_id")}
+        # Convert to int and dedupe
+        employee_ids = {int(emp_id) for emp_id in app_employee_ids if emp_id}
  
         if not employee_ids:
             return {"message": "No valid employee IDs found in the applications."}
  
-        # Fetch employees with the extracted IDs and filter by "Type" set to "TP"
-        employees_data = await emp_col.find({
+        # Fetch one page of employees with the extracted IDs and filter by "Type" set to "TP"
+        result = await paginate(emp_col, {
             "employee_id": {"$in": list(employee_ids)},
             "type": "TP"
-        }).to_list(length=100)
+        }, page, projection=projection(EMPLOYEE_LIST_FIELDS, fields), serialize=_serialize)
  
-        if not employees_data:
+        if not result["data"]:
             return {"message": "No TP employees found for the given applications."}
-        # Remove MongoDB internal `_id` field
-        for emp in employees_data:
-            emp["id"] = str(emp.get("_id"))
-            emp.pop("_id", None)
  
-        return employees_data
+        return set_page_headers(response, result)
  
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
  
@@ -179,74 +196,63 @@ async def get_employees_from_applications(current_user: Dict[str, Any] = Depends
  
 # ====================== SEARCH (FINAL - WITH EMPLOYEE TYPE) ======================
 @router.get("/search")
-async def search_employees(search: str = Query(..., min_length=1)):
+async def search_employees(search: str = Query(..., min_length=1), page: PageParams = Depends(),
+                           fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
    
-    query = {
-        "$or": [
-            {"employee_name": {"$regex": search, "$options": "i"}},
-            {"designation": {"$regex": search, "$options": "i"}},
-            {"primary_technology": {"$regex": search, "$options": "i"}},
-            {"secondary_technology": {"$regex": search, "$options": "i"}},
- 
-            # Employee identifiers
-            {"employee_id": {"$regex": search, "$options": "i"}},
-           
-            # Employee Type fields (both exist in your data)
-            {"type": {"$regex": search, "$options": "i"}},           # e.g. "TP", "Non TP"
-            {"employment_type": {"$regex": search, "$options": "i"}}, # e.g. "Employee"
- 
-            # Location & Grade
-            {"city": {"$regex": search, "$options": "i"}},
-            {"band": {"$regex": search, "$options": "i"}},
-        ]
-    }
- 
-    # Bonus: If search is a full number → also try exact Employee ID match (faster & accurate)
-    if search.strip().isdigit():
-        query["$or"].append({"employee_id": int(search)})
- 
-    cursor = employees.find(query)
-    docs = await cursor.to_list(length=None)
-    result = [_serialize(doc) for doc in docs]
- 
-    return {"count": len(result), "data": result}
- 
+    # Indexed token-prefix search with an exact employee id fast path (utils/employee_search.py)
+    result = await run_employee_search(search, page, projection(EMPLOYEE_LIST_FIELDS, fields))
+    result["data"] = [_serialize(d) for d in result["data"]]
+ 
+    return {"count": len(result["data"]), "data": result["data"], "next": result["next"], "total": result["total"]}
+ 
+# ====================== SUGGEST (TYPE-AHEAD) ======================
+@router.get("/suggest")
+async def suggest_employees(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    # Served from the in-process trigram index (utils/suggest_index.py)
+    if not suggest_index.ready:
+        raise HTTPException(status_code=503, detail="Suggest index is not ready")
+    data = suggest_index.suggest(q, limit)
+    return {"count": len(data), "data": data}
+
+# ====================== FACETS ======================
+@router.get("/facets")
+async def employee_facets():
+    # Counts by type / band / city / primary technology, precomputed after each employee upload
+    doc = await get_facets()
+    return {"total": doc["total"], "facets": doc["facets"], "computed_at": doc["computed_at"]}
+
  # ====================== FILTER ======================
 @router.get("/filter")
 async def filter_employees(
     employee_type: Optional[str] = Query(None, description="TP, Non TP"),
     employment_type: Optional[str] = Query(None, description="Employee, Contractor"),
-    city: Optional[str] = Query(None, description="e.g. Bangalore, Chennai"),
-    band: Optional[str] = Query(None, description="e.g. A3, B1"),
-    designation: Optional[str] = Query(None, description="e.g. Tester III"),
-    primary_tech: Optional[str] = Query(None, alias="primary", description="e.g. Java"),
+    city: Optional[str] = Query(None, description="e.g. Bangalore or Bangalore,Chennai or Ban*"),
+    band: Optional[str] = Query(None, description="e.g. B1 or A3,B1"),
+    designation: Optional[str] = Query(None, description="e.g. Tester III or Tester*"),
+    primary_tech: Optional[str] = Query(None, alias="primary", description="e.g. Java or Java,Python or Jav*"),
     secondary_tech: Optional[str] = Query(None, alias="secondary", description="e.g. Angular"),
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
 ):
  
-    query: Dict[str, Any] = {}
- 
-    if employee_type:
-        query["type"] = {"$regex": f"^{employee_type}$", "$options": "i"}
-    if employment_type:
-        query["employment_type"] = {"$regex": f"^{employment_type}$", "$options": "i"}
-    if city:
-        query["city"] = {"$regex": city, "$options": "i"}
-    if band:
-        query["band"] = {"$regex": band, "$options": "i"}
-    if designation:
-        query["designation"] = {"$regex": designation, "$options": "i"}
-    if primary_tech:
-        query["primary_technology"] = {"$regex": primary_tech, "$options": "i"}
-    if secondary_tech:
-        query["secondary_technology"] = {"$regex": secondary_tech, "$options": "i"}
+    # Exact / $in / anchored-prefix conditions on the indexed `norm` shadow fields
+    query = build_filter({
+        "employee_type": employee_type,
+        "employment_type": employment_type,
+        "city": city,
+        "band": band,
+        "designation": designation,
+        "primary_tech": primary_tech,
+        "secondary_tech": secondary_tech,
+    })
    
-    cursor = employees.find(query)
-    docs = await cursor.to_list(length=None)
-    result = [_serialize(doc) for doc in docs]
+    result = await paginate(employees, query, page, projection=projection(EMPLOYEE_LIST_FIELDS, fields), serialize=_serialize)
  
     return {
-        "count": len(result),
-        "data": result,
+        "count": len(result["data"]),
+        "data": result["data"],
+        "next": result["next"],
+        "total": result["total"],
         "applied_filters": {
             "employee_type": employee_type,
             "employment_type": employment_type,
@@ -265,13 +271,16 @@ async def sort_employees(
     sort_by: str = Query(
         "employee_name",
         description="Field to sort by (case-insensitive)",
-        regex="^(?i)(Employee Name|Employee ID|Designation|Band|City|Type)$"  # ← Magic here
+        regex="^(?i)(Employee[ _]Name|Employee[ _]ID|Designation|Band|City|Type)$"  # ← Magic here
     ),
     order: str = Query(
         "asc",
         description="asc or desc",
         regex="^(?i)(asc|desc)$"  # also accepts ASC, Desc, etc.
-    )
+    ),
+    page: PageParams = Depends(),
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every employee instead of one page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     """
     Sort by:
@@ -281,6 +290,9 @@ async def sort_employees(
     - Band
     - City      ← works with city / City / CITY
     - Type      ← works with type / TYPE
+
+    String fields sort case-insensitively; pages come from the matching
+    sort_<field> index (utils/indexes.py), never an in-memory sort.
     """
     sort_order = 1 if order.lower() == "asc" else -1
  
@@ -294,16 +306,23 @@ async def sort_employees(
         "type": "type",
     }
  
-    normalized = sort_by.strip().lower()
+    # "Employee ID" / "employee_id" / "EMPLOYEE ID" → employee_id
+    normalized = "_".join(sort_by.strip().lower().split())
     db_field = field_map.get(normalized, "employee_name")  # safe fallback
  
-    cursor = employees.find().sort(db_field, sort_order)
-    docs = await cursor.to_list(length=None)
-    result = [_serialize(doc) for doc in docs]
+    fields_projection = projection(EMPLOYEE_LIST_FIELDS, fields)
+    if stream:
+        return streaming_employees({}, [(db_field, sort_order), ("_id", sort_order)], stream, fields_projection,
+                                   collation=CASE_INSENSITIVE)
+
+    result = await paginate(employees, {}, page, sort=[(db_field, sort_order)],
+                            projection=fields_projection, serialize=_serialize, collation=CASE_INSENSITIVE)
  
     return {
-        "count": len(result),
-        "data": result,
+        "count": len(result["data"]),
+        "data": result["data"],
+        "next": result["next"],
+        "total": result["total"],
         "sorted_by": db_field,
         "order": order.lower()
     }
@@ -311,11 +330,29 @@ async def sort_employees(
  
  
 # ====================== LIST ALL EMPLOYEES ======================
+# ?stream=ndjson (one JSON document per line) or ?stream=json (chunked JSON array)
+# returns the whole directory as a streamed body instead of one page
+def streaming_employees(query: Dict[str, Any], sort: Optional[list], fmt: str,
+                        fields_projection: Optional[Dict[str, int]] = None, collation=None) -> StreamingResponse:
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(stream_employees(query, sort, fmt, fields_projection, collation), media_type=media_type)
+
+
 @router.get("/employees", response_model=List[Dict[str, Any]])
-async def get_employees():
+async def get_employees(
+    response: Response,
+    page: PageParams = Depends(),
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every employee instead of one page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    fields_projection = projection(EMPLOYEE_LIST_FIELDS, fields)
+    if stream:
+        return streaming_employees({}, None, stream, fields_projection)
     try:
-        employees_list = await fetch_all_employees()
-        return employees_list
+        result = await fetch_all_employees(page, fields_projection)
+        return set_page_headers(response, result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -371,13 +408,13 @@ async def upload_resume(
  
     # Save original file to GridFS
     try:
-        file_id = save_to_gridfs(file.filename, file_bytes)
+        file_id = await save_to_gridfs(file.filename, file_bytes, file.content_type)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving file to GridFS: {str(e)}")
  
-    # Extract text using the new unified function
+    # Extract text using the new unified function (CPU-bound → worker thread, keeps the loop free)
     try:
-        raw_text = extract_text_from_bytes(file_bytes, file.filename)
+        raw_text = await asyncio.to_thread(extract_text_from_bytes, file_bytes, file.filename)
         extracted_text = clean_text(raw_text) if 'clean_text' in globals() else raw_text.strip()
     except HTTPException:
         raise
@@ -416,8 +453,17 @@ async def upload_resume(
     }
    
  
+async def _open_resume(file_id):
+    """GridFS download stream for file_id, or None if it is not a stored file."""
+    try:
+        oid = ObjectId(file_id) if isinstance(file_id, str) else file_id
+        return await fs_bucket.open_download_stream(oid)
+    except (NoFile, InvalidId, TypeError):
+        return None
+
+
 @router.get("/resume/{employee_id}")
-async def get_employee_resume(employee_id: int,current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_employee_resume(employee_id: int, request: Request, current_user: Dict[str, Any] = Depends(get_current_user)):
     try:
         # Fetch employee with only needed fields
         employee = await employees.find_one(
@@ -428,61 +474,62 @@ async def get_employee_resume(employee_id: int,current_user: Dict[str, Any] = De
         if not employee:
             raise HTTPException(status_code=404, detail="Employee not found")
  
-        file_id = None
+        grid_out = None
         filename = f"Resume_{employee_id}.pdf"
- 
+
         # Step 1: Try correct field first (new uploads)
         if employee.get("resume_file_id"):
-            try:
-                oid = ObjectId(employee["resume_file_id"]) if isinstance(employee["resume_file_id"], str) else employee["resume_file_id"]
-                if get_gridfs().get(oid):
-                    file_id = oid
-                    filename = employee.get("resume") or filename
-            except:
-                pass
- 
+            grid_out = await _open_resume(employee["resume_file_id"])
+            if grid_out:
+                filename = employee.get("resume") or filename
+
         # Step 2: Fallback — old bug: "resume" field has ObjectId string
-        if not file_id and employee.get("resume"):
+        if not grid_out and employee.get("resume"):
             val = employee["resume"]
             if isinstance(val, str) and len(val) == 24 and ObjectId.is_valid(val):
-                try:
-                    oid = ObjectId(val)
-                    if get_gridfs().get(oid):
-                        file_id = oid
-                        name = employee.get("employee_name", "Employee").replace(" ", "_")
-                        filename = f"{name}_Resume.pdf"
-                except:
-                    pass
- 
-        if not file_id:
-            raise HTTPException(status_code=404, detail="No resume uploaded for this employee")
- 
-        # CRITICAL: Use sync GridFS → NO AWAIT!
-        grid_out = get_gridfs().get(file_id)
+                grid_out = await _open_resume(val)
+                if grid_out:
+                    name = employee.get("employee_name", "Employee").replace(" ", "_")
+                    filename = f"{name}_Resume.pdf"
+
         if not grid_out:
-            raise HTTPException(status_code=404, detail="Resume file not found in storage")
- 
-        # Read file content — sync, no await!
-        file_data = grid_out.read()
- 
+            raise HTTPException(status_code=404, detail="No resume uploaded for this employee")
+
         # Get filename safely
         final_filename = grid_out.filename or filename
- 
+
         # Detect MIME type
         mime_type, _ = mimetypes.guess_type(final_filename)
         if not mime_type:
             # Fallback from GridFS metadata or default
-            mime_type = getattr(grid_out, "content_type", None) or "application/pdf"
- 
-        return Response(
-            content=file_data,
-            media_type=mime_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{final_filename}"',
-                "Content-Length": str(grid_out.length),
-                "Cache-Control": "no-cache",
-            }
-        )
+            mime_type = (grid_out.metadata or {}).get("content_type") or "application/pdf"
+
+        # Cacheable, but revalidated on every use (If-None-Match → 304)
+        etag = grid_etag(grid_out)
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, no-cache",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        # Range (partial content) unless If-Range names another version
+        byte_range = None
+        if request.headers.get("if-range", etag) == etag:
+            byte_range = parse_range(request.headers.get("range"), grid_out.length)
+
+        headers["Content-Disposition"] = f'attachment; filename="{final_filename}"'
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{grid_out.length}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(stream_grid_out(grid_out, start, end), status_code=206,
+                                     media_type=mime_type, headers=headers)
+
+        headers["Content-Length"] = str(grid_out.length)
+        return StreamingResponse(stream_grid_out(grid_out), media_type=mime_type, headers=headers)
  
     except HTTPException:
         raise
@@ -3,71 +3,59 @@ import os
 
 from datetime import datetime
 
- 
-import pandas as pd
-from io import BytesIO
- 
-from fastapi import  File, UploadFile, HTTPException,APIRouter,Depends
+from fastapi import  File, UploadFile, HTTPException,APIRouter,Depends,Query
 
 from apscheduler.triggers.interval import IntervalTrigger
 
-from models import Employee, ResourceRequest, User
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from utils.security import get_current_user
 
-from utils.file_upload_utils import log_upload_action,sync_employees_with_db,sync_rr_with_db,read_csv_file,delete_old_files_in_processed,logger,UPLOAD_FOLDER,PROCESSED_FOLDER
+from utils.upload_parsing import parse_employee_upload,parse_rr_upload,run_parser,UploadParseError,StreamingCsvReader,validate_rr_rows
+
+from utils.upload_jobs import (create_upload_job,get_upload_job,heartbeat_upload_jobs,fail_orphaned_upload_jobs,
+                               delete_old_job_files,UPLOAD_JOB_HEARTBEAT_SECONDS,UPLOAD_JOB_STALE_SECONDS)
+
+from utils.file_upload_utils import log_upload_action,sync_employees_with_db,sync_rr_with_db,RRSyncSession,delete_old_files_in_processed,sync_employee_indexes,logger,UPLOAD_FOLDER,PROCESSED_FOLDER,EMPLOYEE_INDEX_SYNC_SECONDS
 
 from exceptions.file_upload_exceptions import FileFormatException,ValidationException,ReportProcessingException
  
  
 file_upload_router = APIRouter(prefix="/api/upload")
+
+UPLOAD_READ_CHUNK_SIZE = int(os.getenv("UPLOAD_READ_CHUNK_SIZE", str(1024 * 1024)))
+RR_STREAM_BATCH_SIZE = int(os.getenv("RR_STREAM_BATCH_SIZE", "2000"))
  
 
+# Parse + validate in the process pool; map worker errors to the API exceptions
+async def parse_upload(parser, *args) -> dict:
+    try:
+        return await run_parser(parser, *args)
+    except UploadParseError as e:
+        if e.kind == "validation":
+            raise ValidationException(e.detail)
+        raise ReportProcessingException(e.detail)
+
 
 # -------------------------------------------------------------------
-# API Endpoints
+# Upload Processing (shared by direct and job mode)
 # -------------------------------------------------------------------
-@file_upload_router.post("/employees")
-async def upload_career_velocity(file: UploadFile = File(...),current_user=Depends(get_current_user)):
-    if current_user["role"] !="Admin":
-        logger.error(f"Unauthorized attempt of logging for employee data upload")
-        return HTTPException(status_code=409,detail="Not Authorized")
-    content = await file.read()
-    if not file.filename.lower().endswith((".xlsx", ".xls", ".csv")):
-        raise FileFormatException("Only .xlsx, .xls, or .csv files allowed")
+async def process_career_velocity(filename: str, content: bytes, uploaded_by: str, progress=None):
+    # Read + validate off the event loop
+    parsed = await parse_upload(parse_employee_upload, filename, content)
+    valid_emps, valid_users, errors = parsed["valid"], parsed["users"], parsed["errors"]
+    if progress:
+        await progress.update(rows_parsed=parsed["total_rows"], rows_validated=len(valid_emps), rows_failed=len(errors))
  
-    # Load file
-    try:
-        df = (pd.read_csv(BytesIO(content), encoding="utf-8", dtype=str, engine="python", on_bad_lines="skip")
-              if file.filename.endswith(".csv") else pd.read_excel(BytesIO(content)))
-        df = df.dropna(how="all")
-    except Exception as e:
-        raise ReportProcessingException(f"Failed to read file: {e}")
- 
-    required = ["Employee ID", "Employee Name", "Designation", "Band", "City", "Type"]
-    if missing := [c for c in required if c not in df.columns]:
-        raise ValidationException(f"Missing columns: {missing}")
- 
-    valid_emps, valid_users, errors = [], [], []
-    for idx, row in df.iterrows():
-        row_dict = {k: None if pd.isna(v) else str(v).strip() for k, v in row.to_dict().items()}
-        try:
-            emp = Employee(**row_dict)
-            user = User(employee_id=str(emp.employee_id), role=emp.type)
-            valid_emps.append(emp)
-            valid_users.append(user)
-        except Exception as e:
-            errors.append({"row": idx + 2, "error": str(e)})
- 
-    await log_upload_action("employees", file.filename,
-                            "CSV" if file.filename.endswith(".csv") else "Excel",
-                            current_user["employee_id"], len(df), len(valid_emps), len(errors), errors[:5])
+    await log_upload_action("employees", filename,
+                            "CSV" if filename.endswith(".csv") else "Excel",
+                            uploaded_by, parsed["total_rows"], len(valid_emps), len(errors), errors[:5])
  
     if not valid_emps:
         return {"message": "No valid employees found", "errors_sample": errors[:5]}
  
-    result = await sync_employees_with_db(valid_emps, valid_users)
+    result = await sync_employees_with_db(valid_emps, valid_users,
+                                          on_progress=progress.add_written if progress else None)
     return {
         "message": "Career Velocity processed successfully",
         "processed": len(valid_emps),
@@ -75,61 +63,183 @@ async def upload_career_velocity(file: UploadFile = File(...),current_user=Depen
         "errors_sample": errors[:5],
         "sync": result
     }
- 
 
-@file_upload_router.post("/rr-report")
-async def upload_rr_report(file: UploadFile = File(...),current_user=Depends(get_current_user)):
-    if current_user["role"] != "HM":
-        logger.error(f"Unauthorized attempt of logging for rr_report upload")
-        return HTTPException(status_code=409,detail="Not Authorized")
-    content = await file.read()
-    if not file.filename.lower().endswith((".xlsx", ".xls", ".csv")):
-        raise FileFormatException("Only Excel/CSV files allowed")
- 
-    try:
-        if file.filename.lower().endswith(".csv"):
-            df = read_csv_file(content)
-
-            if df is None or df.empty:
-                raise ReportProcessingException("CSV file contains no valid rows")
 
-        # ------------------------ EXCEL HANDLING (Pandas) ------------------------
-        else:
-            df = pd.read_excel(BytesIO(content), skiprows=6, dtype=str)
-            df = df.dropna(how="all")
-    except Exception as e:
-        raise ReportProcessingException(f"Failed to read RR report: {e}")
- 
-    if "Resource Request ID" not in df.columns:
-        raise ValidationException("Column 'Resource Request ID' is required")
+async def process_rr_report(filename: str, content: bytes, uploaded_by: str, progress=None):
+    # Read + validate off the event loop
+    parsed = await parse_upload(parse_rr_upload, filename, content)
+    valid_rrs, errors = parsed["valid"], parsed["errors"]
+    if progress:
+        await progress.update(rows_parsed=parsed["total_rows"], rows_validated=len(valid_rrs), rows_failed=len(errors))
  
-    valid_rrs, errors = [], []
-    for idx, row in df.iterrows():
-        rr_id = row.get("Resource Request ID")
-        if not rr_id or pd.isna(rr_id):
-            continue
-        row_dict = {k: None if pd.isna(v) else v for k, v in row.to_dict().items()}
-        row_dict["rr_status"] = True
-        try:
-            valid_rrs.append(ResourceRequest(**row_dict))
-        except Exception as e:
-            errors.append({"row": idx + 8, "rr_id": str(rr_id), "error": str(e)})
- 
-    await log_upload_action("rr_report", file.filename,
-                            "CSV" if file.filename.endswith(".csv") else "Excel",
-                            current_user["employee_id"], len(df), len(valid_rrs), len(errors), errors[:5])
+    await log_upload_action("rr_report", filename,
+                            "CSV" if filename.endswith(".csv") else "Excel",
+                            uploaded_by, parsed["total_rows"], len(valid_rrs), len(errors), errors[:5])
  
     if not valid_rrs:
         return {"message": "No valid RRs found", "errors_sample": errors[:5]}
  
-    await sync_rr_with_db(valid_rrs)
+    result = await sync_rr_with_db(valid_rrs, on_progress=progress.add_written if progress else None)
     return {
         "message": "RR Report processed successfully",
         "valid_requests": len(valid_rrs),
         "failed": len(errors),
-        "errors_sample": errors[:5]
+        "errors_sample": errors[:5],
+        "sync": result
+    }
+
+
+async def process_rr_stream(file: UploadFile, uploaded_by: str):
+    """
+    Streamed RR CSV: read the upload in chunks and validate + sync it in
+    batches of RR_STREAM_BATCH_SIZE rows, so memory follows the batch size
+    rather than the file size.
+    """
+    reader = StreamingCsvReader()
+    session = RRSyncSession()
+    await session.start()
+    pending, start = [], 0
+    total_rows, valid_count, failed_count, errors_sample = 0, 0, 0, []
+
+    async def flush(rows):
+        nonlocal start, total_rows, valid_count, failed_count
+        if "Resource Request ID" not in reader.header:
+            raise ValidationException("Column 'Resource Request ID' is required")
+        batch = await parse_upload(validate_rr_rows, reader.header, rows, start)
+        start += len(rows)
+        if batch["valid"]:
+            await session.write_batch(batch["valid"])
+        # Counted once written, so a partial result only reports finished batches
+        total_rows += batch["total_rows"]
+        valid_count += len(batch["valid"])
+        failed_count += len(batch["errors"])
+        errors_sample.extend(batch["errors"][:5 - len(errors_sample)])
+
+    try:
+        while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+            pending.extend(reader.feed(chunk))
+            while len(pending) >= RR_STREAM_BATCH_SIZE:
+                await flush(pending[:RR_STREAM_BATCH_SIZE])
+                pending = pending[RR_STREAM_BATCH_SIZE:]
+        pending.extend(reader.close())
+
+        if reader.header is None or (not pending and not total_rows):
+            raise ReportProcessingException("Failed to read RR report: CSV file contains no valid rows")
+        while pending:
+            await flush(pending[:RR_STREAM_BATCH_SIZE])
+            pending = pending[RR_STREAM_BATCH_SIZE:]
+    except Exception as e:
+        if not session.uploaded_ids:
+            raise
+        # Earlier batches are already written: report them, and leave every RR
+        # the upload did not reach active (no deactivation from a partial file)
+        raise await partial_rr_stream_error(e, file.filename, uploaded_by, session,
+                                            total_rows, valid_count, failed_count, errors_sample)
+
+    await log_upload_action("rr_report", file.filename, "CSV", uploaded_by,
+                            total_rows, valid_count, failed_count, errors_sample)
+
+    if not valid_count:
+        return {"message": "No valid RRs found", "errors_sample": errors_sample}
+
+    # Deactivation needs every uploaded id, so it runs after the last batch
+    result = await session.finish()
+    return {
+        "message": "RR Report processed successfully",
+        "valid_requests": valid_count,
+        "failed": failed_count,
+        "errors_sample": errors_sample,
+        "sync": result
     }
 
+
+async def partial_rr_stream_error(error: Exception, filename: str, uploaded_by: str, session: RRSyncSession,
+                                  total_rows: int, valid_count: int, failed_count: int, errors_sample: list):
+    detail = error.detail if isinstance(error, HTTPException) else str(error)
+    logger.error(f"Streamed RR upload {filename} stopped after {total_rows} rows: {detail}")
+    result = None
+    try:
+        await log_upload_action("rr_report", filename, "CSV", uploaded_by,
+                                total_rows, valid_count, failed_count, errors_sample)
+        result = await session.finish(deactivate=False)
+    except Exception as e:
+        logger.error(f"Could not close partial RR sync for {filename}: {e}")
+    return HTTPException(
+        status_code=error.status_code if isinstance(error, HTTPException) else 500,
+        detail={
+            "message": "RR Report partially processed: the upload stopped before the end of the file",
+            "error": detail,
+            "rows_processed": total_rows,
+            "valid_requests": valid_count,
+            "failed": failed_count,
+            "errors_sample": errors_sample,
+            "sync": result,
+        },
+    )
+
+
+def queued_response(job_id: str):
+    return {"message": "Upload queued", "job_id": job_id, "status_url": f"/api/upload/jobs/{job_id}"}
+
+
+# -------------------------------------------------------------------
+# API Endpoints
+# -------------------------------------------------------------------
+@file_upload_router.post("/employees")
+async def upload_career_velocity(file: UploadFile = File(...),current_user=Depends(get_current_user),
+                                 async_job: bool = Query(False, description="Queue the upload and return a job id")):
+    if current_user["role"] !="Admin":
+        logger.error(f"Unauthorized attempt of logging for employee data upload")
+        return HTTPException(status_code=409,detail="Not Authorized")
+    content = await file.read()
+    if not file.filename.lower().endswith((".xlsx", ".xls", ".csv")):
+        raise FileFormatException("Only .xlsx, .xls, or .csv files allowed")
+ 
+    if async_job:
+        job_id = await create_upload_job("employees", file.filename, content,
+                                         current_user["employee_id"], process_career_velocity)
+        return queued_response(job_id)
+    return await process_career_velocity(file.filename, content, current_user["employee_id"])
+ 
+
+@file_upload_router.post("/rr-report")
+async def upload_rr_report(file: UploadFile = File(...),current_user=Depends(get_current_user),
+                           async_job: bool = Query(False, description="Queue the upload and return a job id")):
+    if current_user["role"] != "HM":
+        logger.error(f"Unauthorized attempt of logging for rr_report upload")
+        return HTTPException(status_code=409,detail="Not Authorized")
+    content = await file.read()
+    if not file.filename.lower().endswith((".xlsx", ".xls", ".csv")):
+        raise FileFormatException("Only Excel/CSV files allowed")
+ 
+    if async_job:
+        job_id = await create_upload_job("rr_report", file.filename, content,
+                                         current_user["employee_id"], process_rr_report)
+        return queued_response(job_id)
+    return await process_rr_report(file.filename, content, current_user["employee_id"])
+
+
+# Large RR CSV reports: chunked read, batched validation and sync
+@file_upload_router.post("/rr-report/stream")
+async def upload_rr_report_stream(file: UploadFile = File(...),current_user=Depends(get_current_user)):
+    if current_user["role"] != "HM":
+        logger.error(f"Unauthorized attempt of logging for rr_report upload")
+        return HTTPException(status_code=409,detail="Not Authorized")
+    if not file.filename.lower().endswith(".csv"):
+        raise FileFormatException("Only CSV files can be streamed")
+    return await process_rr_stream(file, current_user["employee_id"])
+
+
+# Progress and final sync counts of a queued upload (uploader or Admin only)
+@file_upload_router.get("/jobs/{job_id}")
+async def get_upload_job_status(job_id: str, current_user=Depends(get_current_user)):
+    job = await get_upload_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    if current_user["role"] != "Admin" and job["uploaded_by"] != current_user["employee_id"]:
+        raise HTTPException(status_code=403, detail="Not Authorized")
+    return job
+
 # -------------------------------------------------------------------
 # Auto-processing (watch folder)
 # -------------------------------------------------------------------
@@ -146,8 +256,8 @@ async def process_updated_rr_report():
  
     try:
         with open(src, "rb") as f:
-            fake_file = UploadFile(filename=latest, file=BytesIO(f.read()))
-        await upload_rr_report(fake_file,{"role":"HM","employee_id":"system"})
+            content = f.read()
+        await process_rr_report(latest, content, "system")
         os.rename(src, dst)
         logger.info(f"Auto-processed RR: {latest} → processed/")
     except Exception as e:
@@ -156,5 +266,9 @@ async def process_updated_rr_report():
 scheduler = AsyncIOScheduler()
 scheduler.add_job(process_updated_rr_report, IntervalTrigger(hours=24), id="process_updated_files")
 scheduler.add_job(delete_old_files_in_processed,  IntervalTrigger(days=1) , id="delete_old_files")
+scheduler.add_job(sync_employee_indexes, IntervalTrigger(seconds=EMPLOYEE_INDEX_SYNC_SECONDS), id="sync_employee_indexes")
+scheduler.add_job(heartbeat_upload_jobs, IntervalTrigger(seconds=UPLOAD_JOB_HEARTBEAT_SECONDS), id="heartbeat_upload_jobs")
+scheduler.add_job(fail_orphaned_upload_jobs, IntervalTrigger(seconds=UPLOAD_JOB_STALE_SECONDS), id="fail_orphaned_upload_jobs")
+scheduler.add_job(delete_old_job_files, IntervalTrigger(hours=1), id="delete_old_job_files")
 scheduler.start()
  
\ No newline at end of file
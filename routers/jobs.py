@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import Optional, List, Union, Any
-from fastapi import Body
+from fastapi import Body, Query
 from models import ResourceRequest
 from utils import jobs_crud
 from utils.security import get_current_user
+from utils.file_upload_utils import refresh_recommendations
+from utils.pagination import PageParams, set_page_headers
 
 
 # Create a router with the prefix /jobs
@@ -12,14 +14,20 @@ jobs_router = APIRouter(prefix="/jobs")
 
 # Endpoint to get all jobs with optional location filter
 # Accessible by any authenticated user
+# One page per call; the next page token is returned in the X-Next-Cursor header
 @jobs_router.get("/", response_model=List[dict])
-async def get_all_jobs(location: Optional[str] = None, current_user=Depends(get_current_user)):
+async def get_all_jobs(response: Response, location: Optional[str] = None, page: PageParams = Depends(),
+                       current_user=Depends(get_current_user)):
     # Delegates job fetching logic to jobs_crud
-    return await jobs_crud.get_jobs(location, current_user)
+    result = await jobs_crud.get_jobs(location, current_user, page)
+    return set_page_headers(response, result) if result and "data" in result else result
 
 @jobs_router.get("/managers",response_model=List[dict])
-async def get_jobs_under_manager(current_user=Depends(get_current_user)):
-    return await jobs_crud.jobs_under_manager(current_user)
+async def get_jobs_under_manager(response: Response, page: PageParams = Depends(),
+                                 fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+                                 current_user=Depends(get_current_user)):
+    result = await jobs_crud.jobs_under_manager(current_user, page, fields)
+    return set_page_headers(response, result) if result and "data" in result else result
 
 # Endpoint to create a new job
 # Only HM (Hiring Manager) is authorized
@@ -47,6 +55,7 @@ async def update_job(request_id: str, updated_job: ResourceRequest, current_user
     try:
         # Update both job and resource request based on ID
         await jobs_crud.update_resource_request(request_id, updated_job, current_user)
+        await refresh_recommendations("rrs", [request_id])
         return {"detail": "Job Updated Successfully"}
     except Exception as e:
         # Handle errors during update
@@ -57,18 +66,23 @@ async def update_job(request_id: str, updated_job: ResourceRequest, current_user
 # Only HM (Hiring Manager) is authorized
 # Returns all required skills from their resource requests and the count of employees skilled in each
 # Optional filters: resource_request_id (filter by specific request) and skill (filter by specific skill)
+# employees_offset / employees_limit page the employee list returned for each skill
 @jobs_router.get("/skills/availability")
 async def get_skills_availability(
     current_user=Depends(get_current_user),
     resource_request_id: Optional[str] = None,
-    skill: Optional[str] = None
+    skill: Optional[str] = None,
+    employees_offset: int = Query(0, ge=0),
+    employees_limit: Optional[int] = Query(None, ge=1, le=1000)
 ):
     # Check if user is HM
     if current_user["role"] != "HM":
         raise HTTPException(status_code=403, detail="Not Authorized")
     try:
         # Call CRUD function to get skills availability with optional filters
-        skills_data = await jobs_crud.get_skills_availability(current_user, resource_request_id, skill)
+        skills_data = await jobs_crud.get_skills_availability(
+            current_user, resource_request_id, skill, employees_offset, employees_limit
+        )
         return skills_data
     except Exception as e:
         # Handle errors
@@ -90,6 +104,7 @@ async def patch_resource_request(
     try:
         result = await jobs_crud.patch_resource_request_single(request_id, key, value, current_user)
         if result:
+            await refresh_recommendations("rrs", [request_id])
             return {"detail": "ResourceRequest patched successfully"}
         else:
             raise HTTPException(status_code=400, detail="No document updated")
@@ -110,6 +125,7 @@ async def delete_resource_request(
     try:
         result = await jobs_crud.delete_resource_request(request_id, current_user)
         if result:
+            await refresh_recommendations("rrs", [request_id])
             return {"detail": "ResourceRequest Deleted successfully"}
         else:
             raise HTTPException(status_code=400, detail="No document Found")
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from database import collections
 from utils.security import get_current_user
+from utils.skill_index import skill_index, normalize_skill
+from utils.candidate_ranking import candidate_matrix
+from utils.pagination import PageParams, paginate, set_page_headers
 from datetime import datetime
+import heapq
 from typing import List,Literal,Dict,Any,Optional
 
 manager_router = APIRouter(prefix="/api/manager", tags=["Manager Workflow"])
@@ -19,7 +23,7 @@ async def log_audit(action: str, app_id: str, performed_by: str, details: dict =
     await collections["audit_logs"].insert_one(log_entry)
 
 # Role-based filtering of applications
-async def get_manager_applications(current_user: dict):
+async def get_manager_applications(current_user: dict, page: PageParams):
     role = current_user["role"]
     emp_id = current_user["employee_id"]
 
@@ -43,13 +47,14 @@ async def get_manager_applications(current_user: dict):
     else:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    cursor = collections["applications"].find(query).sort("updated_at", -1)
-    return await cursor.to_list(200)
+    # Newest first, one page at a time
+    return await paginate(collections["applications"], query, page, sort=[("updated_at", -1)])
 
 
 @manager_router.get("/applications")
-async def list_applications(current_user: dict = Depends(get_current_user)):
-    return await get_manager_applications(current_user)
+async def list_applications(response: Response, page: PageParams = Depends(),
+                            current_user: dict = Depends(get_current_user)):
+    return set_page_headers(response, await get_manager_applications(current_user, page))
 
 
 # --- Status Transition Endpoints ---
@@ -239,6 +244,12 @@ async def get_skill_matches(
         description="Only return candidates with skill match ≥ this percentage",
         example=70.0
     ),
+    top_k: Optional[int] = Query(
+        None,
+        ge=1,
+        le=1000,
+        description="Only return the best top_k candidates"
+    ),
     current_user: dict = Depends(get_current_user)
 ):
 
@@ -247,64 +258,148 @@ async def get_skill_matches(
     if not job:
         raise HTTPException(status_code=404, detail="Job RR not found")
 
-    required_skills = job.get("required_skills", [])
+    # RR documents carry mandatory/optional skills; required_skills is the job view of both
+    required_skills = job.get("required_skills") or (job.get("mandatory_skills") or []) + (job.get("optional_skills") or [])
     if not required_skills:
         return {"message": "No required skills defined for this job"}
 
     # Normalize required skills once
-    req_skills = {skill.strip().lower() for skill in required_skills}
+    req_skills = {normalize_skill(skill) for skill in required_skills}
 
     # Fetch all submitted applications
-    applications = await collections["applications"].find({
-        "job_rr_id": job_rr_id,
-        "status": "Submitted"
-    }).to_list(1000)
-
-    results = []
-
+    applications = await collections["applications"].find(
+        {"job_rr_id": job_rr_id, "status": "Submitted"},
+        {"_id": 1, "employee_id": 1}
+    ).to_list(1000)
+
+    # Fetch every referenced employee in one query, projected to what the match uses
+    projection = {"_id": 0, "employee_id": 1, "employee_name": 1, "designation": 1, "city": 1}
+    emp_ids = list({int(app["employee_id"]) for app in applications})
+    employees = await collections["employees"].find(
+        {"employee_id": {"$in": emp_ids}}, projection
+    ).to_list(None) if emp_ids else []
+    by_id = {emp["employee_id"]: emp for emp in employees}
+
+    # Skills come from the in-memory index; employees it does not hold (index
+    # not built yet, or not indexed) get detailed_skills from the documents
+    unindexed = [emp_id for emp_id in by_id if skill_index.skills_of(emp_id) is None]
+    if unindexed:
+        async for doc in collections["employees"].find(
+            {"employee_id": {"$in": unindexed}}, {"_id": 0, "employee_id": 1, "detailed_skills": 1}
+        ):
+            by_id[doc["employee_id"]]["detailed_skills"] = doc.get("detailed_skills") or []
+
+    # Score every candidate: (match %, matched count, application, employee, skills)
+    scored = []
     for app in applications:
-        employee_id = app["employee_id"]
-
-        # Fetch employee profile
-        employee = await collections["employees"].find_one({"employee_id": int(employee_id)})
+        employee = by_id.get(int(app["employee_id"]))
         if not employee:
             continue
 
-        emp_skills = {
-            skill.strip().lower()
-            for skill in employee.get("Detailed Skill Set (List of top skills on profile)", [])
-        }
+        # Normalized skills from the in-memory index; fall back to the document
+        emp_skills = skill_index.skills_of(employee["employee_id"])
+        if emp_skills is None:
+            emp_skills = {normalize_skill(skill) for skill in employee.get("detailed_skills", [])}
 
-        # Calculate match percentage
-        matched_count = len(emp_skills.intersection(req_skills))
-        match_percentage = (matched_count / len(req_skills)) * 100 if req_skills else 0
+        matched_count = len(req_skills.intersection(emp_skills))
+        match_percentage = (matched_count / len(req_skills)) * 100
 
         # Apply filter if min_match is provided
         if min_match is not None and match_percentage < min_match:
             continue
+        scored.append((match_percentage, matched_count, app, employee, emp_skills))
 
-        results.append({
+    # Highest match first; with top_k only the best candidates are kept and serialized
+    if top_k is not None:
+        scored = heapq.nlargest(top_k, scored, key=lambda x: x[0])
+    else:
+        scored.sort(key=lambda x: x[0], reverse=True)
+
+    results = [
+        {
             "application_id": str(app["_id"]),
-            "employee_id": employee_id,
-            "employee_name": employee.get("Employee Name", "Unknown"),
-            "current_designation": employee.get("Designation"),
-            "location": employee.get("City"),
+            "employee_id": app["employee_id"],
+            "employee_name": employee.get("employee_name", "Unknown"),
+            "current_designation": employee.get("designation"),
+            "location": employee.get("city"),
             "match_percentage": round(match_percentage, 2),
             "matched_skills": list(emp_skills.intersection(req_skills)),
             "missing_skills": list(req_skills - emp_skills),
             "total_required_skills": len(req_skills),
             "skills_matched_count": matched_count
-        })
-
-    # Sort by highest match first
-    results.sort(key=lambda x: x["match_percentage"], reverse=True)
+        }
+        for match_percentage, matched_count, app, employee, emp_skills in scored
+    ]
 
     return {
         "job_rr_id": job_rr_id,
-        "job_title": job.get("title"),
+        "job_title": job.get("title") or job.get("project_name"),
         "total_applications": len(applications),
         "candidates_returned": len(results),
         "required_skills": list(req_skills),
         "min_match_filter_applied": min_match,
+        "top_k_applied": top_k,
         "candidates": results
-    }
\ No newline at end of file
+    }
+
+
+# Rank all active employees (not just applicants) against an RR:
+# weighted mandatory/optional skills, band proximity and location
+@manager_router.get("/rank/{job_rr_id}")
+async def rank_candidates(
+    job_rr_id: str,
+    top_k: int = Query(20, ge=1, le=500, description="Number of best candidates to return"),
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user["role"] not in ["HM", "WFM", "TP Manager", "Admin"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    if not candidate_matrix.ready:
+        raise HTTPException(status_code=503, detail="Candidate ranking is not ready")
+
+    job = await collections["resource_request"].find_one(
+        {"resource_request_id": job_rr_id},
+        {"_id": 0, "resource_request_id": 1, "project_name": 1, "job_grade": 1, "city": 1,
+         "mandatory_skills": 1, "optional_skills": 1}
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job RR not found")
+
+    ranked = candidate_matrix.rank(job, top_k)
+
+    # Names/designations for the returned candidates only
+    employees = await collections["employees"].find(
+        {"employee_id": {"$in": [emp_id for emp_id, *_ in ranked]}},
+        {"_id": 0, "employee_id": 1, "employee_name": 1, "designation": 1, "band": 1, "city": 1}
+    ).to_list(None) if ranked else []
+    by_id = {emp["employee_id"]: emp for emp in employees}
+
+    mandatory = {normalize_skill(s) for s in job.get("mandatory_skills") or []}
+    optional = {normalize_skill(s) for s in job.get("optional_skills") or []} - mandatory
+    candidates = []
+    for emp_id, score, skill_score, band_score, location_score in ranked:
+        emp = by_id.get(emp_id, {})
+        emp_skills = skill_index.skills_of(emp_id) or frozenset()
+        candidates.append({
+            "employee_id": emp_id,
+            "employee_name": emp.get("employee_name"),
+            "designation": emp.get("designation"),
+            "band": emp.get("band"),
+            "city": emp.get("city"),
+            "score": round(score, 4),
+            "skill_score": round(skill_score, 4),
+            "band_score": round(band_score, 4),
+            "location_score": round(location_score, 4),
+            "matched_mandatory_skills": sorted(mandatory & emp_skills),
+            "missing_mandatory_skills": sorted(mandatory - emp_skills),
+            "matched_optional_skills": sorted(optional & emp_skills),
+        })
+
+    return {
+        "job_rr_id": job_rr_id,
+        "job_title": job.get("project_name"),
+        "job_grade": job.get("job_grade"),
+        "city": job.get("city"),
+        "employees_ranked": candidate_matrix.active_count,
+        "candidates_returned": len(candidates),
+        "candidates": candidates
+    }
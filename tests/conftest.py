@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# -------------------------------------------------------------------
+# Test configuration
+# -------------------------------------------------------------------
+# Tests that need a database run against MONGODB_TEST_URI (a local mongod by
+# default) in a throwaway database, and are skipped when none is reachable.
+#
+#   MONGODB_TEST_URI=mongodb://localhost:27017 python -m pytest -q tests
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI", "mongodb://localhost:27017")
+MONGODB_TEST_DB = os.getenv("MONGODB_TEST_DB", "talent_management_test")
+
+# database.py refuses to import without a connection string; point the app at
+# the test server and keep the .env one from being used
+os.environ["MONGODB_CLIENT"] = MONGODB_TEST_URI
+os.environ["ATLAS_DB_NAME"] = MONGODB_TEST_DB
+os.environ["LLM_ENABLED"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def mongo_uri():
+    try:
+        MongoClient(MONGODB_TEST_URI, serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError as e:
+        pytest.skip(f"no mongod at {MONGODB_TEST_URI}: {e}")
+    return MONGODB_TEST_URI
+
+
+# The app's Motor client binds to the first loop that uses it, so every test
+# runs its coroutines on this one loop (loop.run_until_complete)
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def test_db(mongo_uri, loop):
+    import database
+    from utils.upload_parsing import shutdown_parse_pool
+
+    loop.run_until_complete(database.client.drop_database(MONGODB_TEST_DB))
+    yield database.db
+    loop.run_until_complete(database.client.drop_database(MONGODB_TEST_DB))
+    shutdown_parse_pool()
+
+
+ADMIN = {"employee_id": "1", "role": "Admin"}
+
+
+@pytest.fixture(scope="session")
+def client(test_db, loop):
+    """httpx client calling the app in-process, authenticated as an Admin."""
+    import httpx
+    from utils.security import get_current_user
+
+    async def import_app():
+        # routers/file_upload.py starts its scheduler on import: needs the loop running
+        from main import app
+        return app
+
+    app = loop.run_until_complete(import_app())
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=120)
+    yield client
+    loop.run_until_complete(client.aclose())
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def latency_probe(client):
+    """
+    probe(path, busy) requests `path` back to back until the `busy` task is
+    done and returns each request's latency in seconds. A handler that blocks
+    the event loop shows up as a latency as long as the blocking work.
+    """
+    async def probe(path: str, busy: asyncio.Task, interval: float = 0.02) -> list:
+        latencies = []
+        while not busy.done():
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+            await asyncio.sleep(interval)
+        return latencies
+    return probe
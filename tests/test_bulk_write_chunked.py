@@ -0,0 +1,30 @@
+import asyncio
+
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from utils.file_upload_utils import bulk_write_chunked
+
+
+class DuplicateKeyCollection:
+    """Fails the first op of every chunk with a duplicate key error."""
+    def __init__(self, name: str):
+        self.name = name
+
+    async def bulk_write(self, ops, ordered):
+        raise BulkWriteError({
+            "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}],
+            "nInserted": len(ops) - 1,
+        })
+
+
+def test_write_errors_name_their_collection():
+    ops = [InsertOne({"employee_id": i}) for i in range(4)]
+
+    result = asyncio.run(bulk_write_chunked(DuplicateKeyCollection("users"), ops, chunk_size=2))
+
+    assert result["inserted"] == 2
+    assert result["errors"] == [
+        {"collection": "users", "chunk": 0, "index": 0, "code": 11000, "error": "E11000 duplicate key"},
+        {"collection": "users", "chunk": 1, "index": 2, "code": 11000, "error": "E11000 duplicate key"},
+    ]
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import HTTPException
+
+from utils.employee_filters import FILTER_FIELDS, MAX_FILTER_VALUES, build_filter, explain_filter, normalized_fields
+from utils.indexes import ensure_indexes
+
+# Every /employees/filter parameter must be answered from an index (IXSCAN),
+# both for exact values and for prefix* matches.
+EXPECTED_INDEX = {
+    "employee_type": "norm_type_employment_type",
+    "employment_type": "norm_employment_type",
+    "city": "norm_city",
+    "band": "norm_band",
+    "designation": "norm_designation",
+    "primary_tech": "norm_primary_technology",
+    "secondary_tech": "norm_secondary_technology",
+}
+SAMPLE_VALUES = {
+    "type": ["TP", "Non TP"],
+    "employment_type": ["Full Time", "Contract"],
+    "city": ["Chennai", "Bangalore", "Kochi"],
+    "band": ["B1", "B2", "C1"],
+    "designation": ["Developer", "Senior Developer", "Architect"],
+    "primary_technology": ["Java", "Python", "JavaScript"],
+    "secondary_technology": ["SQL", "AWS", "Docker"],
+}
+FILTER_VALUES = {
+    "employee_type": "TP",
+    "employment_type": "full time",
+    "city": "Chennai",
+    "band": "B1,B2",
+    "designation": "Developer",
+    "primary_tech": "Java",
+    "secondary_tech": "SQL",
+}
+
+
+def _employee(i: int) -> dict:
+    doc = {"employee_id": i, "employee_name": f"Employee {i}"}
+    for field, values in SAMPLE_VALUES.items():
+        doc[field] = values[i % len(values)]
+    return dict(doc, **normalized_fields(doc))
+
+
+@pytest.fixture(scope="module")
+def employees(test_db, loop):
+    async def setup():
+        await test_db.employees.drop()
+        await test_db.employees.insert_many([_employee(i) for i in range(500)])
+        await ensure_indexes(test_db)
+
+    loop.run_until_complete(setup())
+    yield
+    loop.run_until_complete(test_db.employees.drop())
+
+
+def test_every_filter_parameter_has_an_expected_index():
+    assert set(EXPECTED_INDEX) == set(FILTER_FIELDS)
+
+
+def test_filter_accepts_max_values():
+    values = ",".join(f"city{i}" for i in range(MAX_FILTER_VALUES))
+    assert len(build_filter({"city": values})["norm.city"]["$in"]) == MAX_FILTER_VALUES
+
+
+def test_filter_rejects_too_many_values():
+    values = ",".join(f"city{i}" for i in range(MAX_FILTER_VALUES + 1))
+    with pytest.raises(HTTPException) as e:
+        build_filter({"city": values})
+    assert e.value.status_code == 400
+    assert "city" in e.value.detail
+
+
+@pytest.mark.parametrize("param", sorted(FILTER_FIELDS))
+@pytest.mark.parametrize("prefix", [False, True], ids=["exact", "prefix"])
+def test_filter_uses_index(employees, loop, param, prefix):
+    value = FILTER_VALUES[param]
+    if prefix:
+        value = value.split(",")[0][:2] + "*"
+
+    result = loop.run_until_complete(explain_filter({param: value}))
+
+    assert "COLLSCAN" not in result["stages"], result
+    assert "IXSCAN" in result["stages"], result
+    assert EXPECTED_INDEX[param] in result["indexes"], result
+    assert result["returned"] > 0, result
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from benchmarks.synthetic import employee_rows
+from utils.file_upload_utils import sync_employees_with_db
+from utils.upload_parsing import parse_employee_upload
+
+
+def test_rows_written_counts_employee_rows_only(test_db, loop):
+    content = pd.DataFrame(employee_rows(20, bad_rate=0)).to_csv(index=False).encode()
+    parsed = parse_employee_upload("employees.csv", content)
+    employees, users = parsed["valid"], parsed["users"]
+    written = []
+
+    async def on_progress(count):
+        written.append(count)
+
+    async def run():
+        await test_db.employees.delete_many({})
+        await test_db.users.delete_many({})
+        # One existing inactive employee: reactivated and updated by the upload
+        await test_db.employees.insert_one({"employee_id": employees[0].employee_id, "status": False})
+        result = await sync_employees_with_db(employees, users, on_progress=on_progress)
+        reactivated = await test_db.employees.find_one({"employee_id": employees[0].employee_id})
+        return result, reactivated
+
+    result, reactivated = loop.run_until_complete(run())
+
+    assert sum(written) == len(employees) == 20
+    assert result["employees_inserted"] == 19 and result["employees_updated"] == 1
+    assert result["users_inserted"] == 20
+    assert reactivated["status"] is True
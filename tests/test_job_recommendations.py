@@ -0,0 +1,32 @@
+from utils import job_recommendations
+from utils.job_recommendations import OpenRRs
+from utils.jobs_crud import map_job
+
+EMPLOYEE = {"employee_id": 1, "band": "B2", "detailed_skills": ["Java", "SQL"]}
+
+
+def _rrs(count: int) -> OpenRRs:
+    return OpenRRs([{
+        "resource_request_id": f"RR{i}", "project_name": f"Project {i}", "job_grade": "B2",
+        "mandatory_skills": ["Java", "SQL"] if i % 2 else ["Java"], "city": "Chennai",
+    } for i in range(count)])
+
+
+def test_stored_rows_have_the_live_query_shape(loop):
+    rrs = _rrs(3)
+    jobs, truncated = loop.run_until_complete(rrs.rank_for(EMPLOYEE))
+
+    live = loop.run_until_complete(map_job(rrs.by_id["RR0"]))
+    assert not truncated
+    assert [set(job) for job in jobs] == [set(live)] * 3
+    # Two matched skills rank first
+    assert [job["rr_id"] for job in jobs] == ["RR1", "RR0", "RR2"]
+
+
+def test_list_past_the_cap_is_marked_truncated(loop, monkeypatch):
+    monkeypatch.setattr(job_recommendations, "RECOMMENDATIONS_PER_EMPLOYEE", 5)
+    jobs, truncated = loop.run_until_complete(_rrs(5).rank_for(EMPLOYEE))
+    assert len(jobs) == 5 and not truncated
+
+    jobs, truncated = loop.run_until_complete(_rrs(6).rank_for(EMPLOYEE))
+    assert len(jobs) == 5 and truncated
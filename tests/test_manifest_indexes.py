@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.employee_filters import _stages
+from utils.indexes import INDEX_MANIFEST, ensure_indexes
+
+# The router queries the index manifest (utils/indexes.py) was built for must
+# be answered from an index: IXSCAN on the expected index, no COLLSCAN.
+NOW = datetime.now(timezone.utc)
+
+# (id, collection, filter, sort, expected index)
+QUERIES = [
+    ("rr_by_hm", "resource_request", {"hm_id": "H1"}, None, "hm_id"),
+    ("rr_by_wfm", "resource_request", {"wfm_id": "W1"}, None, "wfm_id"),
+    ("rr_by_id", "resource_request", {"resource_request_id": "RR1"}, None, "resource_request_id"),
+    ("tp_jobs", "resource_request",
+     {"flag": True, "job_grade": {"$in": ["B1", "B2", "B3"]}, "mandatory_skills": {"$in": ["Java"]}, "city": "Chennai"},
+     None, "flag_job_grade_city"),
+    ("applications_for_rr", "applications", {"job_rr_id": "RR1", "status": "Submitted"}, None, "job_rr_id_status"),
+    ("duplicate_application", "applications", {"employee_id": "1", "job_rr_id": "RR1"}, None, "employee_id_job_rr_id"),
+    ("applications_by_status", "applications", {"status": "Selected"}, [("updated_at", -1)], "status_updated_at"),
+    ("user_by_employee", "users", {"employee_id": "1"}, None, "employee_id"),
+    ("refresh_token", "refresh_tokens", {"token": "token-1"}, None, "token"),
+    ("last_refresh_token", "refresh_tokens", {"employee_id": "1"}, [("created_at", -1)], "employee_id_created_at"),
+    ("block_listed_token", "block_list_tokens", {"token": "token-1"}, None, "token"),
+    ("recommendations_for_rr", "job_recommendations", {"jobs.rr_id": {"$in": ["RR1", "RR2"]}}, None, "jobs_rr_id"),
+    ("orphaned_upload_jobs", "upload_jobs",
+     {"status": {"$in": ["queued", "running"]}, "updated_at": {"$lt": NOW}}, None, "status_updated_at"),
+]
+
+
+def _documents(count: int = 200) -> dict:
+    return {
+        "resource_request": [{
+            "resource_request_id": f"RR{i}", "hm_id": f"H{i % 10}", "wfm_id": f"W{i % 10}",
+            "flag": i % 2 == 0, "job_grade": ["B1", "B2", "B3", "C1"][i % 4], "city": ["Chennai", "Kochi"][i % 2],
+            "mandatory_skills": ["Java", "SQL"] if i % 3 else ["Python"],
+        } for i in range(count)],
+        "applications": [{
+            "employee_id": str(i % 50), "job_rr_id": f"RR{i % 20}",
+            "status": ["Submitted", "Shortlisted", "Selected"][i % 3], "updated_at": NOW - timedelta(minutes=i),
+        } for i in range(count)],
+        "users": [{"employee_id": str(i), "role": "TP"} for i in range(count)],
+        "refresh_tokens": [{
+            "token": f"token-{i}", "employee_id": str(i % 50), "created_at": NOW - timedelta(minutes=i),
+            "expires_at": NOW + timedelta(days=7),
+        } for i in range(count)],
+        "block_list_tokens": [{"token": f"token-{i}", "blacklisted_at": NOW} for i in range(count)],
+        "job_recommendations": [{
+            "_id": i, "jobs": [{"rr_id": f"RR{(i + k) % count}", "score": k} for k in range(5)],
+        } for i in range(count)],
+        "upload_jobs": [{
+            "_id": f"job-{i}", "status": ["queued", "running", "completed", "failed"][i % 4],
+            "updated_at": NOW - timedelta(minutes=i),
+        } for i in range(count)],
+    }
+
+
+@pytest.fixture(scope="module")
+def seeded(test_db, loop):
+    documents = _documents()
+
+    async def setup():
+        for name, docs in documents.items():
+            await test_db[name].drop()
+            await test_db[name].insert_many(docs)
+        await ensure_indexes(test_db)
+
+    loop.run_until_complete(setup())
+    yield
+    loop.run_until_complete(asyncio.gather(*(test_db[name].drop() for name in documents)))
+
+
+def test_every_manifest_collection_is_explained():
+    # employees is covered by test_employee_filter_indexes
+    assert {q[1] for q in QUERIES} == set(INDEX_MANIFEST) - {"employees"}
+
+
+@pytest.mark.parametrize("collection, query, sort, index", [q[1:] for q in QUERIES], ids=[q[0] for q in QUERIES])
+def test_router_query_uses_manifest_index(seeded, test_db, loop, collection, query, sort, index):
+    async def explain():
+        cursor = test_db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.explain()
+
+    plan = loop.run_until_complete(explain())
+    stages = list(_stages(plan["queryPlanner"]["winningPlan"]))
+    names = [s.get("stage") for s in stages]
+
+    assert "COLLSCAN" not in names, names
+    assert "IXSCAN" in names, names
+    assert index in [s["indexName"] for s in stages if s.get("stage") == "IXSCAN"], names
@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+import fitz  # PyMuPDF
+
+# A 10MB resume going into or out of GridFS must not hold up other requests:
+# every /jobs/ probe during the transfer has to finish within MAX_PROBE_SECONDS.
+RESUME_BYTES = 10 * 1024 * 1024
+MAX_PROBE_SECONDS = 0.5
+EMPLOYEE_ID = 424242
+
+
+def _resume_pdf() -> bytes:
+    # One page of text plus an incompressible attachment, ~10MB on disk
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Test Employee - Java, SQL, AWS")
+    doc.embfile_add("portfolio.bin", os.urandom(RESUME_BYTES))
+    return doc.tobytes()
+
+
+def test_resume_transfer_does_not_stall_other_requests(client, latency_probe, loop, test_db):
+    content = _resume_pdf()
+
+    async def run():
+        await test_db.employees.delete_many({"employee_id": EMPLOYEE_ID})
+        await test_db.employees.insert_one({"employee_id": EMPLOYEE_ID, "employee_name": "Test Employee"})
+
+        upload = asyncio.create_task(client.put(
+            f"/resume/upload/{EMPLOYEE_ID}",
+            files={"file": ("resume.pdf", content, "application/pdf")},
+        ))
+        upload_latencies = await latency_probe("/jobs/", upload)
+        uploaded = await upload
+
+        download = asyncio.create_task(client.get(f"/employees/resume/{EMPLOYEE_ID}"))
+        download_latencies = await latency_probe("/jobs/", download)
+        return uploaded, upload_latencies, await download, download_latencies
+
+    uploaded, upload_latencies, downloaded, download_latencies = loop.run_until_complete(run())
+
+    assert uploaded.status_code == 200, uploaded.text
+    assert downloaded.status_code == 200, downloaded.text
+    assert downloaded.content == content
+    assert upload_latencies and download_latencies
+    assert max(upload_latencies) < MAX_PROBE_SECONDS, f"/jobs/ stalled {max(upload_latencies):.2f}s during the upload"
+    assert max(download_latencies) < MAX_PROBE_SECONDS, f"/jobs/ stalled {max(download_latencies):.2f}s during the download"
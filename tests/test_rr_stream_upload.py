@@ -0,0 +1,68 @@
+import csv
+import io
+
+from benchmarks.synthetic import rr_rows, rr_template
+from utils.upload_parsing import validate_rr_rows
+
+HM = {"employee_id": "2", "role": "HM"}
+
+
+def _rows(count: int):
+    header, template = rr_template()
+    return header, list(rr_rows(count, header, template, bad_rate=0))
+
+
+def test_rows_with_extra_columns_are_row_errors():
+    header, rows = _rows(5)
+    rows[1] = rows[1] + ["extra", "cells"]
+    rows[3] = rows[3] + ["x"]
+
+    batch = validate_rr_rows(header, rows, 100)
+
+    assert batch["total_rows"] == 5
+    assert [rr.resource_request_id for rr in batch["valid"]] == ["BENCH00000000", "BENCH00000002", "BENCH00000004"]
+    assert [(e["row"], e["rr_id"]) for e in batch["errors"]] == [(109, "BENCH00000001"), (111, "BENCH00000003")]
+
+
+def test_failed_batch_reports_partial_result_without_deactivation(client, test_db, loop, monkeypatch):
+    from main import app
+    from routers import file_upload
+    from utils.file_upload_utils import RRSyncSession
+    from utils.security import get_current_user
+
+    header, rows = _rows(6)
+    out = io.StringIO()
+    csv.writer(out).writerows([header] + rows)
+
+    write_batch = RRSyncSession.write_batch
+    calls = []
+
+    async def failing_write_batch(self, validated_rrs):
+        calls.append(len(validated_rrs))
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        await write_batch(self, validated_rrs)
+
+    monkeypatch.setattr(file_upload, "RR_STREAM_BATCH_SIZE", 2)
+    monkeypatch.setattr(RRSyncSession, "write_batch", failing_write_batch)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: HM)
+
+    async def run():
+        await test_db.resource_request.delete_many({})
+        await test_db.resource_request.insert_one({"resource_request_id": "NOT-IN-FILE", "rr_status": True})
+        response = await client.post("/api/upload/rr-report/stream",
+                                     files={"file": ("rr.csv", out.getvalue().encode(), "text/csv")})
+        stored = {rr["resource_request_id"]: rr.get("rr_status")
+                  async for rr in test_db.resource_request.find({}, {"resource_request_id": 1, "rr_status": 1})}
+        return response, stored
+
+    response, stored = loop.run_until_complete(run())
+
+    assert response.status_code == 500
+    detail = response.json()["detail"]
+    assert detail["error"] == "connection lost"
+    assert detail["rows_processed"] == 2 and detail["valid_requests"] == 2
+    assert detail["sync"]["deactivation_skipped"] is True
+    # First batch kept, later rows never written, the RR missing from the file left active
+    assert set(stored) == {"NOT-IN-FILE", "BENCH00000000", "BENCH00000001"}
+    assert stored["NOT-IN-FILE"] is True
@@ -0,0 +1,62 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils import upload_jobs
+
+
+def _job(job_id: str, status: str, age_seconds: int) -> dict:
+    updated = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return {"_id": job_id, "job_type": "employees", "filename": "emp.csv", "status": status,
+            "result": None, "error": None, "created_at": updated, "updated_at": updated}
+
+
+def _touch(path, age_seconds: int):
+    with open(path, "wb") as f:
+        f.write(b"Employee ID\n1\n")
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_orphaned_jobs_are_failed_and_their_files_removed(test_db, loop, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_jobs, "JOB_FOLDER", str(tmp_path))
+    stale = upload_jobs.UPLOAD_JOB_STALE_SECONDS + 60
+    jobs = [
+        _job("stale-running", "running", stale),
+        _job("stale-queued", "queued", stale),
+        _job("live-running", "running", 5),
+        _job("done", "completed", stale),
+    ]
+    for job in jobs:
+        _touch(tmp_path / f"{job['_id']}_emp.csv", 0)
+
+    async def run():
+        await test_db.upload_jobs.delete_many({})
+        await test_db.upload_jobs.insert_many(jobs)
+        failed = await upload_jobs.fail_orphaned_upload_jobs()
+        statuses = {job["_id"]: job["status"] async for job in test_db.upload_jobs.find()}
+        return failed, statuses
+
+    failed, statuses = loop.run_until_complete(run())
+
+    assert failed == 2
+    assert statuses == {"stale-running": "failed", "stale-queued": "failed",
+                        "live-running": "running", "done": "completed"}
+    assert sorted(os.listdir(tmp_path)) == ["done_emp.csv", "live-running_emp.csv"]
+
+
+def test_old_job_files_are_deleted_unless_the_job_is_active(test_db, loop, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_jobs, "JOB_FOLDER", str(tmp_path))
+    old = upload_jobs.UPLOAD_JOB_FILE_RETENTION_HOURS * 3600 + 60
+    _touch(tmp_path / "finished_emp.csv", old)
+    _touch(tmp_path / "unknown_emp.csv", old)
+    _touch(tmp_path / "running_emp.csv", old)
+    _touch(tmp_path / "recent_emp.csv", 60)
+
+    async def run():
+        await test_db.upload_jobs.delete_many({})
+        await test_db.upload_jobs.insert_many([_job("finished", "completed", 0), _job("running", "running", 0)])
+        return await upload_jobs.delete_old_job_files()
+
+    assert loop.run_until_complete(run()) == 2
+    assert sorted(os.listdir(tmp_path)) == ["recent_emp.csv", "running_emp.csv"]
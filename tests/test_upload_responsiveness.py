@@ -0,0 +1,51 @@
+import asyncio
+
+import pandas as pd
+
+# While a large employee upload is parsed (process pool) and synced, /jobs/
+# must keep answering: every probe has to finish within MAX_PROBE_SECONDS.
+UPLOAD_ROWS = 20000
+MAX_PROBE_SECONDS = 0.5
+MIN_PROBES = 5
+
+BANDS = ["A3", "B1", "B2", "B3", "C1", "C2"]
+CITIES = ["Chennai", "Bangalore", "Kochi", "Pune"]
+SKILLS = ["Java", "Python", "SQL", "AWS", "React", "Docker", "Kubernetes", "Spring"]
+
+
+def _employee_csv(rows: int) -> bytes:
+    return pd.DataFrame([
+        {
+            "Employee ID": 100000 + i,
+            "Employee Name": f"Employee {i}",
+            "Employment Type": "Full Time",
+            "Designation": "Developer",
+            "Band": BANDS[i % len(BANDS)],
+            "City": CITIES[i % len(CITIES)],
+            "Location Description": "Campus",
+            "Primary Technology": SKILLS[i % len(SKILLS)],
+            "Secondary Technology": SKILLS[(i + 1) % len(SKILLS)],
+            "Detailed Skill Set (List of top skills on profile)": ", ".join(SKILLS[i % 5:i % 5 + 3]),
+            "Type": "TP" if i % 2 else "Non TP",
+        }
+        for i in range(rows)
+    ]).to_csv(index=False).encode()
+
+
+def test_jobs_stay_responsive_during_upload(client, latency_probe, loop):
+    content = _employee_csv(UPLOAD_ROWS)
+
+    async def run():
+        upload = asyncio.create_task(client.post(
+            "/api/upload/employees", files={"file": ("employees.csv", content, "text/csv")}
+        ))
+        latencies = await latency_probe("/jobs/", upload)
+        return await upload, latencies
+
+    response, latencies = loop.run_until_complete(run())
+
+    assert response.status_code == 200, response.text
+    assert response.json()["processed"] == UPLOAD_ROWS
+    # The upload has to outlast several probes for the check to mean anything
+    assert len(latencies) >= MIN_PROBES, latencies
+    assert max(latencies) < MAX_PROBE_SECONDS, f"/jobs/ stalled {max(latencies):.2f}s during the upload"
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from utils.jobs_crud import BANDS
+from utils.skill_index import skill_index, normalize_skill
+
+# -------------------------------------------------------------------
+# Candidate Ranking Engine
+# -------------------------------------------------------------------
+# Ranks every active employee against one RR. The skill index is turned into
+# a sparse employee × skill matrix (one array of row numbers per skill), so
+# scoring an RR only touches the postings of its own skills:
+#
+#   score = W_MANDATORY * (matched mandatory / mandatory)
+#         + W_OPTIONAL  * (matched optional / optional)
+#         + W_BAND      * band proximity (1, 2/3, 1/3, 0 for 0, 1, 2, 3+ BANDS apart)
+#         + W_LOCATION  * (same city)
+#
+# Only employees that match at least one RR skill are candidates.
+#
+# The matrix is never built inside a request:
+#   - rebuild() (startup, admin skill-index rebuild, compaction) builds the
+#     arrays in a worker thread and swaps them in as one MatrixState
+#   - update_employees(ids) (after every employee upload) patches only the
+#     uploaded employees: a profile change is written in place; a skill
+#     change retires the old row (active=False) and appends a new one, so no
+#     skill array ever has to be searched. Once retired rows pass
+#     RANK_COMPACT_RATIO of the matrix a background rebuild compacts it.
+
+RANK_WEIGHT_MANDATORY = float(os.getenv("RANK_WEIGHT_MANDATORY", "3.0"))
+RANK_WEIGHT_OPTIONAL = float(os.getenv("RANK_WEIGHT_OPTIONAL", "1.0"))
+RANK_WEIGHT_BAND = float(os.getenv("RANK_WEIGHT_BAND", "2.0"))
+RANK_WEIGHT_LOCATION = float(os.getenv("RANK_WEIGHT_LOCATION", "1.0"))
+RANK_COMPACT_RATIO = float(os.getenv("RANK_COMPACT_RATIO", "0.2"))
+BAND_PROXIMITY_SPAN = 3
+
+BAND_POSITION = {band: i for i, band in enumerate(BANDS)}
+
+# One consistent set of arrays; swapped as a whole so rank() never sees a mix
+MatrixState = namedtuple("MatrixState", "employee_ids row_of skills skill_rows band_pos city_code active city_codes")
+
+
+def _build_state() -> MatrixState:
+    """Runs in a worker thread. Each copy below is a single C call (atomic
+    under the GIL); uploads landing in between are re-applied by rebuild()."""
+    postings = {skill: tuple(emp_ids) for skill, emp_ids in list(skill_index.postings.items())}
+    skills = dict(skill_index.skills_by_employee)  # after postings: employees are only ever added
+    profiles = dict(skill_index.profiles)
+    ids = list(skills)
+
+    row_of = {emp_id: row for row, emp_id in enumerate(ids)}
+    skill_rows = {
+        skill: np.fromiter((row_of[e] for e in emp_ids if e in row_of), dtype=np.int32)
+        for skill, emp_ids in postings.items()
+    }
+    city_codes, band_pos, city_code, active = {}, [], [], []
+    for emp_id in ids:
+        band, city, is_active = profiles.get(emp_id, (None, "", True))
+        band_pos.append(BAND_POSITION.get(band, -1))
+        city_code.append(city_codes.setdefault(city, len(city_codes)) if city else -1)
+        active.append(is_active)
+    return MatrixState(
+        employee_ids=np.array(ids, dtype=np.int64),
+        row_of=row_of,
+        skills=skills,
+        skill_rows=skill_rows,
+        band_pos=np.array(band_pos, dtype=np.int16),
+        city_code=np.array(city_code, dtype=np.int32),
+        active=np.array(active, dtype=bool),
+        city_codes=city_codes,
+    )
+
+
+class CandidateMatrix:
+    """Array view of the skill index, kept in step by rebuild() and update_employees()."""
+    def __init__(self):
+        self.state = None
+        self.retired_rows = 0
+        self._rebuilding = False
+        self._changed_during_rebuild = set()
+        self._rebuild_lock = asyncio.Lock()
+        self.build_seconds = None
+        self.patches = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.state is not None
+
+    @property
+    def active_count(self) -> int:
+        return int(self.state.active.sum()) if self.state else 0
+
+    async def rebuild(self):
+        async with self._rebuild_lock:
+            self._rebuilding = True
+            self._changed_during_rebuild = set()
+            started = time.perf_counter()
+            try:
+                state = await asyncio.to_thread(_build_state)
+            finally:
+                self._rebuilding = False
+            self.state, self.retired_rows = state, 0
+            self.build_seconds = round(time.perf_counter() - started, 3)
+
+            # Uploads that landed while the thread was copying/building
+            if self._changed_during_rebuild:
+                self.update_employees(self._changed_during_rebuild, new_rows=True)
+
+    def update_employees(self, employee_ids, new_rows: bool = False):
+        """Patch the rows of employees whose skills/profile changed in the skill index."""
+        if self._rebuilding:
+            self._changed_during_rebuild.update(employee_ids)
+        state = self.state
+        if state is None:
+            return 0
+
+        appended, count = [], 0
+        for emp_id in dict.fromkeys(employee_ids):
+            skills = skill_index.skills_of(emp_id)
+            if skills is None:
+                continue
+            profile = skill_index.profile_of(emp_id) or (None, "", True)
+            row = state.row_of.get(emp_id)
+            if row is not None and not new_rows and state.skills.get(emp_id) == skills:
+                self._set_profile(state, row, profile)
+            else:
+                if row is not None:
+                    state.active[row] = False
+                    self.retired_rows += 1
+                appended.append((emp_id, skills, profile))
+            state.skills[emp_id] = skills
+            count += 1
+
+        if appended:
+            state = self._append_rows(state, appended)
+        self.state = state
+        self.patches += 1
+
+        if self.retired_rows > RANK_COMPACT_RATIO * len(state.employee_ids) and not self._rebuilding:
+            try:
+                asyncio.get_running_loop().create_task(self.rebuild())
+            except RuntimeError:
+                pass  # no loop (scripts): compacted on the next explicit rebuild
+        return count
+
+    @staticmethod
+    def _set_profile(state: MatrixState, row: int, profile: tuple):
+        band, city, is_active = profile
+        state.band_pos[row] = BAND_POSITION.get(band, -1)
+        state.city_code[row] = state.city_codes.setdefault(city, len(state.city_codes)) if city else -1
+        state.active[row] = is_active
+
+    def _append_rows(self, state: MatrixState, appended: list) -> MatrixState:
+        first, extra = len(state.employee_ids), len(appended)
+        state = state._replace(
+            employee_ids=np.concatenate([state.employee_ids, np.array([a[0] for a in appended], dtype=np.int64)]),
+            band_pos=np.concatenate([state.band_pos, np.full(extra, -1, dtype=np.int16)]),
+            city_code=np.concatenate([state.city_code, np.full(extra, -1, dtype=np.int32)]),
+            active=np.concatenate([state.active, np.zeros(extra, dtype=bool)]),
+        )
+        rows_by_skill = {}
+        for offset, (emp_id, skills, profile) in enumerate(appended):
+            row = first + offset
+            state.row_of[emp_id] = row
+            self._set_profile(state, row, profile)
+            for skill in skills:
+                rows_by_skill.setdefault(skill, []).append(row)
+        for skill, rows in rows_by_skill.items():
+            new = np.array(rows, dtype=np.int32)
+            old = state.skill_rows.get(skill)
+            state.skill_rows[skill] = new if old is None else np.concatenate([old, new])
+        return state
+
+    @staticmethod
+    def _skill_fraction(state: MatrixState, skills: set) -> np.ndarray:
+        hits = np.zeros(len(state.employee_ids), dtype=np.float32)
+        for skill in skills:
+            rows = state.skill_rows.get(skill)
+            if rows is not None:
+                hits[rows] += 1
+        return hits / len(skills) if skills else hits
+
+    def rank(self, rr: dict, top_k: int = 20):
+        """Return [(employee_id, score, skill_score, band_score, location_score)], best first."""
+        state = self.state
+        if state is None or not len(state.employee_ids):
+            return []
+
+        mandatory = {normalize_skill(s) for s in rr.get("mandatory_skills") or []} - {""}
+        optional = {normalize_skill(s) for s in rr.get("optional_skills") or []} - {""} - mandatory
+        mandatory_fraction = self._skill_fraction(state, mandatory)
+        optional_fraction = self._skill_fraction(state, optional)
+        skill_score = RANK_WEIGHT_MANDATORY * mandatory_fraction + RANK_WEIGHT_OPTIONAL * optional_fraction
+
+        rr_band = BAND_POSITION.get(rr.get("job_grade"))
+        if rr_band is None:
+            band_score = np.zeros_like(skill_score)
+        else:
+            distance = np.abs(state.band_pos.astype(np.int32) - rr_band)
+            proximity = np.clip(1 - distance / BAND_PROXIMITY_SPAN, 0, 1)
+            band_score = (RANK_WEIGHT_BAND * np.where(state.band_pos >= 0, proximity, 0)).astype(np.float32)
+
+        rr_city = state.city_codes.get(normalize_skill(rr.get("city") or ""))
+        location_score = (RANK_WEIGHT_LOCATION * (state.city_code == rr_city)).astype(np.float32) \
+            if rr_city is not None else np.zeros_like(skill_score)
+
+        total = skill_score + band_score + location_score
+        candidates = np.flatnonzero(state.active & ((mandatory_fraction + optional_fraction) > 0))
+        if not len(candidates):
+            return []
+
+        # Top-K without sorting every candidate: partition, then sort the K survivors
+        k = min(top_k, len(candidates))
+        best = candidates[np.argpartition(-total[candidates], k - 1)[:k]]
+        best = best[np.argsort(-total[best], kind="stable")]
+        return [
+            (int(state.employee_ids[row]), float(total[row]), float(skill_score[row]),
+             float(band_score[row]), float(location_score[row]))
+            for row in best
+        ]
+
+
+candidate_matrix = CandidateMatrix()
@@ -0,0 +1,57 @@
+import logging
+from datetime import datetime, timezone
+
+from database import collections
+
+# Same logger as utils.file_upload_utils (which imports this module)
+logger = logging.getLogger("RRProcessor")
+
+# -------------------------------------------------------------------
+# Employee Directory Facets
+# -------------------------------------------------------------------
+# Counts by type, band, city and primary technology for the filter panels.
+# One $facet aggregation computes them all; the result is stored as a single
+# document in `employee_facets` and recomputed after every employee upload,
+# so the endpoint is one _id lookup whatever the directory size.
+#
+# Buckets are grouped on the normalized `norm.<field>` value (the one
+# /employees/filter matches on) and labelled with one stored spelling.
+
+FACET_FIELDS = ["type", "band", "city", "primary_technology"]
+FACETS_ID = "employees"
+
+
+def _pipeline() -> list:
+    facets = {
+        field: [
+            {"$group": {"_id": f"$norm.{field}", "label": {"$first": f"${field}"}, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+        for field in FACET_FIELDS
+    }
+    facets["total"] = [{"$count": "employees"}]
+    return [{"$facet": facets}]
+
+
+async def compute_facets() -> dict:
+    started = datetime.now(timezone.utc)
+    result = (await collections["employees"].aggregate(_pipeline()).to_list(1))[0]
+    total = result.pop("total")
+    doc = {
+        "_id": FACETS_ID,
+        "total": total[0]["employees"] if total else 0,
+        "facets": {
+            field: [{"value": b["label"], "key": b["_id"], "count": b["count"]} for b in buckets]
+            for field, buckets in result.items()
+        },
+        "computed_at": started,
+    }
+    await collections["employee_facets"].replace_one({"_id": FACETS_ID}, doc, upsert=True)
+    logger.info(f"Employee facets recomputed for {doc['total']} employees")
+    return doc
+
+
+async def get_facets() -> dict:
+    """Stored facet counts; computed on first use."""
+    doc = await collections["employee_facets"].find_one({"_id": FACETS_ID})
+    return doc or await compute_facets()
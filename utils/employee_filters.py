@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import logging
+import re
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from database import collections
+from utils.skill_index import normalize_skill
+
+# Same logger as utils.file_upload_utils (which imports this module)
+logger = logging.getLogger("RRProcessor")
+
+# -------------------------------------------------------------------
+# Employee Filter Engine
+# -------------------------------------------------------------------
+# sync_employees_with_db stores a lower-cased, whitespace-collapsed copy of
+# every filterable field under `norm` (norm.city, norm.band, ...), indexed in
+# utils/indexes.py. Filters then become index lookups on those fields:
+#
+#   band=B1          → {"norm.band": "b1"}
+#   band=B1,B2       → {"norm.band": {"$in": ["b1", "b2"]}}
+#   primary=jav*     → {"norm.primary_technology": {"$in": [/^jav/]}}
+#
+# A trailing * asks for an anchored prefix match; anything else is exact
+# (case-insensitive). Both forms are answered from index bounds.
+#
+# norm.skills holds detailed_skills normalized like the in-memory skill index
+# (utils.skill_index.normalize_skill), so Mongo skill matches agree with it.
+#
+# Check that a filter uses an index on a live database:
+#   python -m utils.employee_filters band=B1,B2 city=chen*
+
+# query parameter → employee field
+FILTER_FIELDS = {
+    "employee_type": "type",
+    "employment_type": "employment_type",
+    "city": "city",
+    "band": "band",
+    "designation": "designation",
+    "primary_tech": "primary_technology",
+    "secondary_tech": "secondary_technology",
+}
+MAX_FILTER_VALUES = 50
+
+
+def normalize(value) -> str:
+    return " ".join(str(value).lower().split()) if value is not None else ""
+
+
+def normalized_fields(doc: dict) -> dict:
+    """`norm` shadow fields for an employee document."""
+    norm = {field: normalize(doc.get(field)) for field in FILTER_FIELDS.values()}
+    norm["skills"] = sorted(set(filter(None, (normalize_skill(s) for s in doc.get("detailed_skills") or []))))
+    return {"norm": norm}
+
+
+def _condition(param: str, raw: str):
+    values = []
+    for part in raw.split(","):
+        if part.endswith("*"):
+            prefix = normalize(part[:-1])
+            if prefix:
+                values.append(re.compile("^" + re.escape(prefix)))
+        elif normalize(part):
+            values.append(normalize(part))
+    if not values:
+        return None
+    if len(values) > MAX_FILTER_VALUES:
+        raise HTTPException(status_code=400,
+                            detail=f"Too many values for '{param}': {len(values)} given, at most {MAX_FILTER_VALUES}")
+    return values[0] if len(values) == 1 and isinstance(values[0], str) else {"$in": values}
+
+
+def build_filter(params: dict) -> dict:
+    """Mongo query from {param: "v1,v2,pre*"}; empty/None params are ignored."""
+    query = {}
+    for param, raw in params.items():
+        if not raw or param not in FILTER_FIELDS:
+            continue
+        condition = _condition(param, raw)
+        if condition is not None:
+            query[f"norm.{FILTER_FIELDS[param]}"] = condition
+    return query
+
+
+async def backfill_normalized_fields(batch_size: int = 1000) -> int:
+    """Write `norm` for employees stored before it (or norm.skills) existed."""
+    col = collections["employees"]
+    projection = {field: 1 for field in FILTER_FIELDS.values()}
+    projection["detailed_skills"] = 1
+    ops, count = [], 0
+    async for doc in col.find({"norm.skills": {"$exists": False}}, projection):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": normalized_fields(doc)}))
+        if len(ops) >= batch_size:
+            await col.bulk_write(ops, ordered=False)
+            count += len(ops)
+            ops = []
+    if ops:
+        await col.bulk_write(ops, ordered=False)
+        count += len(ops)
+    if count:
+        logger.info(f"Normalized filter fields backfilled for {count} employees")
+    return count
+
+
+# -------------------------------------------------------------------
+# Explain
+# -------------------------------------------------------------------
+def _stages(plan: dict):
+    yield plan
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def explain_filter(params: dict) -> dict:
+    query = build_filter(params)
+    explain = await collections["employees"].find(query).explain()
+    winning = explain["queryPlanner"]["winningPlan"]
+    stages = list(_stages(winning))
+    stats = explain.get("executionStats", {})
+    return {
+        "query": query,
+        "stages": [s.get("stage") for s in stages],
+        "indexes": [s["indexName"] for s in stages if s.get("stage") == "IXSCAN"],
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+async def _main(pairs: list) -> int:
+    params = dict(pair.split("=", 1) for pair in pairs)
+    if unknown := set(params) - set(FILTER_FIELDS):
+        print(f"unknown filters: {sorted(unknown)} (known: {sorted(FILTER_FIELDS)})")
+        return 2
+    try:
+        result = await explain_filter(params)
+    except HTTPException as e:
+        print(e.detail)
+        return 2
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0 if result["indexes"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain an /employees/filter query (exit 1 if no index is used)")
+    parser.add_argument("filters", nargs="+", help="param=value[,value|prefix*] e.g. band=B1,B2")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.filters)))
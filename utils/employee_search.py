@@ -0,0 +1,113 @@
+import logging
+import re
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from database import collections
+from utils.pagination import PageParams, decode_cursor, encode_cursor, keyset_filter
+
+# Same logger as utils.file_upload_utils (which imports this module)
+logger = logging.getLogger("RRProcessor")
+
+# -------------------------------------------------------------------
+# Employee Search
+# -------------------------------------------------------------------
+# Every employee document carries `search_terms`: the lower-cased word tokens
+# of its searchable fields (plus the employee_id digits), and `name_terms`
+# for the name alone. Both are written by sync_employees_with_db and indexed
+# (multikey), so a search is one anchored-prefix regex per query word
+# ({"search_terms": /^jav/}) that Mongo answers from index bounds instead of
+# the old nine-way unanchored $regex $or over the whole collection.
+#
+#   - all query words must match (AND); each matches as a prefix (type-ahead)
+#   - an all-digits query that is an exact employee_id returns that employee
+#   - relevance: exact word 2, prefix 1, +1 per word found in the name;
+#     pages are keyset on (score desc, _id)
+
+SEARCH_FIELDS = [
+    "employee_name", "designation", "primary_technology", "secondary_technology",
+    "type", "employment_type", "city", "band",
+]
+MAX_QUERY_TERMS = 8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall(str(text).lower()) if text is not None else []
+
+
+def search_fields(doc: dict) -> dict:
+    """search_terms / name_terms for an employee document."""
+    terms = set(tokenize(doc.get("employee_id")))
+    for field in SEARCH_FIELDS:
+        terms.update(tokenize(doc.get(field)))
+    return {"search_terms": sorted(terms), "name_terms": sorted(set(tokenize(doc.get("employee_name"))))}
+
+
+def search_query(terms: list) -> dict:
+    return {"$and": [{"search_terms": {"$regex": f"^{re.escape(t)}"}} for t in terms]}
+
+
+def _score(terms: list) -> dict:
+    parts = []
+    for t in terms:
+        parts.append({"$cond": [{"$in": [t, "$search_terms"]}, 2, 1]})
+        parts.append({"$cond": [{"$in": [t, "$name_terms"]}, 1, 0]})
+    return {"$add": parts}
+
+
+async def search_employees(search: str, page: PageParams, projection: Optional[dict] = None) -> dict:
+    """Returns {"data", "next", "total"} like utils.pagination.paginate."""
+    col = collections["employees"]
+    search = search.strip()
+
+    # Exact employee id: a single indexed lookup
+    if search.isdigit() and not page.cursor:
+        doc = await col.find_one({"employee_id": int(search)}, projection)
+        if doc:
+            return {"data": [doc], "next": None, "total": 1 if page.include_total else None}
+
+    terms = list(dict.fromkeys(tokenize(search)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return {"data": [], "next": None, "total": 0 if page.include_total else None}
+
+    query = search_query(terms)
+    sort = [("_score", -1), ("_id", 1)]
+    fields = [field for field, _ in sort]
+
+    pipeline = [{"$match": query}, {"$addFields": {"_score": _score(terms)}}]
+    if page.cursor:
+        pipeline.append({"$match": keyset_filter(sort, decode_cursor(page.cursor, fields))})
+    pipeline += [{"$sort": dict(sort)}, {"$limit": page.limit + 1}]
+    if projection and any(projection.values()):
+        pipeline.append({"$project": {**projection, "_score": 1}})
+
+    docs = await col.aggregate(pipeline).to_list(page.limit + 1)
+    has_more = len(docs) > page.limit
+    docs = docs[:page.limit]
+    next_token = encode_cursor(fields, [docs[-1]["_score"], docs[-1]["_id"]]) if has_more else None
+    for doc in docs:
+        doc.pop("_score", None)
+    total = await col.count_documents(query) if page.include_total else None
+    return {"data": docs, "next": next_token, "total": total}
+
+
+async def backfill_search_fields(batch_size: int = 1000) -> int:
+    """Write search_terms for employees stored before the field existed."""
+    col = collections["employees"]
+    projection = {"employee_id": 1, **{field: 1 for field in SEARCH_FIELDS}}
+    ops, count = [], 0
+    async for doc in col.find({"search_terms": {"$exists": False}}, projection):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": search_fields(doc)}))
+        if len(ops) >= batch_size:
+            await col.bulk_write(ops, ordered=False)
+            count += len(ops)
+            ops = []
+    if ops:
+        await col.bulk_write(ops, ordered=False)
+        count += len(ops)
+    if count:
+        logger.info(f"Search fields backfilled for {count} employees")
+    return count
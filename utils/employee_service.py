@@ -1,161 +1,252 @@
-import os
-from typing import Optional, List, Dict, Any
-from pathlib import Path
-import tempfile
-from fastapi import HTTPException
-import fitz  # PyMuPDF
-from docx import Document
-from database import employees, resource_request, fs, applications
-import struct
-import re
- 
-# Collections
-resource_request_col = resource_request
-app_col = applications
-emp_col = employees
- 
- 
-def _serialize(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    if not doc:
-        return {}
-    out = dict(doc)
-    if "_id" in out:
-        out["id"] = str(out.pop("_id"))
-    return out
- 
- 
-async def fetch_all_employees() -> List[Dict[str, Any]]:
-    cursor = emp_col.find({})
-    results = await cursor.to_list(length=None)
-    return [_serialize(d) for d in results]
- 
- 
-async def fetch_employee_by_id(emp_id: int) -> Optional[Dict[str, Any]]:
-    doc = await emp_col.find_one({"employee_id": emp_id})
-    if not doc:
-        return None
-    return _serialize(doc)
- 
- 
-async def get_jobs_by_hm(hm_id: str) -> List[Dict[str, Any]]:
-    cursor = resource_request_col.find({"hm_id": hm_id})
-    jobs = await cursor.to_list(length=None)
-    return [_serialize(doc) for doc in jobs]
- 
- 
-async def get_tp_employees() -> List[Dict[str, Any]]:
-    cursor = emp_col.find({"Type": "TP"})  # Adjust field name if needed
-    docs = await cursor.to_list(length=None)
-    return [_serialize(doc) for doc in docs]
- 
- 
-async def update_parsed_resume(emp_id: int, parsed_text: str):
-    result = await emp_col.update_one(
-        {"employee_id": emp_id},
-        {"$set": {"ExtractedText": parsed_text}}
-    )
-    return result.modified_count > 0
- 
- 
-def save_to_gridfs(filename: str, file_bytes: bytes) -> str:
-    file_id = fs.put(file_bytes, filename=filename)
-    return str(file_id)
- 
- 
- 
- 
- 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        return "\n".join(page.get_text("text") for page in doc).strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF extraction failed: {e}")
- 
- 
-def _is_old_doc_binary(file_bytes: bytes) -> bool:
-    """Detect real legacy .doc (starts with D0 CF 11 E0 A1 B1 1A E1)"""
-    return file_bytes.startswith(b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1")
- 
- 
-def _extract_text_from_legacy_doc(file_bytes: bytes) -> str:
-    """
-    Pure-Python extraction from old .doc files using simple text chunk parsing.
-    Works on 95%+ of real-world Indian resumes (including yours!).
-    """
-    try:
-        text = ""
-        # Convert to str with windows-1252 (Indian .doc files are almost always cp1252)
-        raw = file_bytes.decode("cp1252", errors="ignore")
- 
-        # Remove null bytes and common binary junk
-        cleaned = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", " ", raw)
- 
-        # Split into lines and keep only lines with real content
-        lines = []
-        for line in cleaned.splitlines():
-            line = line.strip()
-            if len(line) > 1 and not line.isascii() or any(c.isalpha() for c in line):
-                lines.append(line)
- 
-        text = "\n".join(lines)
- 
-        # If still garbage → try latin1
-        if len(text) < 100:
-            text = file_bytes.decode("latin1", errors="ignore")
-            text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", " ", text)
-            lines = [l.strip() for l in text.splitlines() if l.strip()]
-            text = "\n".join(lines[:200])  # limit
- 
-        return text.strip()[:15000]  # Cap at 15k chars → safe for LLM
- 
-    except Exception as e:
-        return f"[Failed to extract text from legacy .doc: {str(e)}]"
- 
- 
-def extract_text_from_docx_or_doc(file_bytes: bytes, filename: str) -> str:
-    suffix = Path(filename).suffix.lower()
- 
-    # First: try python-docx (works for .docx and some modern .doc saved as docx)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(file_bytes)
-        tmp_path = tmp.name
- 
-    try:
-        doc = Document(tmp_path)
-        paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-        text = "\n".join(paragraphs)
-        if text and len(text) > 50:
-            return text
-    except:
-        pass
-    finally:
-        try:
-            Path(tmp_path).unlink(missing_ok=True)
-        except:
-            pass
- 
-    # Second: if it's a real old .doc binary → use our pure-python extractor
-    if _is_old_doc_binary(file_bytes):
-        return _extract_text_from_legacy_doc(file_bytes)
- 
-    # Third: last resort — decode as cp1252
-    try:
-        return file_bytes.decode("cp1252", errors="replace")
-    except:
-        return "[Could not extract text from this document]"
- 
- 
-def extract_text_from_bytes(file_bytes: bytes, filename: str) -> str:
-    if not filename:
-        filename = "document.pdf"
-    ext = Path(filename).suffix.lower()
- 
-    if ext == ".pdf":
-        return extract_text_from_pdf(file_bytes)
- 
-    elif ext in {".docx", ".doc"}:
-        return extract_text_from_docx_or_doc(file_bytes, filename)
- 
-    else:
+import os
+import json
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, AsyncIterator
+from pathlib import Path
+import tempfile
+from fastapi import HTTPException
+import fitz  # PyMuPDF
+from docx import Document
+from database import employees, resource_request, fs_bucket, applications
+from utils.pagination import PageParams, paginate
+from utils.projections import EMPLOYEE_INTERNAL_FIELDS
+import struct
+import re
+ 
+# Collections
+resource_request_col = resource_request
+app_col = applications
+emp_col = employees
+ 
+ 
+def _serialize(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not doc:
+        return {}
+    out = dict(doc)
+    if "_id" in out:
+        out["id"] = str(out.pop("_id"))
+    return out
+ 
+ 
+async def fetch_all_employees(page: PageParams, projection: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    return await paginate(emp_col, {}, page, projection=projection, serialize=_serialize)
+ 
+ 
+# Streaming exports: documents are read STREAM_BATCH_SIZE at a time from the
+# cursor and written out per batch, so memory stays flat for the full directory.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+async def stream_employees(query: Dict[str, Any], sort: Optional[list] = None, fmt: str = "ndjson",
+                           projection: Optional[Dict[str, int]] = None, collation=None) -> AsyncIterator[str]:
+    """Yield employees as NDJSON lines (fmt="ndjson") or as one chunked JSON array (fmt="json")."""
+    find_kwargs = {"collation": collation} if collation else {}
+    cursor = emp_col.find(query, projection, batch_size=STREAM_BATCH_SIZE, **find_kwargs)
+    if sort:
+        cursor = cursor.sort(sort)
+
+    def chunk(lines: list, first: bool) -> str:
+        if fmt == "ndjson":
+            return "".join(line + "\n" for line in lines)
+        return ("" if first else ",") + ",".join(lines)
+
+    if fmt == "json":
+        yield "["
+    buffer, first = [], True
+    async for doc in cursor:
+        buffer.append(json.dumps(_serialize(doc), default=_json_default))
+        if len(buffer) >= STREAM_BATCH_SIZE:
+            yield chunk(buffer, first)
+            buffer, first = [], False
+    if buffer:
+        yield chunk(buffer, first)
+    if fmt == "json":
+        yield "]"
+
+
+async def fetch_employee_by_id(emp_id: int) -> Optional[Dict[str, Any]]:
+    doc = await emp_col.find_one({"employee_id": emp_id}, {field: 0 for field in EMPLOYEE_INTERNAL_FIELDS})
+    if not doc:
+        return None
+    return _serialize(doc)
+ 
+ 
+async def get_jobs_by_hm(hm_id: str) -> List[Dict[str, Any]]:
+    cursor = resource_request_col.find({"hm_id": hm_id})
+    jobs = await cursor.to_list(length=None)
+    return [_serialize(doc) for doc in jobs]
+ 
+ 
+async def get_tp_employees() -> List[Dict[str, Any]]:
+    cursor = emp_col.find({"Type": "TP"})  # Adjust field name if needed
+    docs = await cursor.to_list(length=None)
+    return [_serialize(doc) for doc in docs]
+ 
+ 
+async def update_parsed_resume(emp_id: int, parsed_text: str):
+    result = await emp_col.update_one(
+        {"employee_id": emp_id},
+        {"$set": {"ExtractedText": parsed_text}}
+    )
+    return result.modified_count > 0
+ 
+ 
+async def save_to_gridfs(filename: str, file_bytes: bytes, content_type: Optional[str] = None) -> str:
+    file_id = await fs_bucket.upload_from_stream(filename, file_bytes, metadata={"content_type": content_type})
+    return str(file_id)
+
+
+# Resume downloads are streamed chunk by chunk from GridFS (one chunk in memory
+# per download). Stored files never change, so file id + upload time + length
+# make a strong ETag (pymongo 4 no longer writes md5 to GridFS).
+def grid_etag(grid_out) -> str:
+    return f'"{grid_out._id}-{int(grid_out.upload_date.timestamp() * 1000)}-{grid_out.length}"'
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[tuple]:
+    """
+    (start, end) inclusive for a single "bytes=" range, None to send the whole
+    file (no header, or several ranges). Raises 416 when unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if start == "":
+            suffix = int(end)  # bytes=-500 → last 500 bytes
+            if suffix <= 0:
+                raise ValueError
+            first, last = max(length - suffix, 0), length - 1
+        else:
+            first = int(start)
+            if end and int(end) < first:
+                raise ValueError  # malformed → ignored like a missing header
+            last = min(int(end), length - 1) if end else length - 1
+    except ValueError:
+        return None
+    if first >= length:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{length}"})
+    return first, last
+
+
+async def stream_grid_out(grid_out, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Yield bytes start..end (inclusive) of a GridFS file, one chunk at a time."""
+    end = grid_out.length - 1 if end is None else end
+    remaining = end - start + 1
+    grid_out.seek(start)
+    position = start
+    while remaining > 0:
+        # Stay on chunk boundaries so a read never spans two chunks
+        size = min(grid_out.chunk_size - position % grid_out.chunk_size, remaining)
+        data = await grid_out.read(size)
+        if not data:
+            break
+        remaining -= len(data)
+        position += len(data)
+        yield data
+ 
+ 
+ 
+ 
+ 
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    try:
+        doc = fitz.open(stream=file_bytes, filetype="pdf")
+        return "\n".join(page.get_text("text") for page in doc).strip()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF extraction failed: {e}")
+ 
+ 
+def _is_old_doc_binary(file_bytes: bytes) -> bool:
+    """Detect real legacy .doc (starts with D0 CF 11 E0 A1 B1 1A E1)"""
+    return file_bytes.startswith(b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1")
+ 
+ 
+def _extract_text_from_legacy_doc(file_bytes: bytes) -> str:
+    """
+    Pure-Python extraction from old .doc files using simple text chunk parsing.
+    Works on 95%+ of real-world Indian resumes (including yours!).
+    """
+    try:
+        text = ""
+        # Convert to str with windows-1252 (Indian .doc files are almost always cp1252)
+        raw = file_bytes.decode("cp1252", errors="ignore")
+ 
+        # Remove null bytes and common binary junk
+        cleaned = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", " ", raw)
+ 
+        # Split into lines and keep only lines with real content
+        lines = []
+        for line in cleaned.splitlines():
+            line = line.strip()
+            if len(line) > 1 and not line.isascii() or any(c.isalpha() for c in line):
+                lines.append(line)
+ 
+        text = "\n".join(lines)
+ 
+        # If still garbage → try latin1
+        if len(text) < 100:
+            text = file_bytes.decode("latin1", errors="ignore")
+            text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", " ", text)
+            lines = [l.strip() for l in text.splitlines() if l.strip()]
+            text = "\n".join(lines[:200])  # limit
+ 
+        return text.strip()[:15000]  # Cap at 15k chars → safe for LLM
+ 
+    except Exception as e:
+        return f"[Failed to extract text from legacy .doc: {str(e)}]"
+ 
+ 
+def extract_text_from_docx_or_doc(file_bytes: bytes, filename: str) -> str:
+    suffix = Path(filename).suffix.lower()
+ 
+    # First: try python-docx (works for .docx and some modern .doc saved as docx)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(file_bytes)
+        tmp_path = tmp.name
+ 
+    try:
+        doc = Document(tmp_path)
+        paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
+        text = "\n".join(paragraphs)
+        if text and len(text) > 50:
+            return text
+    except:
+        pass
+    finally:
+        try:
+            Path(tmp_path).unlink(missing_ok=True)
+        except:
+            pass
+ 
+    # Second: if it's a real old .doc binary → use our pure-python extractor
+    if _is_old_doc_binary(file_bytes):
+        return _extract_text_from_legacy_doc(file_bytes)
+ 
+    # Third: last resort — decode as cp1252
+    try:
+        return file_bytes.decode("cp1252", errors="replace")
+    except:
+        return "[Could not extract text from this document]"
+ 
+ 
+def extract_text_from_bytes(file_bytes: bytes, filename: str) -> str:
+    if not filename:
+        filename = "document.pdf"
+    ext = Path(filename).suffix.lower()
+ 
+    if ext == ".pdf":
+        return extract_text_from_pdf(file_bytes)
+ 
+    elif ext in {".docx", ".doc"}:
+        return extract_text_from_docx_or_doc(file_bytes, filename)
+ 
+    else:
         raise HTTPException(status_code=400, detail=f"Unsupported file format: {ext}")
\ No newline at end of file
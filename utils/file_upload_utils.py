@@ -1,11 +1,18 @@
 from datetime import datetime, timezone,timedelta
 from typing import List
-import chardet
 from database import collections
 from models import Employee, ResourceRequest , User
-from io import StringIO
-import pandas as pd
-import csv
+from utils.security import invalidate_user_cache
+from utils.skill_index import INDEX_PROJECTION, skill_index
+from utils.suggest_index import SUGGEST_PROJECTION, suggest_index
+from utils.employee_search import search_fields
+from utils.employee_filters import normalized_fields
+from utils.employee_facets import compute_facets
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
+import hashlib
+import json
 import os
 import logging
 
@@ -24,6 +31,10 @@ logger = logging.getLogger("RRProcessor")
 
 UPLOAD_FOLDER = "upload_files/unprocessed"
 PROCESSED_FOLDER = "upload_files/processed"
+BULK_WRITE_CHUNK_SIZE = int(os.getenv("BULK_WRITE_CHUNK_SIZE", "1000"))
+RR_SYNC_INCREMENTAL = os.getenv("RR_SYNC_INCREMENTAL", "true").lower() == "true"
+EMPLOYEE_INDEX_SYNC_SECONDS = int(os.getenv("EMPLOYEE_INDEX_SYNC_SECONDS", "60"))
+INDEX_PATCH_BATCH_SIZE = int(os.getenv("INDEX_PATCH_BATCH_SIZE", "1000"))
 # -------------------------------------------------------------------
 # Audit Logging
 # -------------------------------------------------------------------
@@ -53,55 +64,221 @@ def convert_dates_for_mongo(data: dict):
             data[k] = datetime.combine(v, time.min).replace(tzinfo=timezone.utc)
     return data
  
+# -------------------------------------------------------------------
+# Bulk Write Engine
+# -------------------------------------------------------------------
+async def bulk_write_chunked(collection, ops: list, chunk_size: int = None, on_progress=None):
+    """
+    Send ops to Mongo as unordered bulk_write batches of chunk_size.
+    A failing chunk does not stop the others; its write errors are collected.
+    on_progress (optional coroutine) is awaited with the op count of each chunk.
+    """
+    chunk_size = chunk_size or BULK_WRITE_CHUNK_SIZE
+    totals = {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0, "errors": []}
+
+    for start in range(0, len(ops), chunk_size):
+        chunk = ops[start:start + chunk_size]
+        try:
+            result = await collection.bulk_write(chunk, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for err in details.get("writeErrors", []):
+                totals["errors"].append({
+                    # Employee uploads merge the employees and users samples
+                    "collection": collection.name,
+                    "chunk": start // chunk_size,
+                    "index": start + err.get("index", 0),
+                    "code": err.get("code"),
+                    "error": err.get("errmsg"),
+                })
+            logger.error(f"bulk_write chunk {start // chunk_size} on {collection.name}: "
+                         f"{len(details.get('writeErrors', []))} write errors")
+
+        totals["inserted"] += details.get("nInserted", 0)
+        totals["matched"] += details.get("nMatched", 0)
+        totals["modified"] += details.get("nModified", 0)
+        totals["upserted"] += details.get("nUpserted", 0)
+        if on_progress:
+            await on_progress(len(chunk))
+
+    return totals
+
 # -------------------------------------------------------------------
 # Database Sync Functions
 # -------------------------------------------------------------------
-async def sync_rr_with_db(validated_rrs: List[ResourceRequest]):
-    uploaded_ids = {rr.resource_request_id for rr in validated_rrs}
- 
-    # Fetch current state
-    existing_rrs = await collections["resource_request"].find(
-        {}, {"Resource Request ID": 1, "rr_status": 1}
+async def refresh_recommendations(kind: str, ids):
+    """Refresh stored job recommendations after a sync; a failure never fails the upload."""
+    # Imported here: job_recommendations builds on jobs_crud, which imports this module
+    from utils.job_recommendations import refresh_for_employees, refresh_for_rrs
+    try:
+        if kind == "rrs":
+            await refresh_for_rrs(ids)
+        else:
+            await refresh_for_employees(ids)
+    except Exception as e:
+        logger.error(f"Job recommendation refresh ({kind}) failed: {e}")
+
+
+def refresh_candidate_matrix(employee_ids):
+    """Patch the ranking matrix rows of uploaded employees (never rebuilt in a request)."""
+    # Imported here: candidate_ranking builds on jobs_crud, which imports this module
+    from utils.candidate_ranking import candidate_matrix
+    try:
+        candidate_matrix.update_employees(employee_ids)
+    except Exception as e:
+        logger.error(f"Candidate matrix refresh failed: {e}")
+
+
+# The skill, suggest and ranking indexes live in each process. An upload
+# patches them only in the worker that handled it; with several uvicorn
+# workers the others pick the change up here, from the employees' updated_at,
+# every EMPLOYEE_INDEX_SYNC_SECONDS (scheduled in routers/file_upload.py).
+# The window overlaps the previous one so clock skew never drops a change.
+_employee_indexes_synced_at = datetime.now(timezone.utc)
+
+
+async def sync_employee_indexes() -> int:
+    global _employee_indexes_synced_at
+    started = datetime.now(timezone.utc)
+    since = _employee_indexes_synced_at - timedelta(seconds=EMPLOYEE_INDEX_SYNC_SECONDS)
+    docs = await collections["employees"].find(
+        {"updated_at": {"$gte": since}}, {**INDEX_PROJECTION, **SUGGEST_PROJECTION}
     ).to_list(None)
-    rr_map = {r["Resource Request ID"]: r for r in existing_rrs}
- 
-    rr_insert, rr_reactivate = [], []
-    for rr in validated_rrs:
-        rr_id = rr.resource_request_id
-        rr_data = convert_dates_for_mongo(rr.model_dump(by_alias=False))
- 
-        if rr_id not in rr_map:
-            rr_insert.append(rr_data)
-        elif not rr_map[rr_id].get("rr_status"):
-            rr_reactivate.append({"filter": {"Resource Request ID": rr_id},
-                                  "update": {"$set": {"rr_status": True}}})
- 
-   
-    # Deactivate removed RRs
-    deactivate_rr = [{"filter": {"Resource Request ID": rid}, "update": {"$set": {"rr_status": False}}}
-                     for rid in rr_map if rid not in uploaded_ids and rr_map[rid].get("rr_status")]
-    # Bulk operations
-    if rr_insert:   await collections["resource_request"].insert_many(rr_insert, ordered=False)
-    for op in rr_reactivate + deactivate_rr:
-        await collections["resource_request"].update_one(op["filter"], op["update"])
-    return {
-        "rr_inserted": len(rr_insert),
-        "rr_reactivated+deactivated": len(rr_reactivate) + len(deactivate_rr),
-    }
- 
-async def sync_employees_with_db(employees: List[Employee], users: List[User]):
- 
-    existing = await collections["employees"].find({}, {"employee_id": 1, "status": 1}).to_list(None)
-    emp_map = {e["employee_id"]: e for e in existing}
- 
-    existing_users = await collections["users"].find({}, {"employee_id": 1}).to_list(None)
-    user_set = {u["employee_id"] for u in existing_users}
+    _employee_indexes_synced_at = started
+    if not docs:
+        return 0
+    skill_index.update_employees(docs)
+    refresh_candidate_matrix([doc["employee_id"] for doc in docs])
+    suggest_index.update_employees(docs)
+    logger.info(f"In-memory employee indexes synced: {len(docs)} employees changed since {since}")
+    return len(docs)
+
+
+def rr_content_hash(rr_data: dict) -> str:
+    """Stable digest of an RR document, used to skip rows that did not change."""
+    payload = json.dumps(rr_data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RRSyncSession:
+    """
+    RR sync that can be fed in batches (streamed uploads) or all at once.
+    Incremental (default): compare each row's content hash with the stored
+    content_hash and only write new, changed, reactivated or removed RRs.
+    Full (incremental=False): rewrite every uploaded RR that already exists.
+    Removed RRs are deactivated in finish(), once every uploaded id is known;
+    finish(deactivate=False) closes a sync that stopped early without it.
+    """
+    def __init__(self, on_progress=None, incremental: bool = None):
+        self.on_progress = on_progress
+        self.incremental = RR_SYNC_INCREMENTAL if incremental is None else incremental
+        self.rr_map = {}
+        self.uploaded_ids = set()
+        self.errors = []
+        self.error_count = 0
+        self.changed_ids = set()
+        self.counts = {"inserted": 0, "changed": 0, "unchanged": 0, "reactivated": 0, "deactivated": 0}
+
+    async def start(self):
+        # Fetch current state
+        existing_rrs = await collections["resource_request"].find(
+            {}, {"resource_request_id": 1, "rr_status": 1, "content_hash": 1}
+        ).to_list(None)
+        self.rr_map = {r["resource_request_id"]: r for r in existing_rrs if r.get("resource_request_id")}
+
+    async def write_batch(self, validated_rrs: List[ResourceRequest]):
+        rr_insert, rr_changed, rr_reactivate = [], [], []
+        for rr in validated_rrs:
+            rr_id = rr.resource_request_id
+            self.uploaded_ids.add(rr_id)
+            rr_data = convert_dates_for_mongo(rr.model_dump(by_alias=False))
+            rr_data["content_hash"] = rr_content_hash(rr_data)
+            current = self.rr_map.get(rr_id)
+
+            if current is None:
+                rr_insert.append(rr_data)
+            elif not self.incremental or current.get("content_hash") != rr_data["content_hash"]:
+                rr_changed.append({"filter": {"resource_request_id": rr_id},
+                                   "update": {"$set": rr_data}})
+            elif not current.get("rr_status"):
+                rr_reactivate.append({"filter": {"resource_request_id": rr_id},
+                                      "update": {"$set": {"rr_status": True}}})
+            else:
+                self.counts["unchanged"] += 1
+
+        # Bulk operations
+        ops = [InsertOne(doc) for doc in rr_insert]
+        ops += [UpdateOne(op["filter"], op["update"]) for op in rr_changed + rr_reactivate]
+        await self._write(ops)
+
+        # Later batches must see what this one wrote
+        for doc in rr_insert + [op["update"]["$set"] for op in rr_changed]:
+            self.rr_map[doc["resource_request_id"]] = {"rr_status": doc.get("rr_status"),
+                                                       "content_hash": doc["content_hash"]}
+        for op in rr_reactivate:
+            self.rr_map[op["filter"]["resource_request_id"]]["rr_status"] = True
+        self.changed_ids.update(doc["resource_request_id"] for doc in rr_insert)
+        self.changed_ids.update(op["filter"]["resource_request_id"] for op in rr_changed + rr_reactivate)
+        self.counts["inserted"] += len(rr_insert)
+        self.counts["changed"] += len(rr_changed)
+        self.counts["reactivated"] += len(rr_reactivate)
+
+    async def finish(self, deactivate: bool = True) -> dict:
+        # Deactivate removed RRs (only known once the whole file was read)
+        removed_ids = [rid for rid, current in self.rr_map.items()
+                       if deactivate and rid not in self.uploaded_ids and current.get("rr_status")]
+        deactivate_rr = [UpdateOne({"resource_request_id": rid}, {"$set": {"rr_status": False}})
+                         for rid in removed_ids]
+        await self._write(deactivate_rr, report_progress=False)  # not rows of this upload
+        self.counts["deactivated"] = len(deactivate_rr)
+        self.changed_ids.update(removed_ids)
+        await refresh_recommendations("rrs", self.changed_ids)
+
+        c = self.counts
+        logger.info(f"RR sync ({'incremental' if self.incremental else 'full'}): {c['inserted']} inserted, "
+                    f"{c['changed']} changed, {c['unchanged']} unchanged, "
+                    f"{c['deactivated'] if deactivate else 'none (skipped)'} deactivated")
+        return {
+            "mode": "incremental" if self.incremental else "full",
+            "deactivation_skipped": not deactivate,
+            "rr_inserted": c["inserted"],
+            "rr_changed": c["changed"],
+            "rr_unchanged": c["unchanged"],
+            "rr_reactivated": c["reactivated"],
+            "rr_deactivated": c["deactivated"],
+            "rr_reactivated+deactivated": c["reactivated"] + c["deactivated"],
+            "write_errors": self.error_count,
+            "errors_sample": self.errors[:5],
+        }
+
+    async def _write(self, ops, report_progress: bool = True):
+        if ops:
+            result = await bulk_write_chunked(collections["resource_request"], ops,
+                                              on_progress=self.on_progress if report_progress else None)
+            self.error_count += len(result["errors"])
+            self.errors.extend(result["errors"][:5 - len(self.errors)])
+
+
+async def sync_rr_with_db(validated_rrs: List[ResourceRequest], on_progress=None, incremental: bool = None):
+    session = RRSyncSession(on_progress=on_progress, incremental=incremental)
+    await session.start()
+    await session.write_batch(validated_rrs)
+    return await session.finish()
  
+# Documents and write ops for an employee upload. Pure CPU work over every
+# row, so it runs in a worker thread instead of on the event loop.
+def _employee_writes(employees: List[Employee], users: List[User], emp_map: dict, user_set: set):
     inserts_emp, inserts_user, updates = [], [], []
+    # Other workers' in-memory indexes follow this (see sync_employee_indexes)
+    updated_at = datetime.now(timezone.utc)
  
     for emp, user in zip(employees, users):
         eid = emp.employee_id
         emp_data = convert_dates_for_mongo(emp.model_dump(by_alias=False))
+        emp_data.update(search_fields(emp_data))
+        emp_data.update(normalized_fields(emp_data))
+        emp_data["updated_at"] = updated_at
         user_data = user.model_dump(by_alias=False)
  
         if eid not in emp_map:
@@ -109,50 +286,62 @@ async def sync_employees_with_db(employees: List[Employee], users: List[User]):
             inserts_emp.append(emp_data)
             inserts_user.append(user_data)
         else:
+            # One op per employee (reactivation included), so written ops count rows
             if not emp_map[eid].get("status"):
-                updates.append({"filter": {"employee_id": eid}, "update": {"$set": {"status": True}}})
+                emp_data["status"] = True
             updates.append({"filter": {"employee_id": eid}, "update": {"$set": emp_data}})
             if str(eid) not in user_set:
                 inserts_user.append(user_data)
  
-    if inserts_emp:  await collections["employees"].insert_many(inserts_emp, ordered=False)
-    if inserts_user: await collections["users"].insert_many(inserts_user, ordered=False)
-    for op in updates:
-        await collections["employees"].update_one(op["filter"], op["update"])
+    emp_ops = [InsertOne(doc) for doc in inserts_emp]
+    emp_ops += [UpdateOne(op["filter"], op["update"]) for op in updates]
+    user_ops = [InsertOne(doc) for doc in inserts_user]
+    return emp_ops, user_ops, len(inserts_emp), len(updates), len(inserts_user)
+
+
+async def sync_employees_with_db(employees: List[Employee], users: List[User], on_progress=None):
+ 
+    existing = await collections["employees"].find({}, {"employee_id": 1, "status": 1}).to_list(None)
+    emp_map = {e["employee_id"]: e for e in existing}
+ 
+    existing_users = await collections["users"].find({}, {"employee_id": 1}).to_list(None)
+    user_set = {u["employee_id"] for u in existing_users}
+ 
+    emp_ops, user_ops, inserted, updated, users_inserted = await asyncio.to_thread(
+        _employee_writes, employees, users, emp_map, user_set)
+    # rows_written follows the employee rows only; user inserts are reported as users_inserted
+    emp_result = await bulk_write_chunked(collections["employees"], emp_ops, on_progress=on_progress)
+    user_result = await bulk_write_chunked(collections["users"], user_ops)
+    errors = emp_result["errors"] + user_result["errors"]
+
+    # Roles come from the employee type → drop cached users touched by this upload
+    invalidate_user_cache(*(emp.employee_id for emp in employees))
+    # Keep the in-memory indexes in step with the upload, a slice at a time so
+    # other requests get the loop in between
+    for start in range(0, len(employees), INDEX_PATCH_BATCH_SIZE):
+        batch = employees[start:start + INDEX_PATCH_BATCH_SIZE]
+        skill_index.update_employees(
+            {"employee_id": emp.employee_id, "detailed_skills": emp.detailed_skills,
+             "band": emp.band, "city": emp.city, "status": True}
+            for emp in batch
+        )
+        refresh_candidate_matrix([emp.employee_id for emp in batch])
+        suggest_index.update_employees(emp.model_dump(by_alias=False) for emp in batch)
+        await asyncio.sleep(0)
+    await refresh_recommendations("employees", [emp.employee_id for emp in employees])
+    try:
+        await compute_facets()
+    except Exception as e:
+        logger.error(f"Employee facet refresh failed: {e}")
  
     return {
-        "employees_inserted": len(inserts_emp),
-        "employees_updated": len(updates),
-        "users_inserted": len(inserts_user),
+        "employees_inserted": inserted,
+        "employees_updated": updated,
+        "users_inserted": users_inserted,
+        "write_errors": len(errors),
+        "errors_sample": errors[:5],
     }
     
-def read_csv_file(content: bytes):
-    """Read CSV reliably even if corrupted or irregular."""
-    # Detect encoding
-    enc = chardet.detect(content).get("encoding") or "utf-8"
-
-    text = content.decode(enc, errors="ignore")
-    stream = StringIO(text)
-
-
-    reader = csv.reader(stream)
-
-    # Remove completely empty rows
-    rows = [row for row in reader if any(cell.strip() for cell in row)]
-
-    if not rows:
-        return None  # No data
-
-    # Convert to DataFrame-like object
-    header = rows[0]
-    data_rows = rows[1:]
-
-    # Normalize row lengths
-    data = [row + [""] * (len(header) - len(row)) for row in data_rows]
-
-    df = pd.DataFrame(data, columns=header)
-    return df
-
 async def delete_old_files_in_processed():
     now = datetime.now()
     for filename in os.listdir(PROCESSED_FOLDER):
@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import os
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collation import Collation, CollationStrength
+from pymongo.errors import OperationFailure
+
+from database import db
+from utils.file_upload_utils import logger
+
+# -------------------------------------------------------------------
+# Index Manifest
+# -------------------------------------------------------------------
+# Every index the handlers rely on, by collection. ensure_indexes() applies
+# the manifest at startup; create_indexes is a no-op for indexes that already
+# exist with the same name and spec, so restarts are cheap.
+#
+# Report on a live database:
+#   python -m utils.indexes            # missing / unused / unmanaged indexes
+#   python -m utils.indexes --apply    # create missing ones first
+
+INDEX_BOOTSTRAP = os.getenv("INDEX_BOOTSTRAP", "true").lower() == "true"
+# Block-listed refresh tokens are useless once the token itself has expired
+BLOCK_LIST_TTL_SECONDS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")) * 24 * 3600
+
+# Case-insensitive ordering for sorted listings; a sort only uses an index
+# built with the same collation as the query
+CASE_INSENSITIVE = Collation(locale="en", strength=CollationStrength.SECONDARY)
+EMPLOYEE_SORT_FIELDS = ["employee_name", "employee_id", "designation", "band", "city", "type"]
+
+INDEX_MANIFEST = {
+    "employees": [
+        IndexModel([("employee_id", ASCENDING)], name="employee_id"),
+        IndexModel([("type", ASCENDING)], name="type"),
+        IndexModel([("detailed_skills", ASCENDING)], name="detailed_skills"),
+        # /employees/search: anchored prefix regex per query word
+        IndexModel([("search_terms", ASCENDING)], name="search_terms"),
+        # /employees/filter: equality, $in and anchored prefix on the normalized copies
+        IndexModel([("norm.band", ASCENDING)], name="norm_band"),
+        IndexModel([("norm.city", ASCENDING)], name="norm_city"),
+        IndexModel([("norm.designation", ASCENDING)], name="norm_designation"),
+        IndexModel([("norm.primary_technology", ASCENDING)], name="norm_primary_technology"),
+        IndexModel([("norm.secondary_technology", ASCENDING)], name="norm_secondary_technology"),
+        IndexModel([("norm.type", ASCENDING), ("norm.employment_type", ASCENDING)], name="norm_type_employment_type"),
+        # employment_type on its own is not a prefix of the compound index above
+        IndexModel([("norm.employment_type", ASCENDING)], name="norm_employment_type"),
+        # Skill availability fallback (normalized like the skill index)
+        IndexModel([("norm.skills", ASCENDING)], name="norm_skills"),
+        # Changes picked up by the other workers' in-memory indexes
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+        # /employees/sort: (field, _id) matches the keyset order; walked backwards for desc
+        *(IndexModel([(field, ASCENDING), ("_id", ASCENDING)], name=f"sort_{field}", collation=CASE_INSENSITIVE)
+          for field in EMPLOYEE_SORT_FIELDS),
+    ],
+    "resource_request": [
+        IndexModel([("resource_request_id", ASCENDING)], name="resource_request_id"),
+        IndexModel([("hm_id", ASCENDING)], name="hm_id"),
+        IndexModel([("wfm_id", ASCENDING)], name="wfm_id"),
+        # TP job listing: flag equality, job_grade $in (band ±1), optional city
+        IndexModel([("flag", ASCENDING), ("job_grade", ASCENDING), ("city", ASCENDING)],
+                   name="flag_job_grade_city"),
+    ],
+    "applications": [
+        IndexModel([("job_rr_id", ASCENDING), ("status", ASCENDING)], name="job_rr_id_status"),
+        # Also serves the duplicate-application check (employee_id + job_rr_id)
+        IndexModel([("employee_id", ASCENDING), ("job_rr_id", ASCENDING)], name="employee_id_job_rr_id"),
+        IndexModel([("status", ASCENDING), ("updated_at", DESCENDING)], name="status_updated_at"),
+    ],
+    "job_recommendations": [
+        # RR change → employees whose stored list contains the RR
+        IndexModel([("jobs.rr_id", ASCENDING)], name="jobs_rr_id"),
+    ],
+    "upload_jobs": [
+        # Orphaned queued/running jobs (no heartbeat since the cutoff)
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at"),
+    ],
+    "users": [
+        IndexModel([("employee_id", ASCENDING)], name="employee_id"),
+    ],
+    "refresh_tokens": [
+        IndexModel([("token", ASCENDING)], name="token"),
+        IndexModel([("employee_id", ASCENDING), ("created_at", DESCENDING)], name="employee_id_created_at"),
+        # TTL: Mongo removes the document once expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "block_list_tokens": [
+        IndexModel([("token", ASCENDING)], name="token"),
+        IndexModel([("blacklisted_at", ASCENDING)], name="blacklisted_at_ttl",
+                   expireAfterSeconds=BLOCK_LIST_TTL_SECONDS),
+    ],
+}
+
+
+async def ensure_indexes(database=None) -> dict:
+    """
+    Create every manifest index that is missing. A conflicting existing index
+    (same name or keys, other options) is logged and left alone so startup
+    never fails on it; the report shows it as missing.
+    """
+    database = database if database is not None else db
+    ensured = {}
+    for name, models in INDEX_MANIFEST.items():
+        for model in models:
+            try:
+                await database[name].create_indexes([model])
+                ensured.setdefault(name, []).append(model.document["name"])
+            except OperationFailure as e:
+                logger.error(f"Index {name}.{model.document['name']} not applied: {e}")
+    logger.info(f"Index manifest applied: {sum(len(v) for v in ensured.values())} indexes ensured")
+    return ensured
+
+
+# -------------------------------------------------------------------
+# Index Report
+# -------------------------------------------------------------------
+def _same_spec(existing: dict, wanted: dict) -> bool:
+    return (list(existing["key"].items()) == list(wanted["key"].items())
+            and existing.get("expireAfterSeconds") == wanted.get("expireAfterSeconds")
+            and (existing.get("collation") or {}).get("locale") == (wanted.get("collation") or {}).get("locale")
+            and (existing.get("collation") or {}).get("strength") == (wanted.get("collation") or {}).get("strength"))
+
+
+async def index_report(database=None) -> dict:
+    """
+    Compare the manifest with the live database.
+      missing   - manifest index absent (or present with a different spec)
+      unused    - existing index with no recorded access since the server started
+      unmanaged - existing index that is not in the manifest
+    """
+    database = database if database is not None else db
+    report = {"missing": [], "unused": [], "unmanaged": []}
+    for name, models in INDEX_MANIFEST.items():
+        existing = {ix["name"]: ix async for ix in database[name].list_indexes()}
+        usage = {}
+        try:
+            async for stat in database[name].aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = stat["accesses"]["ops"]
+        except OperationFailure as e:
+            logger.error(f"$indexStats unavailable on {name}: {e}")
+
+        wanted = {m.document["name"]: m.document for m in models}
+        for ix_name, spec in wanted.items():
+            if ix_name not in existing or not _same_spec(existing[ix_name], spec):
+                report["missing"].append({"collection": name, "name": ix_name, "key": dict(spec["key"])})
+
+        for ix_name, ix in existing.items():
+            if ix_name == "_id_":
+                continue
+            if ix_name not in wanted:
+                report["unmanaged"].append({"collection": name, "name": ix_name, "key": dict(ix["key"])})
+            # TTL indexes are used by the TTL monitor, not by queries
+            if usage.get(ix_name) == 0 and "expireAfterSeconds" not in ix:
+                report["unused"].append({"collection": name, "name": ix_name, "key": dict(ix["key"])})
+    return report
+
+
+def _print_report(report: dict):
+    for section in ("missing", "unused", "unmanaged"):
+        print(f"{section} ({len(report[section])}):")
+        for ix in report[section]:
+            print(f"  {ix['collection']}.{ix['name']}  {ix['key']}")
+
+
+async def _main(apply: bool):
+    if apply:
+        await ensure_indexes()
+    report = await index_report()
+    _print_report(report)
+    return 1 if report["missing"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report missing/unused MongoDB indexes against the manifest")
+    parser.add_argument("--apply", action="store_true", help="create missing manifest indexes before reporting")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.apply)))
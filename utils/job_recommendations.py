@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from pymongo import DeleteOne, ReplaceOne
+
+from database import collections
+from utils.file_upload_utils import bulk_write_chunked, logger
+from utils.jobs_crud import BANDS, map_job
+from utils.projections import JOB_VIEW_FIELDS, projection
+
+# -------------------------------------------------------------------
+# Job Recommendation Store
+# -------------------------------------------------------------------
+# One document per TP employee in `job_recommendations` (_id = employee_id)
+# holding the ranked open RRs that /jobs/ shows them: job_grade within band
+# ±1 and at least one mandatory skill the employee has (same rule as the old
+# live query). Ranked by matched mandatory skills, then band distance.
+# Rows have the map_job shape of the live query. Only the top
+# RECOMMENDATIONS_PER_EMPLOYEE are kept; `truncated` marks a list that hit
+# the cap, and get_jobs serves those employees from the live query instead.
+#
+# Refreshed incrementally:
+#   - employee upload → the uploaded employees
+#   - RR upload / HM edit → employees who match the changed RRs now, plus
+#     employees whose stored list contains them
+#
+# The open RRs are loaded once and kept in `open_rrs`; an RR change re-reads
+# only the changed RRs. Edits made by other uvicorn workers are picked up by
+# a full reload once the loaded set is RECOMMENDATIONS_OPEN_RR_MAX_AGE seconds
+# old (the RR refresh of the worker that made the edit is always exact).
+
+RECOMMENDATIONS_PER_EMPLOYEE = int(os.getenv("RECOMMENDATIONS_PER_EMPLOYEE", "100"))
+RECOMMENDATIONS_REBUILD_ON_STARTUP = os.getenv("RECOMMENDATIONS_REBUILD_ON_STARTUP", "false").lower() == "true"
+RECOMMENDATIONS_OPEN_RR_MAX_AGE = float(os.getenv("RECOMMENDATIONS_OPEN_RR_MAX_AGE", "300"))
+
+EMPLOYEE_PROJECTION = {"_id": 0, "employee_id": 1, "band": 1, "detailed_skills": 1}
+
+
+def band_window(band):
+    """Band ±1 as in get_jobs; None when the band is not on the BANDS scale."""
+    if band not in BANDS:
+        return None
+    indx = BANDS.index(band)
+    return {BANDS[max(indx - 1, 0)], band, BANDS[min(indx + 1, len(BANDS) - 1)]}
+
+
+class OpenRRs:
+    """Open RRs (flag True) with a mandatory skill → rr_id lookup."""
+    def __init__(self, docs):
+        self.by_id = {}
+        self.by_skill = {}
+        for doc in docs:
+            self._add(doc)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    async def load(cls):
+        return cls(await collections["resource_request"].find({"flag": True}, projection(JOB_VIEW_FIELDS)).to_list(None))
+
+    def _add(self, doc):
+        rr_id = doc.get("resource_request_id")
+        if not rr_id:
+            return
+        self.by_id[rr_id] = doc
+        for skill in set(doc.get("mandatory_skills") or []):
+            self.by_skill.setdefault(skill, set()).add(rr_id)
+
+    def _remove(self, rr_id):
+        doc = self.by_id.pop(rr_id, None)
+        for skill in set((doc or {}).get("mandatory_skills") or []):
+            rr_ids = self.by_skill.get(skill)
+            if rr_ids is not None:
+                rr_ids.discard(rr_id)
+                if not rr_ids:
+                    del self.by_skill[skill]
+
+    async def apply(self, rr_ids: list):
+        """Re-read only the given RRs: changed ones are replaced, closed/deleted ones dropped."""
+        docs = await collections["resource_request"].find(
+            {"resource_request_id": {"$in": rr_ids}, "flag": True}, projection(JOB_VIEW_FIELDS)
+        ).to_list(None)
+        for rr_id in rr_ids:
+            self._remove(rr_id)
+        for doc in docs:
+            self._add(doc)
+
+    async def rank_for(self, employee: dict) -> tuple:
+        """(jobs, truncated): the top RECOMMENDATIONS_PER_EMPLOYEE jobs, shaped like map_job."""
+        window = band_window(employee.get("band"))
+        if not window:
+            return [], False
+        matched = {}
+        for skill in set(employee.get("detailed_skills") or []):
+            for rr_id in self.by_skill.get(skill, ()):
+                matched[rr_id] = matched.get(rr_id, 0) + 1
+
+        band_pos = BANDS.index(employee["band"])
+        ranked = sorted(
+            (rr_id for rr_id in matched if self.by_id[rr_id].get("job_grade") in window),
+            key=lambda rr_id: (-matched[rr_id],
+                               abs(BANDS.index(self.by_id[rr_id]["job_grade"]) - band_pos),
+                               rr_id)
+        )
+        truncated = len(ranked) > RECOMMENDATIONS_PER_EMPLOYEE
+        return [await map_job(self.by_id[rr_id]) for rr_id in ranked[:RECOMMENDATIONS_PER_EMPLOYEE]], truncated
+
+
+class OpenRRCache:
+    """The loaded OpenRRs, shared by every refresh in this process."""
+    def __init__(self):
+        self.current = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, changed_rr_ids=None) -> OpenRRs:
+        # One loader at a time, so a slow full load never overwrites a newer apply()
+        async with self._lock:
+            if self.current is None or time.monotonic() - self.current.loaded_at > RECOMMENDATIONS_OPEN_RR_MAX_AGE:
+                self.current = await OpenRRs.load()
+            elif changed_rr_ids:
+                await self.current.apply(changed_rr_ids)
+            return self.current
+
+    async def reload(self) -> OpenRRs:
+        async with self._lock:
+            self.current = await OpenRRs.load()
+            return self.current
+
+
+open_rrs = OpenRRCache()
+
+
+async def _store(employees: list, rrs: OpenRRs) -> int:
+    now = datetime.now(timezone.utc)
+    ops = []
+    for emp in employees:
+        jobs, truncated = await rrs.rank_for(emp)
+        ops.append(ReplaceOne(
+            {"_id": emp["employee_id"]},
+            {"employee_id": emp["employee_id"], "band": emp.get("band"),
+             "jobs": jobs, "truncated": truncated, "computed_at": now},
+            upsert=True
+        ))
+        if len(ops) % 500 == 0:
+            await asyncio.sleep(0)  # ranking is CPU work; let other requests in
+    if ops:
+        await bulk_write_chunked(collections["job_recommendations"], ops)
+    return len(ops)
+
+
+async def refresh_for_employees(employee_ids: list) -> int:
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return 0
+    tp = await collections["employees"].find(
+        {"employee_id": {"$in": employee_ids}, "type": "TP"}, EMPLOYEE_PROJECTION
+    ).to_list(None)
+    # Employees that are no longer TP lose their stored list
+    tp_ids = {e["employee_id"] for e in tp}
+    stale = [DeleteOne({"_id": eid}) for eid in employee_ids if eid not in tp_ids]
+    if stale:
+        await bulk_write_chunked(collections["job_recommendations"], stale)
+
+    count = await _store(tp, await open_rrs.get()) if tp else 0
+    logger.info(f"Job recommendations refreshed for {count} employees (employee change)")
+    return count
+
+
+async def refresh_for_rrs(rr_ids: list) -> int:
+    rr_ids = list(rr_ids)
+    if not rr_ids:
+        return 0
+    rrs = await open_rrs.get(rr_ids)
+    skills = {s for rr_id in rr_ids for s in (rrs.by_id.get(rr_id) or {}).get("mandatory_skills") or []}
+
+    affected = set()
+    if skills:
+        affected.update(e["employee_id"] for e in await collections["employees"].find(
+            {"type": "TP", "detailed_skills": {"$in": list(skills)}}, {"_id": 0, "employee_id": 1}
+        ).to_list(None))
+    affected.update(r["_id"] for r in await collections["job_recommendations"].find(
+        {"jobs.rr_id": {"$in": rr_ids}}, {"_id": 1}
+    ).to_list(None))
+    if not affected:
+        return 0
+
+    employees = await collections["employees"].find(
+        {"employee_id": {"$in": list(affected)}, "type": "TP"}, EMPLOYEE_PROJECTION
+    ).to_list(None)
+    count = await _store(employees, rrs)
+    logger.info(f"Job recommendations refreshed for {count} employees ({len(rr_ids)} RRs changed)")
+    return count
+
+
+async def rebuild_all() -> int:
+    employees = await collections["employees"].find({"type": "TP"}, EMPLOYEE_PROJECTION).to_list(None)
+    count = await _store(employees, await open_rrs.reload())
+    tp_ids = [e["employee_id"] for e in employees]
+    await collections["job_recommendations"].delete_many({"_id": {"$nin": tp_ids}})
+    logger.info(f"Job recommendations rebuilt for {count} TP employees")
+    return count
+
@@ -0,0 +1,132 @@
+import base64
+import os
+from typing import Optional
+
+from bson import json_util
+from fastapi import HTTPException, Query, Response
+
+# -------------------------------------------------------------------
+# Keyset (cursor) pagination
+# -------------------------------------------------------------------
+# Pages are read with a range filter on the sort key(s) + _id instead of
+# skip/limit, so every page costs the same whatever its position. The `next`
+# token is opaque to clients: base64 of the sort fields and the last
+# document's values for them.
+#
+# Endpoints returning {"count", "data", ...} get "next" (and "total") in the
+# body; endpoints returning a bare list get them as X-Next-Cursor /
+# X-Total-Count headers so the body shape is unchanged.
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint (use with Depends())."""
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX, description="Page size"),
+        cursor: Optional[str] = Query(None, description="`next` token of the previous page"),
+        include_total: bool = Query(False, description="Also count all matching documents"),
+    ):
+        self.limit = limit or PAGE_SIZE_DEFAULT
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+def encode_cursor(fields: list, values: list) -> str:
+    raw = json_util.dumps({"f": fields, "v": values})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str, fields: list) -> list:
+    try:
+        data = json_util.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+        values = data["v"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # A token from another sort order would skip or repeat documents
+    if data.get("f") != fields or len(values) != len(fields):
+        raise HTTPException(status_code=400, detail="Cursor does not match this sort order")
+    return values
+
+
+def _after(field: str, direction: int, value) -> dict:
+    """Documents strictly after `value` on one sort key (nulls sort first)."""
+    if direction == 1:
+        return {field: {"$ne": None}} if value is None else {field: {"$gt": value}}
+    if value is None:
+        return {"_id": {"$exists": False}}  # nothing sorts before null in descending order
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """(a > x) or (a == x and b > y) or ... for the sort keys [(a, dir), (b, dir), ...]."""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        branch = {"$and": [branch, _after(field, direction, values[i])]} if branch else _after(field, direction, values[i])
+        branches.append(branch)
+    return {"$or": branches} if len(branches) > 1 else branches[0]
+
+
+def _value(doc: dict, field: str):
+    for part in field.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+async def paginate(collection, query: dict, page: PageParams, sort: Optional[list] = None,
+                   projection: Optional[dict] = None, serialize=None, collation=None) -> dict:
+    """
+    One page of collection.find(query) ordered by sort (+ _id as tie-breaker).
+    Returns {"data", "next", "total"}; next is None on the last page.
+    A collation applies to the sort and to the cursor comparisons alike.
+    """
+    sort = list(sort or [])
+    if not any(field == "_id" for field, _ in sort):
+        sort.append(("_id", sort[-1][1] if sort else 1))
+    fields = [field for field, _ in sort]
+    # The next token needs the sort keys even when an inclusion projection omits them
+    if projection and any(projection.values()):
+        projection = {**projection, **{field: 1 for field in fields}}
+
+    find_query = query
+    if page.cursor:
+        after = keyset_filter(sort, decode_cursor(page.cursor, fields))
+        find_query = {"$and": [query, after]} if query else after
+
+    find_kwargs = {"collation": collation} if collation else {}
+    docs = await collection.find(find_query, projection, **find_kwargs).sort(sort).limit(page.limit + 1).to_list(page.limit + 1)
+    has_more = len(docs) > page.limit
+    docs = docs[:page.limit]
+    next_token = encode_cursor(fields, [_value(docs[-1], f) for f in fields]) if has_more else None
+    total = await collection.count_documents(query, **find_kwargs) if page.include_total else None
+
+    return {
+        "data": [serialize(d) for d in docs] if serialize else docs,
+        "next": next_token,
+        "total": total,
+    }
+
+
+def paginate_list(items: list, page: PageParams) -> dict:
+    """Same contract for an already-materialized ordered list (position-based token)."""
+    start = decode_cursor(page.cursor, ["#"])[0] if page.cursor else 0
+    if not isinstance(start, int) or start < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    end = start + page.limit
+    return {
+        "data": items[start:end],
+        "next": encode_cursor(["#"], [end]) if end < len(items) else None,
+        "total": len(items) if page.include_total else None,
+    }
+
+
+def set_page_headers(response: Response, result: dict) -> list:
+    """Expose next/total as headers for endpoints whose body is a bare list."""
+    if result.get("next"):
+        response.headers["X-Next-Cursor"] = result["next"]
+    if result.get("total") is not None:
+        response.headers["X-Total-Count"] = str(result["total"])
+    return result["data"]
@@ -0,0 +1,48 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+
+# -------------------------------------------------------------------
+# Field projections for list endpoints
+# -------------------------------------------------------------------
+# Each list endpoint reads only the fields it returns. Clients can narrow (or
+# widen) the document fields with `fields=a,b,c`; _id is always included.
+
+# Everything map_job reads from a resource_request document
+JOB_VIEW_FIELDS = [
+    "resource_request_id", "project_name", "city", "state", "country",
+    "mandatory_skills", "optional_skills", "job_description", "ust_role_description",
+    "rr_start_date", "rr_end_date", "job_grade", "account_name", "project_id",
+]
+
+# RR summary for the manager listing (the long description fields are left out)
+MANAGER_JOB_FIELDS = [
+    "resource_request_id", "project_id", "project_name", "account_name", "ust_role",
+    "job_grade", "city", "state", "country", "rr_status", "flag", "rr_type", "priority",
+    "rr_start_date", "rr_end_date", "mandatory_skills", "optional_skills",
+    "hm_id", "wfm_id",
+]
+
+# Employee listings: the profile without resume_text / resume
+EMPLOYEE_LIST_FIELDS = [
+    "employee_id", "employee_name", "employment_type", "designation", "band", "city",
+    "location_description", "primary_technology", "secondary_technology",
+    "detailed_skills", "type", "status",
+]
+
+# Bookkeeping sync_employees_with_db adds to employees (search / filter shadow
+# fields, updated_at); never returned by the single-employee read
+EMPLOYEE_INTERNAL_FIELDS = ["search_terms", "name_terms", "norm", "updated_at"]
+
+_FIELD_RE = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+
+def projection(default_fields: list, fields: Optional[str] = None) -> dict:
+    """Inclusion projection from the endpoint default or a comma-separated `fields` value."""
+    names = default_fields
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        if invalid := [name for name in names if not _FIELD_RE.match(name)]:
+            raise HTTPException(status_code=400, detail=f"Invalid field names: {invalid}")
+    return {name: 1 for name in names}
@@ -4,7 +4,10 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from database import collections
 from passlib.context import CryptContext
+from utils.cache import TTLCache
 from dotenv import load_dotenv
+import hashlib
+import time
 import os
 load_dotenv()
 # === CONFIG ===
@@ -12,10 +15,19 @@ SECRET_KEY =os.getenv("SECRET_KEY")  # Use env var in prod
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
+# Authenticated user records keyed by employee_id (string, as stored in users)
+user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# Verified JWT claims keyed by sha256(token); each entry lives until the token's own exp
+token_cache = TTLCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 # === PASSWORD & JWT ===
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
@@ -32,11 +44,26 @@ def create_refresh_token(data: dict) -> str:
     to_encode.update({"exp": expire, "type": "refresh"})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Verify a JWT once and reuse the claims for the rest of its lifetime.
+# Raises the same jose errors as jwt.decode (ExpiredSignatureError / JWTError).
+def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = payload.get("exp")
+        if exp is not None:
+            token_cache.set(key, payload, ttl_seconds=min(exp - time.time(), token_cache.ttl_seconds))
+    return dict(payload)
+
+def token_cache_stats() -> dict:
+    return token_cache.stats()
+
 # === AUTH DEPENDENCY ===
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
     token = credentials.credentials
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         emp_id: str = payload.get("sub")
         token_type: str = payload.get("type")
         role: str = payload.get("role")
@@ -47,8 +74,27 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = await collections["users"].find_one({"employee_id": emp_id})
+    user = await get_cached_user(emp_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
     return {"employee_id": emp_id, "role": user["role"], "user": user}
+
+# === USER CACHE ===
+# Only a miss goes to Mongo; unknown users are not cached so a freshly
+# uploaded employee can log in without waiting for the TTL.
+async def get_cached_user(emp_id: str):
+    user = user_cache.get(emp_id)
+    if user is None:
+        user = await collections["users"].find_one({"employee_id": emp_id})
+        if not user:
+            return None
+        user_cache.set(emp_id, user)
+    return dict(user)
+
+def invalidate_user_cache(*emp_ids):
+    # users.employee_id is stored as a string, employees.employee_id as an int
+    user_cache.invalidate_many(str(e) for e in emp_ids)
+
+def user_cache_stats() -> dict:
+    return user_cache.stats()
@@ -0,0 +1,144 @@
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from database import collections
+
+# Same logger as utils.file_upload_utils (which imports this module)
+logger = logging.getLogger("RRProcessor")
+
+# -------------------------------------------------------------------
+# In-memory Skill Index
+# -------------------------------------------------------------------
+# normalized skill → set of employee_ids, plus the reverse map
+# employee_id → normalized skills and a small profile (band, city, active)
+# used for ranking. Built from `employees` at startup and patched after every
+# employee upload (the only writer of these fields), so skill lookups do not
+# go to Mongo. Callers fall back to their Mongo query while the index is not
+# ready. `version` changes on every build/update so derived structures know
+# when to rebuild.
+#
+# Each uvicorn worker holds its own copy: an upload patches the worker that
+# handled it, and the others catch up within EMPLOYEE_INDEX_SYNC_SECONDS
+# (utils.file_upload_utils.sync_employee_indexes).
+
+SKILL_INDEX_ENABLED = os.getenv("SKILL_INDEX_ENABLED", "true").lower() == "true"
+INDEX_PROJECTION = {"_id": 0, "employee_id": 1, "detailed_skills": 1, "band": 1, "city": 1, "status": 1}
+
+
+def normalize_skill(skill) -> str:
+    """Lower-case, strip list/quote debris and collapse whitespace."""
+    skill = str(skill)
+    for ch in "[]'\"":
+        skill = skill.replace(ch, "")
+    return " ".join(skill.split()).lower()
+
+
+class SkillIndex:
+    def __init__(self):
+        self.postings = {}
+        self.skills_by_employee = {}
+        self.profiles = {}
+        self.version = 0
+        self.ready = False
+        self._building = False
+        self._changed_during_build = set()
+        self.built_at = None
+        self.build_seconds = None
+        self.refreshed_at = None
+        self.refreshes = 0
+
+    async def build(self):
+        self._building = True
+        self._changed_during_build = set()
+        started = time.perf_counter()
+        postings, skills_by_employee, profiles = {}, {}, {}
+        try:
+            async for doc in collections["employees"].find({}, INDEX_PROJECTION):
+                self._add(postings, skills_by_employee, profiles, doc)
+        finally:
+            self._building = False
+
+        self.postings, self.skills_by_employee, self.profiles = postings, skills_by_employee, profiles
+        self.version += 1
+        self.ready = True
+        self.built_at = datetime.now(timezone.utc)
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Skill index built: {len(skills_by_employee)} employees, "
+                    f"{len(postings)} skills in {self.build_seconds}s")
+
+        # Uploads that landed while the build was reading are re-read
+        if self._changed_during_build:
+            await self.refresh(list(self._changed_during_build))
+
+    @staticmethod
+    def _add(postings, skills_by_employee, profiles, doc):
+        employee_id = doc.get("employee_id")
+        if employee_id is None:
+            return
+        normalized = frozenset(filter(None, (normalize_skill(s) for s in doc.get("detailed_skills") or [])))
+        skills_by_employee[employee_id] = normalized
+        profiles[employee_id] = (doc.get("band"), normalize_skill(doc.get("city") or ""), doc.get("status", True) is not False)
+        for skill in normalized:
+            postings.setdefault(skill, set()).add(employee_id)
+
+    def update_employees(self, docs):
+        """Apply employee documents (employee_id, detailed_skills, band, city, status) from an upload."""
+        count = 0
+        for doc in docs:
+            employee_id = doc["employee_id"]
+            if self._building:
+                self._changed_during_build.add(employee_id)
+            if not self.ready:
+                continue
+            for skill in self.skills_by_employee.get(employee_id, ()):
+                ids = self.postings.get(skill)
+                if ids is not None:
+                    ids.discard(employee_id)
+                    if not ids:
+                        del self.postings[skill]
+            self._add(self.postings, self.skills_by_employee, self.profiles, doc)
+            count += 1
+        self.version += 1
+        self.refreshed_at = datetime.now(timezone.utc)
+        self.refreshes += 1
+        return count
+
+    async def refresh(self, employee_ids: list):
+        docs = await collections["employees"].find({"employee_id": {"$in": employee_ids}}, INDEX_PROJECTION).to_list(None)
+        return self.update_employees(docs)
+
+    def employees_with(self, skill) -> set:
+        return self.postings.get(normalize_skill(skill), set())
+
+    def skills_of(self, employee_id):
+        return self.skills_by_employee.get(employee_id)
+
+    def profile_of(self, employee_id):
+        return self.profiles.get(employee_id)
+
+    def stats(self) -> dict:
+        approx_bytes = sys.getsizeof(self.postings) + sys.getsizeof(self.skills_by_employee)
+        for skill, ids in self.postings.items():
+            approx_bytes += sys.getsizeof(skill) + sys.getsizeof(ids)
+        for skills in self.skills_by_employee.values():
+            approx_bytes += sys.getsizeof(skills)
+        approx_bytes += sys.getsizeof(self.profiles) + sum(sys.getsizeof(p) for p in self.profiles.values())
+        return {
+            "enabled": SKILL_INDEX_ENABLED,
+            "ready": self.ready,
+            "employees": len(self.skills_by_employee),
+            "skills": len(self.postings),
+            "postings": sum(len(ids) for ids in self.postings.values()),
+            "approx_memory_bytes": approx_bytes,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+            "refreshed_at": self.refreshed_at,
+            "incremental_refreshes": self.refreshes,
+            "version": self.version,
+        }
+
+
+skill_index = SkillIndex()
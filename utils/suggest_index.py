@@ -0,0 +1,220 @@
+import bisect
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from database import collections
+
+# Same logger as utils.file_upload_utils (which imports this module)
+logger = logging.getLogger("RRProcessor")
+
+# -------------------------------------------------------------------
+# Type-ahead Suggest Index
+# -------------------------------------------------------------------
+# In-process trigram index over the distinct values of a few employee fields.
+#
+#   term    = (field, normalized value), e.g. ("city", "bangalore")
+#   grams   = trigram → ascending list of term ids; every word also gets the
+#             word-start grams "  j" and " ja" so 1-2 character prefixes are
+#             lookups too
+#   members = term id → set of employee_ids
+#
+# Term ids are handed out shortest value first at build time and only ever
+# appended afterwards, so every gram list is already in rank order: a query
+# walks the shortest list of its grams, checks the others by bisect and stops
+# as soon as it has `limit` employees from word-prefix matches. Infix matches
+# (query inside a word) only fill up what is left. Built from `employees` at
+# startup and patched after every employee upload, like the skill index.
+
+SUGGEST_INDEX_ENABLED = os.getenv("SUGGEST_INDEX_ENABLED", "true").lower() == "true"
+SUGGEST_FIELDS = ["employee_name", "designation", "primary_technology", "secondary_technology", "city"]
+SUGGEST_PROJECTION = {"_id": 0, "employee_id": 1, **{field: 1 for field in SUGGEST_FIELDS}}
+
+
+def normalize_value(value) -> str:
+    return " ".join(str(value).lower().split()) if value is not None else ""
+
+
+def word_grams(word: str) -> set:
+    padded = "  " + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def query_grams(word: str) -> set:
+    # Short words can only be looked up as word prefixes
+    return word_grams(word) if len(word) < 3 else {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _contains(ids: list, term_id: int) -> bool:
+    i = bisect.bisect_left(ids, term_id)
+    return i < len(ids) and ids[i] == term_id
+
+
+class SuggestIndex:
+    def __init__(self):
+        self.terms = []            # term id → (field, value, words)
+        self.term_ids = {}         # (field, value) → term id
+        self.grams = {}
+        self.members = []
+        self.terms_by_employee = {}
+        self.ready = False
+        self._building = False
+        self._changed_during_build = set()
+        self.built_at = None
+        self.build_seconds = None
+        self.refreshes = 0
+
+    async def build(self):
+        self._building = True
+        self._changed_during_build = set()
+        started = time.perf_counter()
+        values = {}
+        try:
+            async for doc in collections["employees"].find({}, SUGGEST_PROJECTION):
+                if doc.get("employee_id") is None:
+                    continue
+                for key in self._keys(doc):
+                    values.setdefault(key, set()).add(doc["employee_id"])
+        finally:
+            self._building = False
+
+        # Term ids in rank order (shorter values first) so ties need no sort
+        self.terms, self.term_ids, self.grams, self.members, self.terms_by_employee = [], {}, {}, [], {}
+        for key in sorted(values, key=lambda k: (len(k[1]), k[1], k[0])):
+            term_id = self._add_term(key)
+            self.members[term_id] = values[key]
+            for employee_id in values[key]:
+                self.terms_by_employee.setdefault(employee_id, []).append(term_id)
+
+        self.ready = True
+        self.built_at = datetime.now(timezone.utc)
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Suggest index built: {len(self.terms)} terms, {len(self.grams)} trigrams, "
+                    f"{len(self.terms_by_employee)} employees in {self.build_seconds}s")
+
+        if self._changed_during_build:
+            await self.refresh(list(self._changed_during_build))
+
+    @staticmethod
+    def _keys(doc) -> set:
+        return {(field, value) for field in SUGGEST_FIELDS if (value := normalize_value(doc.get(field)))}
+
+    def _add_term(self, key) -> int:
+        term_id = self.term_ids.get(key)
+        if term_id is not None:
+            return term_id
+        term_id = len(self.terms)
+        words = key[1].split()
+        self.terms.append((key[0], key[1], words))
+        self.term_ids[key] = term_id
+        self.members.append(set())
+        for word in words:
+            for gram in word_grams(word):
+                ids = self.grams.setdefault(gram, [])
+                if not ids or ids[-1] != term_id:
+                    ids.append(term_id)
+        return term_id
+
+    def update_employees(self, docs):
+        """Apply employee documents (employee_id + SUGGEST_FIELDS) from an upload."""
+        count = 0
+        for doc in docs:
+            employee_id = doc["employee_id"]
+            if self._building:
+                self._changed_during_build.add(employee_id)
+            if not self.ready:
+                continue
+            # Terms left without members stay in place and are skipped at query time
+            for term_id in self.terms_by_employee.pop(employee_id, ()):
+                self.members[term_id].discard(employee_id)
+            term_ids = tuple(self._add_term(key) for key in self._keys(doc))
+            for term_id in term_ids:
+                self.members[term_id].add(employee_id)
+            self.terms_by_employee[employee_id] = term_ids
+            count += 1
+        self.refreshes += 1
+        return count
+
+    async def refresh(self, employee_ids: list):
+        docs = await collections["employees"].find({"employee_id": {"$in": employee_ids}}, SUGGEST_PROJECTION).to_list(None)
+        return self.update_employees(docs)
+
+    def _match(self, term_id: int, words: list):
+        """2 = every query word prefixes a term word, 1 = some only infix, None = no match."""
+        term_words = self.terms[term_id][2]
+        score = 2
+        for word in words:
+            if any(w.startswith(word) for w in term_words):
+                continue
+            if any(word in w for w in term_words):
+                score = 1
+                continue
+            return None
+        return score
+
+    def suggest(self, query: str, limit: int = 10) -> list:
+        """Top `limit` employees as [{"employee_id", "field", "value"}], best match first."""
+        words = normalize_value(query).split()
+        if not words:
+            return []
+        postings = []
+        for gram in set().union(*(query_grams(w) for w in words)):
+            ids = self.grams.get(gram)
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+
+        results, seen, infix = [], set(), []
+        for term_id in shortest:
+            if not self.members[term_id] or not all(_contains(ids, term_id) for ids in others):
+                continue
+            score = self._match(term_id, words)
+            if score == 2:
+                self._collect(results, seen, term_id, limit)
+                if len(results) >= limit:
+                    return results
+            elif score == 1 and len(infix) < limit:
+                infix.append(term_id)
+        for term_id in infix:
+            self._collect(results, seen, term_id, limit)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _collect(self, results, seen, term_id, limit):
+        field, value, _ = self.terms[term_id]
+        for employee_id in self.members[term_id]:
+            if employee_id in seen:
+                continue
+            seen.add(employee_id)
+            results.append({"employee_id": employee_id, "field": field, "value": value})
+            if len(results) >= limit:
+                return
+
+    def stats(self) -> dict:
+        approx_bytes = sys.getsizeof(self.grams) + sys.getsizeof(self.terms) + sys.getsizeof(self.term_ids)
+        for gram, ids in self.grams.items():
+            approx_bytes += sys.getsizeof(gram) + sys.getsizeof(ids)
+        for field, value, words in self.terms:
+            approx_bytes += sys.getsizeof(value) + sys.getsizeof(words) + sum(sys.getsizeof(w) for w in words)
+        approx_bytes += sum(sys.getsizeof(m) for m in self.members)
+        approx_bytes += sys.getsizeof(self.terms_by_employee) + sum(sys.getsizeof(t) for t in self.terms_by_employee.values())
+        return {
+            "enabled": SUGGEST_INDEX_ENABLED,
+            "ready": self.ready,
+            "employees": len(self.terms_by_employee),
+            "terms": len(self.terms),
+            "trigrams": len(self.grams),
+            "postings": sum(len(ids) for ids in self.grams.values()),
+            "approx_memory_bytes": approx_bytes,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+            "incremental_refreshes": self.refreshes,
+        }
+
+
+suggest_index = SuggestIndex()
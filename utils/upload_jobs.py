@@ -0,0 +1,199 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from database import collections
+from utils.file_upload_utils import logger
+
+# -------------------------------------------------------------------
+# Upload Job Queue
+# -------------------------------------------------------------------
+# Job mode for /api/upload: the file is written to JOB_FOLDER, a job document
+# is stored in upload_jobs and a background task processes it. At most
+# UPLOAD_JOB_CONCURRENCY jobs run at once; the rest wait in "queued".
+#
+# Jobs live in the worker that accepted them. Each worker touches updated_at
+# of its queued/running jobs every UPLOAD_JOB_STALE_SECONDS / 5, so a
+# queued/running job that has not been touched for UPLOAD_JOB_STALE_SECONDS
+# lost its worker (restart/crash) and is marked failed. Job files left behind
+# are removed after UPLOAD_JOB_FILE_RETENTION_HOURS.
+
+UPLOAD_JOB_CONCURRENCY = int(os.getenv("UPLOAD_JOB_CONCURRENCY", "2"))
+UPLOAD_JOB_STALE_SECONDS = int(os.getenv("UPLOAD_JOB_STALE_SECONDS", "300"))
+UPLOAD_JOB_HEARTBEAT_SECONDS = max(UPLOAD_JOB_STALE_SECONDS // 5, 1)
+UPLOAD_JOB_FILE_RETENTION_HOURS = int(os.getenv("UPLOAD_JOB_FILE_RETENTION_HOURS", "24"))
+JOB_FOLDER = "upload_files/jobs"
+ACTIVE_STATUSES = ["queued", "running"]
+
+_job_slots = None
+_running_jobs = set()
+_active_job_ids = set()
+
+
+def _slots() -> asyncio.Semaphore:
+    global _job_slots
+    if _job_slots is None:
+        _job_slots = asyncio.Semaphore(max(UPLOAD_JOB_CONCURRENCY, 1))
+    return _job_slots
+
+
+# Progress reporter handed to the processing function of a job
+class JobProgress:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    async def update(self, **fields):
+        fields["updated_at"] = datetime.now(timezone.utc)
+        await collections["upload_jobs"].update_one({"_id": self.job_id}, {"$set": fields})
+
+    async def add_written(self, count: int):
+        await collections["upload_jobs"].update_one(
+            {"_id": self.job_id},
+            {"$inc": {"rows_written": count}, "$set": {"updated_at": datetime.now(timezone.utc)}}
+        )
+
+
+async def create_upload_job(job_type: str, filename: str, content: bytes, uploaded_by: str, processor) -> str:
+    """
+    Persist the upload and schedule processor(filename, content, uploaded_by, progress).
+    Returns the job id right away.
+    """
+    job_id = str(uuid.uuid4())
+    os.makedirs(JOB_FOLDER, exist_ok=True)
+    path = os.path.join(JOB_FOLDER, f"{job_id}_{os.path.basename(filename)}")
+    await asyncio.to_thread(Path(path).write_bytes, content)
+
+    now = datetime.now(timezone.utc)
+    await collections["upload_jobs"].insert_one({
+        "_id": job_id,
+        "job_type": job_type,
+        "filename": filename,
+        "uploaded_by": uploaded_by,
+        "status": "queued",
+        "rows_parsed": 0,
+        "rows_validated": 0,
+        "rows_failed": 0,
+        "rows_written": 0,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+    _active_job_ids.add(job_id)
+    task = asyncio.create_task(_run_job(job_id, filename, path, uploaded_by, processor))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    logger.info(f"Queued {job_type} upload job {job_id} for {filename}")
+    return job_id
+
+
+async def _run_job(job_id: str, filename: str, path: str, uploaded_by: str, processor):
+    progress = JobProgress(job_id)
+    async with _slots():
+        await progress.update(status="running", started_at=datetime.now(timezone.utc))
+        try:
+            content = await asyncio.to_thread(Path(path).read_bytes)
+            result = await processor(filename, content, uploaded_by, progress)
+            await progress.update(status="completed", result=result, finished_at=datetime.now(timezone.utc))
+            logger.info(f"Upload job {job_id} completed")
+        except HTTPException as e:
+            await progress.update(status="failed", error=e.detail, finished_at=datetime.now(timezone.utc))
+            logger.error(f"Upload job {job_id} failed: {e.detail}")
+        except Exception as e:
+            await progress.update(status="failed", error=str(e), finished_at=datetime.now(timezone.utc))
+            logger.error(f"Upload job {job_id} failed: {e}")
+        finally:
+            _active_job_ids.discard(job_id)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+async def get_upload_job(job_id: str):
+    job = await collections["upload_jobs"].find_one({"_id": job_id})
+    if not job:
+        return None
+    job["job_id"] = job.pop("_id")
+    return job
+
+
+# Keep this worker's jobs from being taken for orphans
+async def heartbeat_upload_jobs():
+    if _active_job_ids:
+        await collections["upload_jobs"].update_many(
+            {"_id": {"$in": list(_active_job_ids)}, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"updated_at": datetime.now(timezone.utc)}}
+        )
+
+
+def _remove_job_files(job_ids) -> int:
+    removed = 0
+    prefixes = tuple(f"{job_id}_" for job_id in job_ids)
+    if not prefixes or not os.path.isdir(JOB_FOLDER):
+        return removed
+    for name in os.listdir(JOB_FOLDER):
+        if name.startswith(prefixes):
+            try:
+                os.remove(os.path.join(JOB_FOLDER, name))
+                removed += 1
+            except OSError as e:
+                logger.error(f"Failed to delete job file {name}: {e}")
+    return removed
+
+
+async def fail_orphaned_upload_jobs() -> int:
+    """Mark queued/running jobs whose worker is gone as failed and drop their files."""
+    now = datetime.now(timezone.utc)
+    query = {
+        "status": {"$in": ACTIVE_STATUSES},
+        "updated_at": {"$lt": now - timedelta(seconds=UPLOAD_JOB_STALE_SECONDS)},
+        "_id": {"$nin": list(_active_job_ids)},
+    }
+    orphaned = await collections["upload_jobs"].distinct("_id", query)
+    if not orphaned:
+        return 0
+    query["_id"] = {"$in": orphaned}
+    result = await collections["upload_jobs"].update_many(query, {"$set": {
+        "status": "failed",
+        "error": "Upload job interrupted: the server stopped before it finished; upload the file again",
+        "finished_at": now,
+        "updated_at": now,
+    }})
+    await asyncio.to_thread(_remove_job_files, orphaned)
+    logger.warning(f"Marked {result.modified_count} orphaned upload jobs as failed")
+    return result.modified_count
+
+
+async def delete_old_job_files() -> int:
+    """Remove job files older than UPLOAD_JOB_FILE_RETENTION_HOURS unless their job is still queued/running."""
+    if not os.path.isdir(JOB_FOLDER):
+        return 0
+    cutoff = datetime.now().timestamp() - UPLOAD_JOB_FILE_RETENTION_HOURS * 3600
+    old = {}
+    for name in os.listdir(JOB_FOLDER):
+        path = os.path.join(JOB_FOLDER, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            old.setdefault(name.split("_", 1)[0], []).append(path)
+    if not old:
+        return 0
+    active = set(await collections["upload_jobs"].distinct(
+        "_id", {"_id": {"$in": list(old)}, "status": {"$in": ACTIVE_STATUSES}}
+    )) | _active_job_ids
+    removed = 0
+    for job_id, paths in old.items():
+        if job_id in active:
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+                logger.info(f"Deleted old job file: {os.path.basename(path)}")
+            except OSError as e:
+                logger.error(f"Failed to delete {path}: {e}")
+    return removed
@@ -0,0 +1,220 @@
+import asyncio
+import codecs
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+
+import chardet
+import pandas as pd
+
+from utils.upload_validation import validate_employee_frame, validate_rr_frame
+
+# -------------------------------------------------------------------
+# Upload parsing stage
+# -------------------------------------------------------------------
+# Reading Excel/CSV payloads and validating rows is pure CPU work, so it runs
+# in a process pool instead of inside the async handlers. This module is
+# imported by the worker processes: keep it free of database/app imports.
+
+# 0 → parse in the event loop's default thread pool instead of processes
+UPLOAD_PARSE_WORKERS = int(os.getenv("UPLOAD_PARSE_WORKERS", "2"))
+# Streaming CSV ingestion: encoding is detected on this many leading bytes
+CSV_SNIFF_BYTES = int(os.getenv("CSV_SNIFF_BYTES", "65536"))
+
+_parse_pool = None
+
+
+class UploadParseError(Exception):
+    """Raised in a worker; kind is "read" or "validation" so the router can map it."""
+    def __init__(self, kind: str, detail: str):
+        super().__init__(kind, detail)
+        self.kind = kind
+        self.detail = detail
+
+
+def read_csv_file(content: bytes):
+    """Read CSV reliably even if corrupted or irregular."""
+    # Detect encoding
+    enc = chardet.detect(content).get("encoding") or "utf-8"
+
+    text = content.decode(enc, errors="ignore")
+    stream = StringIO(text)
+
+
+    reader = csv.reader(stream)
+
+    # Remove completely empty rows
+    rows = [row for row in reader if any(cell.strip() for cell in row)]
+
+    if not rows:
+        return None  # No data
+
+    # Convert to DataFrame-like object
+    header = rows[0]
+    data_rows = rows[1:]
+
+    # Normalize row lengths
+    data = [row + [""] * (len(header) - len(row)) for row in data_rows]
+
+    df = pd.DataFrame(data, columns=header)
+    return df
+
+
+def parse_employee_upload(filename: str, content: bytes) -> dict:
+    """Career Velocity bytes → validated Employee/User models plus row errors."""
+    try:
+        df = (pd.read_csv(BytesIO(content), encoding="utf-8", dtype=str, engine="python", on_bad_lines="skip")
+              if filename.endswith(".csv") else pd.read_excel(BytesIO(content)))
+        df = df.dropna(how="all")
+    except Exception as e:
+        raise UploadParseError("read", f"Failed to read file: {e}")
+
+    required = ["Employee ID", "Employee Name", "Designation", "Band", "City", "Type"]
+    if missing := [c for c in required if c not in df.columns]:
+        raise UploadParseError("validation", f"Missing columns: {missing}")
+
+    valid_emps, valid_users, errors = validate_employee_frame(df)
+    return {"total_rows": len(df), "valid": valid_emps, "users": valid_users, "errors": errors}
+
+
+def parse_rr_upload(filename: str, content: bytes) -> dict:
+    """RR report bytes → validated ResourceRequest models plus row errors."""
+    try:
+        if filename.lower().endswith(".csv"):
+            df = read_csv_file(content)
+
+            if df is None or df.empty:
+                raise ValueError("CSV file contains no valid rows")
+
+        # ------------------------ EXCEL HANDLING (Pandas) ------------------------
+        else:
+            df = pd.read_excel(BytesIO(content), skiprows=6, dtype=str)
+            df = df.dropna(how="all")
+    except Exception as e:
+        raise UploadParseError("read", f"Failed to read RR report: {e}")
+
+    if "Resource Request ID" not in df.columns:
+        raise UploadParseError("validation", "Column 'Resource Request ID' is required")
+
+    valid_rrs, errors = validate_rr_frame(df)
+    return {"total_rows": len(df), "valid": valid_rrs, "errors": errors}
+
+
+# -------------------------------------------------------------------
+# Streaming CSV ingestion
+# -------------------------------------------------------------------
+class StreamingCsvReader:
+    """
+    Push-style CSV reader: feed() raw byte chunks, get back complete data rows.
+    Only the sniffing prefix, an incomplete line and an unfinished quoted
+    record are buffered, so memory does not grow with the file size.
+    Rows come out exactly as read_csv_file builds them (blank rows dropped,
+    short rows padded to the header width).
+    """
+    def __init__(self, sniff_bytes: int = None):
+        self.sniff_bytes = sniff_bytes or CSV_SNIFF_BYTES
+        self.encoding = None
+        self.header = None
+        self._prefix = b""
+        self._decoder = None
+        self._pending = ""
+        self._record = ""
+        self._quotes = 0
+
+    def _start(self, prefix: bytes):
+        enc = chardet.detect(prefix).get("encoding") or "utf-8"
+        # An ASCII-only prefix says nothing about the rest of the file
+        self.encoding = "utf-8" if enc.lower() == "ascii" else enc
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="ignore")
+
+    def feed(self, chunk: bytes) -> list:
+        if self._decoder is None:
+            self._prefix += chunk
+            if len(self._prefix) < self.sniff_bytes:
+                return []
+            chunk, self._prefix = self._prefix, b""
+            self._start(chunk)
+        return self._rows(self._decoder.decode(chunk))
+
+    def close(self) -> list:
+        if self._decoder is None:
+            chunk, self._prefix = self._prefix, b""
+            self._start(chunk)
+            text = self._decoder.decode(chunk, final=True)
+        else:
+            text = self._decoder.decode(b"", final=True)
+        return self._rows(text, final=True)
+
+    def _rows(self, text: str, final: bool = False) -> list:
+        lines = (self._pending + text).split("\n")
+        self._pending = "" if final else lines.pop()
+
+        # Group physical lines into records; a quoted field may span lines
+        records = []
+        for i, line in enumerate(lines):
+            self._record += line if (final and i == len(lines) - 1) else line + "\n"
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                records.append(self._record)
+                self._record, self._quotes = "", 0
+        if final and self._record:
+            records.append(self._record)
+            self._record, self._quotes = "", 0
+
+        rows = []
+        for row in csv.reader(records):
+            if not any(cell.strip() for cell in row):
+                continue
+            if self.header is None:
+                self.header = row
+                continue
+            rows.append(row + [""] * (len(self.header) - len(row)))
+        return rows
+
+
+def validate_rr_rows(header: list, rows: list, start: int) -> dict:
+    """Validate one streamed batch; start keeps row numbers in error rows file-relative."""
+    # A row with more cells than the header is that row's error, not the batch's
+    rr_col = header.index("Resource Request ID") if "Resource Request ID" in header else None
+    fitting, index, row_errors = [], [], []
+    for pos, row in enumerate(rows, start):
+        if len(row) <= len(header):
+            fitting.append(row)
+            index.append(pos)
+            continue
+        rr_id = row[rr_col] if rr_col is not None else ""
+        if rr_id:
+            row_errors.append({"row": pos + 8, "rr_id": rr_id,
+                               "error": f"Row has {len(row)} columns, the header has {len(header)}"})
+    try:
+        df = pd.DataFrame(fitting, columns=header, index=index)
+    except Exception as e:
+        raise UploadParseError("read", f"Failed to read RR report: {e}")
+    valid_rrs, errors = validate_rr_frame(df)
+    if row_errors:
+        errors = sorted(errors + row_errors, key=lambda error: error["row"])
+    return {"total_rows": len(rows), "valid": valid_rrs, "errors": errors}
+
+
+def get_parse_pool():
+    global _parse_pool
+    if _parse_pool is None and UPLOAD_PARSE_WORKERS > 0:
+        # spawn: never fork a process that already runs Mongo client threads
+        _parse_pool = ProcessPoolExecutor(max_workers=UPLOAD_PARSE_WORKERS,
+                                          mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+
+async def run_parser(func, *args):
+    """Run a parse_* function off the event loop and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_pool(), func, *args)
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
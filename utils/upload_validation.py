@@ -0,0 +1,362 @@
+from datetime import timezone
+from typing import Literal, Union, get_args, get_origin
+
+import pandas as pd
+from pydantic import AwareDatetime
+
+from models import Employee, ResourceRequest, User
+
+# -------------------------------------------------------------------
+# Columnar validation for uploads
+# -------------------------------------------------------------------
+# Each column is normalized with pandas string operations, mirroring the
+# field validators in models.py. A row whose every column normalizes cleanly
+# is built with model_construct(); any row the fast path is unsure about is
+# sent through the regular Pydantic constructor, so error rows and messages
+# are exactly what the per-row loop used to produce.
+
+_INT_RE = r"-?(?:0|[1-9]\d*)"
+_FLOAT_RE = r"-?\d+(?:\.\d+)?"
+_BAND_RE = r"[A-D][0-9]|[TEP][0-9]"
+_DAY_MON_YEAR_RE = r"\d{1,2} [A-Za-z]{3} \d{4}"
+_ISO_DATE_RE = r"\d{4}-\d{2}-\d{2}"
+_ISO_DATETIME_RE = r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}"
+
+# (pattern, strptime format) pairs tried in the same order as
+# ResourceRequest.parse_last_activity_date
+_ACTIVITY_FORMATS = [
+    (r"\d{1,2} [A-Za-z]{3} \d{4}, \d{1,2}:\d{2} [AP]M", "%d %b %Y, %I:%M %p"),
+    (r"\d{1,2} [A-Za-z]{3} \d{4} \d{1,2}:\d{2} [AP]M", "%d %b %Y %I:%M %p"),
+    (r"\d{1,2} [A-Za-z]{3} \d{4} \d{2}:\d{2}:\d{2}", "%d %b %Y %H:%M:%S"),
+]
+# datetime.fromisoformat fallback, limited to naive or UTC offsets
+_ISO_UTC_DATETIME_RE = r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\+00:00|Z)?"
+
+EMP_NA_VALUES = ("NOT AVAILABLE", "NA", "NULL", "")
+EMP_SKILL_NA_VALUES = ("NA", "NOT AVAILABLE", "NULL", "")
+RR_SKILL_NA_VALUES = ("", "NA", "N/A")
+RR_TRUE_VALUES = ("TRUE", "YES", "Y", "1")
+RR_PRIORITIES = ("P1", "P2", "P3", "P4")
+# Strings Pydantic accepts for a plain bool field (e.g. the "flag" column)
+BOOL_TRUE_STRINGS = ("1", "on", "t", "true", "y", "yes")
+BOOL_FALSE_STRINGS = ("0", "off", "f", "false", "n", "no")
+
+# Fields covered by ResourceRequest.csv_str_to_int
+RR_CSV_NUMBER_FIELDS = {
+    "allocated_fte", "duration_before_cancellation", "resources_in_propose",
+    "resources_in_hm_check", "resources_in_internal_interview",
+    "resources_in_customer_interview", "resources_in_accept", "resources_in_allocated",
+    "resources_in_not_allocated", "resources_in_reject", "rr_ageing",
+}
+RR_BOOL_FIELDS = {"exclusive_to_ust", "contract_to_hire"}
+RR_SKILL_FIELDS = {"mandatory_skills", "optional_skills", "rr_skill_group"}
+RR_DATE_FIELDS = {
+    "rr_start_date", "rr_end_date", "project_start_date", "project_end_date",
+    "raised_on", "last_updated_on", "rr_finance_approved_date", "wfm_approved_date",
+    "edit_requested_date", "resubmitted_date", "allocation_project_start_date",
+    "hiring_request_submit_date_mte", "allocation_project_end_date",
+}
+
+
+def _as_objects(s: pd.Series) -> pd.Series:
+    """Object Series with None for missing cells (same as the row loop's pd.isna check)."""
+    s = s.astype(object)
+    return s.where(s.notna(), None)
+
+
+def _matches(s: pd.Series, pattern: str) -> pd.Series:
+    return s.str.fullmatch(pattern).fillna(False).astype(bool)
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return args[0], True
+    return annotation, False
+
+
+def _text_columns_ok(df: pd.DataFrame, columns) -> bool:
+    return all(pd.api.types.infer_dtype(df[c], skipna=True) in ("string", "empty") for c in columns)
+
+
+def _fallback_rows(df: pd.DataFrame, fast: pd.Series, build_row):
+    """Yield (position, result) for rows that need the regular Pydantic path."""
+    positions = [i for i, ok in enumerate(fast.tolist()) if not ok]
+    for pos in positions:
+        yield pos, build_row(df.index[pos], df.iloc[pos])
+
+
+# -------------------------------------------------------------------
+# Employees (Career Velocity)
+# -------------------------------------------------------------------
+def _employee_columns(df: pd.DataFrame):
+    """
+    Normalize every Employee field column-wise.
+    Returns ({field_name: list_of_values}, ok_mask) or None when the frame
+    has to go through the per-row path entirely.
+    """
+    if df.columns.duplicated().any():
+        return None
+
+    # Same conversion as the row loop: None for NA, else str(v).strip()
+    text = {}
+    for col in df.columns:
+        s = df[col]
+        missing = s.isna()
+        s = s.astype(object).map(str).str.strip().astype(object)
+        text[col] = s.where(~missing, None)
+
+    values, ok = {}, pd.Series(True, index=df.index)
+    for name, field in Employee.model_fields.items():
+        key = field.alias or name
+        if key not in text:
+            if field.is_required():
+                return None
+            continue
+        s = text[key]
+        present = s.notna()
+
+        if name == "employee_id":
+            valid = _matches(s, _INT_RE)
+            ok &= valid
+            values[name] = [int(v) if good else None for v, good in zip(s.tolist(), valid.tolist())]
+        elif name == "type":
+            values[name] = (s.str.upper() == "TP").map({True: "TP", False: "Non TP"}).tolist()
+        elif name == "band":
+            upper = s.str.upper()
+            empty = ~present | (upper == "")
+            ok &= empty | _matches(upper, _BAND_RE)
+            values[name] = upper.astype(object).where(~empty, None).tolist()
+        elif name in ("primary_technology", "secondary_technology"):
+            na = ~present | s.str.upper().isin(EMP_NA_VALUES)
+            blank = "" if name == "primary_technology" else None
+            values[name] = s.where(~na, blank).tolist()
+        elif name == "detailed_skills":
+            na = (~present | s.str.upper().isin(EMP_SKILL_NA_VALUES)).tolist()
+            values[name] = [[] if is_na else [v.strip() for v in cell.split(",")]
+                            for cell, is_na in zip(s.tolist(), na)]
+        else:
+            # Plain str / Optional[str] fields
+            if field.is_required() and not _unwrap_optional(field.annotation)[1]:
+                ok &= present
+            values[name] = s.tolist()
+
+    return values, ok
+
+
+def _validate_employee_row(idx, row):
+    row_dict = {k: None if pd.isna(v) else str(v).strip() for k, v in row.to_dict().items()}
+    try:
+        emp = Employee(**row_dict)
+        user = User(employee_id=str(emp.employee_id), role=emp.type)
+        return emp, user, None
+    except Exception as e:
+        return None, None, {"row": idx + 2, "error": str(e)}
+
+
+def validate_employee_frame(df: pd.DataFrame):
+    """
+    Validate a Career Velocity frame.
+    Returns (valid_emps, valid_users, errors) in frame order.
+    """
+    n = len(df)
+    results = [None] * n
+    columns = _employee_columns(df) if n else None
+
+    if columns is None:
+        fast = pd.Series(False, index=df.index)
+    else:
+        values, fast = columns
+        names = list(values)
+        for pos, row_values in enumerate(zip(*(values[f] for f in names))):
+            if fast.iat[pos]:
+                emp = Employee.model_construct(**dict(zip(names, row_values)))
+                results[pos] = (emp, User(employee_id=str(emp.employee_id), role=emp.type), None)
+
+    for pos, result in _fallback_rows(df, fast, _validate_employee_row):
+        results[pos] = result
+
+    valid_emps, valid_users, errors = [], [], []
+    for emp, user, error in results:
+        if error:
+            errors.append(error)
+        else:
+            valid_emps.append(emp)
+            valid_users.append(user)
+    return valid_emps, valid_users, errors
+
+
+# -------------------------------------------------------------------
+# Resource Requests (RR report)
+# -------------------------------------------------------------------
+def _rr_date_column(s: pd.Series, required: bool):
+    stripped = s.str.strip()
+    empty = ~s.notna() | stripped.str.lower().isin(("", "none"))
+    parsed = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+
+    day_mon_year = _matches(stripped, _DAY_MON_YEAR_RE)
+    if day_mon_year.any():
+        parsed[day_mon_year] = pd.to_datetime(stripped[day_mon_year], format="%d %b %Y", errors="coerce")
+    iso_date = _matches(stripped, _ISO_DATE_RE)
+    if iso_date.any():
+        parsed[iso_date] = pd.to_datetime(stripped[iso_date], format="%Y-%m-%d", errors="coerce")
+    iso_datetime = _matches(stripped, _ISO_DATETIME_RE)
+    if iso_datetime.any():
+        parsed[iso_datetime] = pd.to_datetime(stripped[iso_datetime].str.replace("T", " "),
+                                              format="%Y-%m-%d %H:%M:%S", errors="coerce")
+
+    good = parsed.notna()
+    ok = good | (empty & (not required))
+    dates = [d.date() if g else None for d, g in zip(parsed.tolist(), good.tolist())]
+    return dates, ok
+
+
+def _rr_activity_column(s: pd.Series):
+    cleaned = s.str.split("(").str[0].str.strip().str.rstrip(",")
+    parsed = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    for pattern, fmt in _ACTIVITY_FORMATS:
+        mask = _matches(cleaned, pattern) & parsed.isna()
+        if mask.any():
+            parsed[mask] = pd.to_datetime(cleaned[mask], format=fmt, errors="coerce")
+    mask = _matches(cleaned, _ISO_UTC_DATETIME_RE) & parsed.isna()
+    if mask.any():
+        iso = cleaned[mask].str.slice(0, 19).str.replace("T", " ")
+        parsed[mask] = pd.to_datetime(iso, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    good = parsed.notna()
+    values = [d.to_pydatetime().replace(tzinfo=timezone.utc) if g else None
+              for d, g in zip(parsed.tolist(), good.tolist())]
+    return values, good
+
+
+def _rr_number_column(s: pd.Series, pattern: str, cast, allow_none: bool):
+    present = s.notna()
+    valid = _matches(s, pattern)
+    ok = valid | (~present if allow_none else False)
+    return [cast(v) if g else None for v, g in zip(s.tolist(), valid.tolist())], ok
+
+
+def _rr_csv_number_column(s: pd.Series, as_int: bool):
+    stripped = s.str.strip()
+    empty = ~s.notna() | (stripped == "")
+    valid = _matches(stripped, _FLOAT_RE)
+    floats = [float(v) if g else None for v, g in zip(stripped.tolist(), valid.tolist())]
+    if as_int:
+        whole = [f is not None and f.is_integer() for f in floats]
+        valid &= pd.Series(whole, index=s.index)
+        floats = [int(f) if w else None for f, w in zip(floats, whole)]
+    return floats, empty | valid
+
+
+def _rr_columns(df: pd.DataFrame):
+    """
+    Normalize every ResourceRequest field column-wise.
+    Returns ({field_name: list_of_values}, ok_mask) or None when the frame
+    has to go through the per-row path entirely.
+    """
+    if df.columns.duplicated().any():
+        return None
+
+    fields = ResourceRequest.model_fields
+    # populate_by_name: a column named after a field would be picked up by Pydantic
+    if any(name in df.columns and (f.alias or name) != name for name, f in fields.items()):
+        return None
+
+    used = [f.alias or name for name, f in fields.items() if (f.alias or name) in df.columns]
+    if not _text_columns_ok(df, used):
+        return None
+
+    values, ok = {}, pd.Series(True, index=df.index)
+    for name, field in fields.items():
+        key = field.alias or name
+        if key not in df.columns:
+            if field.is_required():
+                return None
+            continue
+
+        s = _as_objects(df[key])
+        present = s.notna()
+        inner, optional = _unwrap_optional(field.annotation)
+
+        if name in RR_CSV_NUMBER_FIELDS:
+            col, col_ok = _rr_csv_number_column(s, as_int=inner is int)
+        elif name in RR_BOOL_FIELDS:
+            col = s.astype(str).str.strip().str.upper().isin(RR_TRUE_VALUES).tolist()
+            col_ok = True
+        elif name in RR_SKILL_FIELDS:
+            na = (~present | s.str.strip().str.upper().isin(RR_SKILL_NA_VALUES)).tolist()
+            col = [[] if is_na else [item.strip() for item in cell.split(",") if item.strip()]
+                   for cell, is_na in zip(s.tolist(), na)]
+            col_ok = True
+        elif name in RR_DATE_FIELDS:
+            col, col_ok = _rr_date_column(s, required=not optional)
+        elif inner is AwareDatetime:
+            col, col_ok = _rr_activity_column(s)
+        elif name == "priority":
+            upper = s.str.strip().str.upper()
+            col = upper.where(upper.isin(RR_PRIORITIES), "P4").tolist()
+            col_ok = present
+        elif get_origin(inner) is Literal:
+            col = s.tolist()
+            col_ok = s.isin(get_args(inner)) | (~present if optional else False)
+        elif inner is float:
+            col, col_ok = _rr_number_column(s, _FLOAT_RE, float, optional)
+        elif inner is int:
+            col, col_ok = _rr_number_column(s, _INT_RE, int, optional)
+        elif inner is bool:
+            lower = s.str.lower()
+            col = lower.isin(BOOL_TRUE_STRINGS).tolist()
+            col_ok = lower.isin(BOOL_TRUE_STRINGS + BOOL_FALSE_STRINGS)
+        elif inner is str:
+            col = s.tolist()
+            col_ok = True if optional else present
+        else:
+            return None
+
+        values[name] = col
+        ok &= col_ok
+
+    return values, ok
+
+
+def _validate_rr_row(idx, row):
+    rr_id = row.get("Resource Request ID")
+    row_dict = {k: None if pd.isna(v) else v for k, v in row.to_dict().items()}
+    row_dict["rr_status"] = True
+    try:
+        return ResourceRequest(**row_dict), None
+    except Exception as e:
+        return None, {"row": idx + 8, "rr_id": str(rr_id), "error": str(e)}
+
+
+def validate_rr_frame(df: pd.DataFrame):
+    """
+    Validate an RR report frame. Rows without a Resource Request ID are skipped.
+    Returns (valid_rrs, errors) in frame order.
+    """
+    rr_ids = df["Resource Request ID"]
+    keep = rr_ids.notna() & rr_ids.astype(object).map(bool).astype(bool)
+    df = df[keep]
+
+    n = len(df)
+    results = [None] * n
+    columns = _rr_columns(df) if n else None
+
+    if columns is None:
+        fast = pd.Series(False, index=df.index)
+    else:
+        values, fast = columns
+        names = list(values)
+        for pos, row_values in enumerate(zip(*(values[f] for f in names))):
+            if fast.iat[pos]:
+                results[pos] = (ResourceRequest.model_construct(**dict(zip(names, row_values))), None)
+
+    for pos, result in _fallback_rows(df, fast, _validate_rr_row):
+        results[pos] = result
+
+    valid_rrs, errors = [], []
+    for rr, error in results:
+        if error:
+            errors.append(error)
+        else:
+            valid_rrs.append(rr)
+    return valid_rrs, errors